@@ -1,11 +1,18 @@
 import os
 import copy
+import hashlib
 import subprocess
+import threading
+from collections import OrderedDict
 from math import pi, sqrt
 
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue  # Python 2
+
 import numpy as np
 
-from ase.dft.kpoints import bandpath, monkhorst_pack
 
 
 class CalculatorError(RuntimeError):
@@ -149,10 +156,11 @@ def equal(a, b, tol=None):
         b = np.array(b)
         if a.shape != b.shape:
             return False
+        if (a == b).all():
+            return True
         if tol is None:
-            return (a == b).all()
-        else:
-            return np.allclose(a, b, rtol=tol, atol=tol)
+            return False
+        return np.allclose(a, b, rtol=tol, atol=tol)
     if isinstance(b, np.ndarray):
         return equal(b, a, tol)
     if isinstance(a, dict) and isinstance(b, dict):
@@ -237,6 +245,7 @@ def kpts2sizeandoffsets(size=None, density=None, gamma=None, even=None,
 
 def kpts2ndarray(kpts, atoms=None):
     """Convert kpts keyword to 2-d ndarray of scaled k-points."""
+    from ase.dft.kpoints import bandpath, monkhorst_pack
 
     if kpts is None:
         return np.zeros((1, 3))
@@ -314,6 +323,116 @@ class Parameters(dict):
         file.close()
 
 
+class ResultsCache:
+    """Cache of calculated properties keyed on the atomic configuration.
+
+    The key is a hash of the calculator name and parameters and of the
+    atomic numbers, positions, unit cell, boundary conditions and initial
+    magnetic moments and charges.  A cache can be shared by several
+    calculator instances; attach it to a calculator with::
+
+        cache = ResultsCache()
+        calc.cache = cache
+
+    and results for a configuration that was seen before are then taken
+    from the cache instead of being calculated again.
+
+    maxsize: int
+        Number of configurations kept in memory.  The least recently used
+        configuration is removed when the cache is full.
+    directory: str
+        Optional directory where results are also stored as JSON files,
+        one per configuration.  Such a cache survives the Python process
+        and can be shared between processes.
+    tol: float
+        Positions and cell vectors are rounded to multiples of *tol*
+        before hashing, so configurations which differ by less than *tol*
+        normally share an entry.
+
+    The attributes *hits* and *misses* count how many requested properties
+    were found in the cache or had to be calculated.
+    """
+
+    def __init__(self, maxsize=128, directory=None, tol=1e-8):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.tol = tol
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, calc, atoms):
+        """Return hash of calculator parameters and atomic configuration."""
+        from ase.io.jsonio import MyEncoder
+        try:
+            # Sorted, so that the order of the parameters doesn't matter:
+            parameters = MyEncoder(sort_keys=True).encode(
+                dict(calc.parameters or {}))
+        except TypeError:
+            parameters = repr(sorted(calc.parameters.items()))
+        sha = hashlib.sha1()
+        sha.update(calc.__class__.__name__.encode())
+        sha.update(parameters.encode())
+        for array in [atoms.numbers, atoms.pbc]:
+            sha.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+        for array in [atoms.positions, atoms.cell,
+                      atoms.get_initial_magnetic_moments(),
+                      atoms.get_initial_charges()]:
+            array = np.round(np.asarray(array) / self.tol).astype(np.int64)
+            sha.update(np.ascontiguousarray(array).tobytes())
+        return sha.hexdigest()
+
+    def get(self, calc, atoms, name):
+        """Return cached results containing property *name* or None."""
+        key = self.key(calc, atoms)
+        results = self.entries.pop(key, None)
+        if results is None and self.directory is not None:
+            results = self.read(key)
+        if results is not None:
+            self.entries[key] = results
+        if results is None or name not in results:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(results)
+
+    def put(self, calc, atoms, results):
+        """Store results for the atomic configuration."""
+        key = self.key(calc, atoms)
+        self.entries.pop(key, None)
+        self.entries[key] = copy.deepcopy(results)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        if self.directory is not None:
+            self.write(key, results)
+
+    def read(self, key):
+        from ase.io.jsonio import decode
+        filename = os.path.join(self.directory, key + '.json')
+        if not os.path.isfile(filename):
+            return None
+        with open(filename) as fd:
+            return decode(fd.read())
+
+    def write(self, key, results):
+        from ase.io.jsonio import encode
+        filename = os.path.join(self.directory, key + '.json')
+        with open(filename + '.tmp', 'w') as fd:
+            fd.write(encode(results))
+        os.rename(filename + '.tmp', filename)
+
+    def clear(self):
+        """Remove all results from memory and reset the statistics."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 class Calculator(object):
     """Base-class for all ASE calculators.
 
@@ -333,6 +452,11 @@ class Calculator(object):
     default_parameters = {}
     'Default parameters'
 
+    cache = None
+    'Optional ResultsCache shared between calculations'
+
+    _restored_from_cache = False
+
     def __init__(self, restart=None, ignore_bad_restart_file=False, label=None,
                  atoms=None, **kwargs):
         """Basic calculator implementation.
@@ -518,6 +642,13 @@ class Calculator(object):
     def get_stress(self, atoms=None):
         return self.get_property('stress', atoms)
 
+    def get_potential_energies(self, atoms=None):
+        return self.get_property('energies', atoms)
+
+    def get_stresses(self, atoms=None):
+        """Per-atom stresses in Voigt order, summing to the stress."""
+        return self.get_property('stresses', atoms)
+
     def get_dipole_moment(self, atoms=None):
         return self.get_property('dipole', atoms)
 
@@ -546,7 +677,21 @@ class Calculator(object):
         if name not in self.results:
             if not allow_calculation:
                 return None
-            self.calculate(atoms, [name], system_changes)
+            if self.cache is not None and atoms is not None:
+                results = self.cache.get(self, atoms, name)
+                if results is not None:
+                    self.atoms = atoms.copy()
+                    self.results = results
+                    self._restored_from_cache = True
+            if name not in self.results:
+                if self._restored_from_cache:
+                    # Internal state of the calculator does not belong to
+                    # the results taken from the cache:
+                    system_changes = all_changes[:]
+                self.calculate(atoms, [name], system_changes)
+                self._restored_from_cache = False
+                if self.cache is not None:
+                    self.cache.put(self, atoms, self.results)
 
         if name == 'magmom' and 'magmom' not in self.results:
             return 0.0
@@ -608,6 +753,37 @@ class Calculator(object):
         if atoms is not None:
             self.atoms = atoms.copy()
 
+    def calculate_batch(self, images, properties=['energy']):
+        """Calculate properties for several configurations.
+
+        images: list of Atoms objects
+            Configurations to calculate.
+        properties: list of str
+            Properties needed for every configuration.
+
+        Returns a list with a results dictionary for each configuration.
+        This implementation calculates one configuration at a time.
+        Calculators that can evaluate many configurations together, like
+        the vectorized potentials, override it."""
+
+        results = []
+        for atoms in images:
+            for name in properties:
+                self.get_property(name, atoms)
+            results.append(dict(self.results))
+        return results
+
+    def store_results(self, atoms, results):
+        """Make *results* the results of a calculation for *atoms*.
+
+        Used to hand results from :meth:`calculate_batch` to the
+        calculator, so that the usual get-methods return them."""
+
+        self.atoms = atoms.copy()
+        self.results = dict(results)
+        # Internal state of the calculator does not belong to the results:
+        self._restored_from_cache = True
+
     def calculate_numerical_forces(self, atoms, d=0.001):
         """Calculate numerical forces using finite difference.
 
@@ -672,6 +848,165 @@ class Calculator(object):
         return get_band_structure(calc=self)
 
 
+def overrides(cls, base, name):
+    """Check if class cls has its own version of method name of base."""
+    # Python 2 creates a new unbound method on every attribute access,
+    # so the underlying functions must be compared:
+    method = getattr(cls, name)
+    base_method = getattr(base, name)
+    return (getattr(method, '__func__', method) is not
+            getattr(base_method, '__func__', base_method))
+
+
+def has_batch_support(calc):
+    """Check if calculator evaluates several configurations in one call."""
+    return (isinstance(calc, Calculator) and
+            overrides(type(calc), Calculator, 'calculate_batch'))
+
+
+def calculate_images(images, properties=['energy']):
+    """Calculate properties of images with their own calculators.
+
+    Images whose calculators support batch evaluation, are of the same
+    type and have the same parameters are calculated together and the
+    results are stored in the calculator of each image.  All other images
+    are left alone; they will be calculated one by one when their
+    properties are requested."""
+
+    groups = []
+    for atoms in images:
+        calc = atoms.calc
+        if not has_batch_support(calc):
+            continue
+        if not all(name in calc.implemented_properties
+                   for name in properties):
+            continue
+        if not calc.calculation_required(atoms, properties):
+            continue
+        for group in groups:
+            calc0 = group[0].calc
+            if (type(calc) is type(calc0) and
+                equal(calc.parameters, calc0.parameters)):
+                group.append(atoms)
+                break
+        else:
+            groups.append([atoms])
+
+    for group in groups:
+        if len(set(id(atoms.calc) for atoms in group)) < len(group):
+            # A shared calculator can only hold one set of results.
+            continue
+        results = group[0].calc.calculate_batch(group, properties)
+        for atoms, res in zip(group, results):
+            atoms.calc.store_results(atoms, res)
+
+
+def calculate_concurrently(images, properties=['energy'], maxjobs=2):
+    """Calculate properties of images with their own calculators.
+
+    Up to *maxjobs* calculations of file-based calculators run at the same
+    time.  Every image needs a calculator of its own working in a separate
+    directory.  Other calculators, and file-based calculators with their
+    own calculate() method, are run one at a time.  The results are left
+    in the calculators of the images.  If a calculation fails, the
+    others are stopped."""
+
+    calcs = [atoms.calc for atoms in images]
+    if len(set(id(calc) for calc in calcs)) < len(calcs):
+        raise ValueError('Every image needs a calculator of its own')
+    directories = [os.path.abspath(calc.directory) for calc in calcs
+                   if isinstance(calc, FileIOCalculator)]
+    if len(set(directories)) < len(directories):
+        raise ValueError('Calculators must work in separate directories')
+
+    finished = Queue()
+    running = []
+    try:
+        for atoms in images:
+            calc = atoms.calc
+            if not calc.calculation_required(atoms, properties):
+                continue
+            system_changes = calc.check_state(atoms)
+            if system_changes:
+                calc.reset()
+            if (not isinstance(calc, FileIOCalculator) or
+                    overrides(type(calc), FileIOCalculator, 'calculate')):
+                for name in properties:
+                    calc.get_property(name, atoms)
+                continue
+            while len(running) == maxjobs:
+                future = finished.get()
+                running.remove(future)
+                future.result()
+            future = calc.start(atoms, properties, system_changes)
+            future.add_done_callback(finished.put)
+            running.append(future)
+        for future in running:
+            future.result()
+    finally:
+        # Don't leave calculations running if one of them failed:
+        for future in running:
+            future.cancel()
+
+
+class CalculationFuture:
+    """Running calculation of a :class:`FileIOCalculator`.
+
+    A background thread waits for the command to finish, so that
+    callbacks can be run as soon as it does."""
+
+    def __init__(self, calc, process):
+        self.calc = calc
+        self.process = process
+        self.finished = False
+        self.callbacks = []
+        self.lock = threading.Lock()
+        self.waiter = threading.Thread(target=self._wait)
+        self.waiter.daemon = True
+        self.waiter.start()
+
+    def _wait(self):
+        # This is the only place where we wait for the process:
+        self.process.wait()
+        with self.lock:
+            callbacks = self.callbacks
+            self.callbacks = None
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        """Call callback(future) when the command has finished."""
+        with self.lock:
+            if self.callbacks is not None:
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+    def done(self):
+        """Check if the command has finished."""
+        return not self.waiter.is_alive()
+
+    def cancel(self):
+        """Stop the command if it is still running."""
+        if self.process.returncode is None:
+            self.process.terminate()
+        self.waiter.join()
+
+    def result(self):
+        """Wait for the command to finish, read and return the results."""
+        if not self.finished:
+            self.waiter.join()
+            errorcode = self.process.returncode
+            self.finished = True
+            calc = self.calc
+            if errorcode:
+                raise CalculationFailed('{} in {} returned an error: {}'
+                                        .format(calc.name, calc.directory,
+                                                errorcode))
+            calc.read_results()
+        return self.calc.results
+
+
 class FileIOCalculator(Calculator):
     """Base class for calculators that write/read input/output files."""
 
@@ -697,6 +1032,15 @@ class FileIOCalculator(Calculator):
 
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
+        self.start(atoms, properties, system_changes).result()
+
+    def start(self, atoms=None, properties=['energy'],
+              system_changes=all_changes):
+        """Write input files and start the calculation in the background.
+
+        Returns a :class:`CalculationFuture`.  Its result() method waits
+        for the command to finish and reads the results."""
+
         Calculator.calculate(self, atoms, properties, system_changes)
         self.write_input(self.atoms, properties, system_changes)
         if self.command is None:
@@ -705,13 +1049,8 @@ class FileIOCalculator(Calculator):
                 .format('ASE_' + self.name.upper() + '_COMMAND') +
                 'or supply the command keyword')
         command = self.command.replace('PREFIX', self.prefix)
-        errorcode = subprocess.call(command, shell=True, cwd=self.directory)
-
-        if errorcode:
-            raise CalculationFailed('{} in {} returned an error: {}'
-                                    .format(self.name, self.directory,
-                                            errorcode))
-        self.read_results()
+        process = subprocess.Popen(command, shell=True, cwd=self.directory)
+        return CalculationFuture(self, process)
 
     def write_input(self, atoms, properties=None, system_changes=None):
         """Write input file(s).
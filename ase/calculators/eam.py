@@ -10,13 +10,45 @@
 import os
 import numpy as np
 from ase.test import NotAvailable
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NewPrimitiveNeighborList
 from ase.calculators.calculator import Calculator, all_changes
 from scipy.interpolate import InterpolatedUnivariateSpline as spline
 from ase.units import Bohr, Hartree
 from ase.utils import basestring
 
 
+class TabulatedFunction:
+    """Cubic interpolation of a function tabulated on a uniform grid.
+
+    The function *f* is sampled at the *n* points 0, *dx*, ..., (n-1)*dx
+    together with its derivative ``f(x, 1)``, and each interval is
+    interpolated by a cubic Hermite polynomial.  Like a spline, the
+    instance is called as ``tab(x)`` or ``tab(x, 1)`` for the derivative.
+    """
+
+    def __init__(self, f, n, dx):
+        self.dx = dx
+        x = np.arange(n) * dx
+        y = f(x)
+        try:
+            dy = f(x, 1) * dx
+        except TypeError:
+            dy = np.gradient(y)
+        self.coefs = np.array([y[:-1],
+                               dy[:-1],
+                               3 * (y[1:] - y[:-1]) - 2 * dy[:-1] - dy[1:],
+                               2 * (y[:-1] - y[1:]) + dy[:-1] + dy[1:]]).T
+
+    def __call__(self, x, nu=0):
+        p = np.asarray(x, float) / self.dx
+        k = np.clip(p.astype(int), 0, len(self.coefs) - 1)
+        t = p - k
+        c0, c1, c2, c3 = self.coefs[k].T
+        if nu == 0:
+            return ((c3 * t + c2) * t + c1) * t + c0
+        return ((3 * c3 * t + 2 * c2) * t + c1) / self.dx
+
+
 class EAM(Calculator):
     r"""
 
@@ -143,11 +175,17 @@ Keyword                    Description
 
 ``d_d[N,N], d_q[N,N]``     ADP dipole and quadrupole derivative functions
 
-``skin``                   skin distance passed to NeighborList(). If no atom
+``skin``                   skin distance of the neighbor list. If no atom
                            has moved more than the skin-distance since the last
                            call to the ``update()`` method then the neighbor
                            list can be reused. Defaults to 1.0.
 
+``tabulate``               if True, all functions are tabulated once on the
+                           uniform ``nr``/``dr`` and ``nrho``/``drho`` grids
+                           and evaluated by cubic interpolation, which is
+                           faster than evaluating the splines. Defaults to
+                           False.
+
 ``form``                   the form of the potential ``alloy``, ``adp`` or 
                            ``fs``. This will be determined from the file suffix 
                            or must be set if using equations
@@ -196,9 +234,11 @@ Special features
 Notes/Issues
 =============
 
-* Although currently not fast, this calculator can be good for trying
-  small calculations or for creating new potentials by matching baseline
-  data such as from DFT results. The format for these potentials is
+* Energies and forces are evaluated on flat arrays of all neighbor
+  pairs without Python loops over atoms; use ``tabulate=True`` for the
+  fastest evaluation of large systems.  This calculator is also good for
+  creating new potentials by matching baseline data such as from DFT
+  results. The format for these potentials is
   compatible with LAMMPS_ and so can be used either directly by LAMMPS or
   with the ASE LAMMPS calculator interface.
 
@@ -231,6 +271,7 @@ End EAM Interface Documentation
 
     default_parameters = dict(
         skin=1.0,
+        tabulate=False,
         potential=None,
         header=[b'EAM/ADP potential file\n',
                 b'Generated from eam.py\n',
@@ -239,6 +280,9 @@ End EAM Interface Documentation
     def __init__(self, restart=None, ignore_bad_restart_file=False,
                  label=os.curdir, atoms=None, **kwargs):
 
+        self.neighbors = None
+        self.tabulated = False
+
         if 'potential' in kwargs:
             self.read_potential(kwargs['potential'])
 
@@ -251,7 +295,7 @@ End EAM Interface Documentation
                       # derivatives
                       'd_embedded_energy', 'd_electron_density', 'd_phi',
                       'd', 'q', 'd_d', 'd_q',  # adp terms
-                      'skin', 'form', 'Z', 'nr', 'nrho', 'mass')
+                      'skin', 'tabulate', 'form', 'Z', 'nr', 'nrho', 'mass')
 
         # set any additional keyword arguments
         for arg, val in self.parameters.items():
@@ -624,8 +668,8 @@ End EAM Interface Documentation
             raise RuntimeError('These elements are not in the potential: %s' %
                                elements[unavailable])
 
-        # cutoffs need to be a vector for NeighborList
-        cutoffs = self.cutoff * np.ones(len(atoms))
+        if self.parameters.tabulate and not self.tabulated:
+            self.tabulate_functions()
 
         # convert the elements to an index of the position
         # in the eam format
@@ -636,11 +680,70 @@ End EAM Interface Documentation
         # since we need the contribution of all neighbors to the
         # local electron density we cannot just calculate and use
         # one way neighbors
-        self.neighbors = NeighborList(cutoffs,
-                                      skin=self.parameters.skin,
-                                      self_interaction=False,
-                                      bothways=True)
-        self.neighbors.update(atoms)
+        if (self.neighbors is None or
+            len(self.neighbors.cutoffs) != len(atoms)):
+            cutoffs = 0.5 * self.cutoff * np.ones(len(atoms))
+            self.neighbors = NewPrimitiveNeighborList(
+                cutoffs, skin=self.parameters.skin, self_interaction=False,
+                bothways=True, method='linkedcell')
+        self.neighbors.update(atoms.pbc, atoms.get_cell(complete=True),
+                              atoms.positions)
+
+        # flat arrays of all pairs within the cutoff: first atom, second
+        # atom, distance vector and distance
+        nl = self.neighbors
+        rvec = (atoms.positions[nl.pair_second] + np.dot(nl.offset_vec,
+                                                         atoms.cell) -
+                atoms.positions[nl.pair_first])
+        r = np.sqrt((rvec**2).sum(axis=1))
+        nearest = r < self.cutoff
+        self.pair_i = nl.pair_first[nearest]
+        self.pair_j = nl.pair_second[nearest]
+        self.pair_rvec = rvec[nearest]
+        self.pair_r = r[nearest]
+
+    def tabulate_functions(self):
+        """Replace all functions of the potential by cubic interpolation
+        tables on uniform grids.
+
+        The grids are the ``nr``/``dr`` and ``nrho``/``drho`` grids of the
+        potential file.  Evaluating the tables is faster than evaluating
+        the splines."""
+        for name in ['nr', 'dr', 'nrho', 'drho']:
+            if getattr(self, name, None) is None:
+                raise RuntimeError('Tabulation requires %s' % name)
+
+        def tabulate(functions, n, dx):
+            tables = np.empty(functions.shape, object)
+            d_tables = np.empty(functions.shape, object)
+            for k, f in enumerate(functions.flat):
+                tables.flat[k] = TabulatedFunction(f, n, dx)
+                d_tables.flat[k] = self.deriv(tables.flat[k])
+            return tables, d_tables
+
+        self.embedded_energy, self.d_embedded_energy = tabulate(
+            self.embedded_energy, self.nrho, self.drho)
+        self.electron_density, self.d_electron_density = tabulate(
+            self.electron_density, self.nr, self.dr)
+        self.phi, self.d_phi = tabulate(self.phi, self.nr, self.dr)
+        if self.form == 'adp':
+            self.d, self.d_d = tabulate(self.d, self.nr, self.dr)
+            self.q, self.d_q = tabulate(self.q, self.nr, self.dr)
+        self.tabulated = True
+
+    def evaluate(self, functions, indices, x):
+        """Evaluate functions[indices[0][n], indices[1][n], ...](x[n]).
+
+        The functions are called once for each combination of elements
+        with all the values of x belonging to it."""
+        values = np.zeros(len(x))
+        if len(x) == 0:
+            return values
+        key = np.ravel_multi_index(indices, functions.shape)
+        for k in np.unique(key):
+            use = key == k
+            values[use] = functions.flat[k](x[use])
+        return values
 
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
@@ -687,67 +790,52 @@ End EAM Interface Documentation
         generated by its neighbors
         """
 
-        pair_energy = 0.0
-        embedding_energy = 0.0
-        mu_energy = 0.0
-        lam_energy = 0.0
-        trace_energy = 0.0
+        i = self.pair_i
+        j = self.pair_j
+        types_i = self.index[i]
+        types_j = self.index[j]
+        natoms = len(atoms)
 
-        self.total_density = np.zeros(len(atoms))
-        if (self.form == 'adp'):
-            self.mu = np.zeros([len(atoms), 3])
-            self.lam = np.zeros([len(atoms), 3, 3])
-
-        for i in range(len(atoms)):  # this is the atom to be embedded
-            neighbors, offsets = self.neighbors.get_neighbors(i)
-            offset = np.dot(offsets, atoms.get_cell())
-
-            rvec = (atoms.positions[neighbors] + offset -
-                    atoms.positions[i])
-
-            # calculate the distance to the nearest neighbors
-            r = np.sqrt(np.sum(np.square(rvec), axis=1))  # fast
-#            r = np.apply_along_axis(np.linalg.norm, 1, rvec)  # sloow
-
-            nearest = np.arange(len(r))[r <= self.cutoff]
-            for j_index in range(self.Nelements):
-                use = self.index[neighbors[nearest]] == j_index
-                if not use.any():
-                    continue
-                pair_energy += np.sum(self.phi[self.index[i], j_index](
-                    r[nearest][use])) / 2.
-
-                if self.form == 'fs':
-                    density = np.sum(
-                        self.electron_density[j_index, self.index[i]](r[nearest][use]))
-                else:
-                    density = np.sum(
-                        self.electron_density[j_index](r[nearest][use]))
-                self.total_density[i] += density
-
-                if self.form == 'adp':
-                    self.mu[i] += self.adp_dipole(
-                        r[nearest][use],
-                        rvec[nearest][use],
-                        self.d[self.index[i], j_index])
-
-                    self.lam[i] += self.adp_quadrupole(
-                        r[nearest][use],
-                        rvec[nearest][use],
-                        self.q[self.index[i], j_index])
-
-            # add in the electron embedding energy
-            embedding_energy += self.embedded_energy[self.index[i]](
-                self.total_density[i])
+        pair_energy = self.evaluate(self.phi, (types_i, types_j),
+                                    self.pair_r).sum() / 2.
+
+        if self.form == 'fs':
+            density = self.evaluate(self.electron_density,
+                                    (types_j, types_i), self.pair_r)
+        else:
+            density = self.evaluate(self.electron_density, (types_j,),
+                                    self.pair_r)
+        self.total_density = np.bincount(i, weights=density,
+                                         minlength=natoms)
+
+        # add in the electron embedding energy
+        embedding_energy = self.evaluate(self.embedded_energy,
+                                         (self.index,),
+                                         self.total_density).sum()
 
         components = dict(pair=pair_energy, embedding=embedding_energy)
 
         if self.form == 'adp':
-            mu_energy += np.sum(self.mu ** 2) / 2.
-            lam_energy += np.sum(self.lam ** 2) / 2.
+            dipole = self.evaluate(self.d, (types_i, types_j), self.pair_r)
+            self.mu = np.zeros([natoms, 3])
+            for alpha in range(3):
+                self.mu[:, alpha] = np.bincount(
+                    i, weights=dipole * self.pair_rvec[:, alpha],
+                    minlength=natoms)
 
-            for i in range(len(atoms)):  # this is the atom to be embedded
-                trace_energy -= np.sum(self.lam[i].trace() ** 2) / 6.
+            quadrupole = self.evaluate(self.q, (types_i, types_j), self.pair_r)
+            self.lam = np.zeros([natoms, 3, 3])
+            for alpha in range(3):
+                for beta in range(3):
+                    self.lam[:, alpha, beta] = np.bincount(
+                        i, weights=(quadrupole * self.pair_rvec[:, alpha] *
+                                    self.pair_rvec[:, beta]),
+                        minlength=natoms)
+
+            mu_energy = np.sum(self.mu ** 2) / 2.
+            lam_energy = np.sum(self.lam ** 2) / 2.
+            trace_energy = -np.sum(
+                self.lam.trace(axis1=1, axis2=2) ** 2) / 6.
 
             adp_result = dict(adp_mu=mu_energy,
                               adp_lam=lam_energy,
@@ -770,108 +858,71 @@ End EAM Interface Documentation
     def calculate_forces(self, atoms):
         # calculate the forces based on derivatives of the three EAM functions
 
-        self.update(atoms)
-        self.results['forces'] = np.zeros((len(atoms), 3))
-
-        for i in range(len(atoms)):  # this is the atom to be embedded
-            neighbors, offsets = self.neighbors.get_neighbors(i)
-            offset = np.dot(offsets, atoms.get_cell())
-            # create a vector of relative positions of neighbors
-            rvec = atoms.positions[neighbors] + offset - atoms.positions[i]
-            r = np.sqrt(np.sum(np.square(rvec), axis=1))
-            nearest = np.arange(len(r))[r < self.cutoff]
-
-            d_embedded_energy_i = self.d_embedded_energy[
-                self.index[i]](self.total_density[i])
-            urvec = rvec.copy()  # unit directional vector
-
-            for j in np.arange(len(neighbors)):
-                urvec[j] = urvec[j] / r[j]
-
-            for j_index in range(self.Nelements):
-                use = self.index[neighbors[nearest]] == j_index
-                if not use.any():
-                    continue
-                rnuse = r[nearest][use]
-                density_j = self.total_density[neighbors[nearest][use]]
-                if self.form == 'fs':
-                    scale = (self.d_phi[self.index[i], j_index](rnuse) +
-                             (d_embedded_energy_i *
-                              self.d_electron_density[j_index, self.index[i]](rnuse)) +
-                             (self.d_embedded_energy[j_index](density_j) *
-                              self.d_electron_density[self.index[i], j_index](rnuse)))
-                else:
-                    scale = (self.d_phi[self.index[i], j_index](rnuse) +
-                             (d_embedded_energy_i *
-                              self.d_electron_density[j_index](rnuse)) +
-                             (self.d_embedded_energy[j_index](density_j) *
-                              self.d_electron_density[self.index[i]](rnuse)))
-
-                self.results['forces'][i] += np.dot(scale, urvec[nearest][use])
-
-                if (self.form == 'adp'):
-                    adp_forces = self.angular_forces(
-                        self.mu[i],
-                        self.mu[neighbors[nearest][use]],
-                        self.lam[i],
-                        self.lam[neighbors[nearest][use]],
-                        rnuse,
-                        rvec[nearest][use],
-                        self.index[i],
-                        j_index)
-
-                    self.results['forces'][i] += adp_forces
-
-    def angular_forces(self, mu_i, mu, lam_i, lam, r, rvec, form1, form2):
-        # calculate the extra components for the adp forces
-        # rvec are the relative positions to atom i
-        psi = np.zeros(mu.shape)
-        for gamma in range(3):
-            term1 = (mu_i[gamma] - mu[:, gamma]) * self.d[form1][form2](r)
-
-            term2 = np.sum((mu_i - mu) *
-                           self.d_d[form1][form2](r)[:, np.newaxis] *
-                           (rvec * rvec[:, gamma][:, np.newaxis] /
-                            r[:, np.newaxis]), axis=1)
-
-            term3 = 2 * np.sum((lam_i[:, gamma] + lam[:, :, gamma]) *
-                               rvec * self.q[form1][form2](r)[:, np.newaxis],
-                               axis=1)
-            term4 = 0.0
-            for alpha in range(3):
-                for beta in range(3):
-                    rs = rvec[:, alpha] * rvec[:, beta] * rvec[:, gamma]
-                    term4 += ((lam_i[alpha, beta] + lam[:, alpha, beta]) *
-                              self.d_q[form1][form2](r) * rs) / r
-
-            term5 = ((lam_i.trace() + lam.trace(axis1=1, axis2=2)) *
-                     (self.d_q[form1][form2](r) * r +
-                      2 * self.q[form1][form2](r)) * rvec[:, gamma]) / 3.
+        i = self.pair_i
+        j = self.pair_j
+        types_i = self.index[i]
+        types_j = self.index[j]
+        r = self.pair_r
+        rvec = self.pair_rvec
 
-            # the minus for term5 is a correction on the adp
-            # formulation given in the 2005 Mishin Paper and is posted
-            # on the NIST website with the AlH potential
-            psi[:, gamma] = term1 + term2 + term3 + term4 - term5
+        d_embedded_energy = self.evaluate(self.d_embedded_energy,
+                                          (self.index,), self.total_density)
 
-        return np.sum(psi, axis=0)
+        if self.form == 'fs':
+            d_density_i = self.evaluate(self.d_electron_density,
+                                        (types_j, types_i), r)
+            d_density_j = self.evaluate(self.d_electron_density,
+                                        (types_i, types_j), r)
+        else:
+            d_density_i = self.evaluate(self.d_electron_density, (types_j,),
+                                        r)
+            d_density_j = self.evaluate(self.d_electron_density, (types_i,),
+                                        r)
 
-    def adp_dipole(self, r, rvec, d):
-        # calculate the dipole contribution
-        mu = np.sum((rvec * d(r)[:, np.newaxis]), axis=0)
+        scale = (self.evaluate(self.d_phi, (types_i, types_j), r) +
+                 d_embedded_energy[i] * d_density_i +
+                 d_embedded_energy[j] * d_density_j)
 
-        return mu  # sign to agree with lammps
+        # force on atom i from each pair, along the unit vector to atom j
+        pair_forces = (scale / r)[:, np.newaxis] * rvec
 
-    def adp_quadrupole(self, r, rvec, q):
-        # slow way of calculating the quadrupole contribution
-        r = np.sqrt(np.sum(rvec ** 2, axis=1))
+        if self.form == 'adp':
+            pair_forces += self.angular_forces(types_i, types_j)
 
-        lam = np.zeros([rvec.shape[0], 3, 3])
-        qr = q(r)
+        forces = np.zeros((len(atoms), 3))
         for alpha in range(3):
-            for beta in range(3):
-                lam[:, alpha, beta] += qr * rvec[:, alpha] * rvec[:, beta]
+            forces[:, alpha] = np.bincount(i, weights=pair_forces[:, alpha],
+                                           minlength=len(atoms))
+        self.results['forces'] = forces
 
-        return np.sum(lam, axis=0)
+    def angular_forces(self, types_i, types_j):
+        # calculate the extra components for the adp forces of all pairs
+        # rvec are the relative positions to atom i
+        i = self.pair_i
+        j = self.pair_j
+        r = self.pair_r
+        rvec = self.pair_rvec
+
+        d = self.evaluate(self.d, (types_i, types_j), r)
+        d_d = self.evaluate(self.d_d, (types_i, types_j), r)
+        q = self.evaluate(self.q, (types_i, types_j), r)
+        d_q = self.evaluate(self.d_q, (types_i, types_j), r)
+
+        mu = self.mu[i] - self.mu[j]
+        lam = self.lam[i] + self.lam[j]
+        trace = lam.trace(axis1=1, axis2=2)
+
+        term1 = mu * d[:, np.newaxis]
+        term2 = ((mu * rvec).sum(axis=1) * d_d / r)[:, np.newaxis] * rvec
+        term3 = 2 * np.einsum('nab,na->nb', lam, rvec) * q[:, np.newaxis]
+        term4 = (np.einsum('nab,na,nb->n', lam, rvec, rvec) *
+                 d_q / r)[:, np.newaxis] * rvec
+        term5 = (trace * (d_q * r + 2 * q))[:, np.newaxis] * rvec / 3.
+
+        # the minus for term5 is a correction on the adp
+        # formulation given in the 2005 Mishin Paper and is posted
+        # on the NIST website with the AlH potential
+        return term1 + term2 + term3 + term4 - term5
 
     def deriv(self, spline):
         """Wrapper for extracting the derivative from a spline"""
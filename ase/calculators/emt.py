@@ -1,13 +1,15 @@
 """Effective medium theory potential."""
 
-from math import sqrt, exp, log
+from math import sqrt, exp
 
 import numpy as np
 
+from ase.atoms import Atoms
 from ase.data import chemical_symbols, atomic_numbers
 from ase.units import Bohr
-from ase.neighborlist import NeighborList
+from ase.neighborlist import neighbor_list
 from ase.calculators.calculator import Calculator, all_changes
+from ase.calculators.calculator import PropertyNotImplementedError
 
 
 parameters = {
@@ -49,7 +51,7 @@ class EMT(Calculator):
     older EMT implementations, although the results are not
     bitwise identical.
     """
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'forces', 'stress']
 
     nolabel = True
 
@@ -113,13 +115,6 @@ class EMT(Calculator):
             for s2, p2 in self.par.items():
                 self.ksi[s1][s2] = p2['n0'] / p1['n0']
 
-        self.forces = np.empty((len(atoms), 3))
-        self.sigma1 = np.empty(len(atoms))
-        self.deds = np.empty(len(atoms))
-
-        self.nl = NeighborList([0.5 * self.rc_list] * len(atoms),
-                               self_interaction=False)
-
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
         Calculator.calculate(self, atoms, properties, system_changes)
@@ -127,91 +122,125 @@ class EMT(Calculator):
         if 'numbers' in system_changes:
             self.initialize(self.atoms)
 
-        positions = self.atoms.positions
-        numbers = self.atoms.numbers
-        cell = self.atoms.cell
-
-        self.nl.update(self.atoms)
-
-        self.energy = 0.0
-        self.sigma1[:] = 0.0
-        self.forces[:] = 0.0
-
-        natoms = len(self.atoms)
-
-        for a1 in range(natoms):
-            Z1 = numbers[a1]
-            p1 = self.par[Z1]
-            ksi = self.ksi[Z1]
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            offsets = np.dot(offsets, cell)
-            for a2, offset in zip(neighbors, offsets):
-                d = positions[a2] + offset - positions[a1]
-                r = sqrt(np.dot(d, d))
-                if r < self.rc_list:
-                    Z2 = numbers[a2]
-                    p2 = self.par[Z2]
-                    self.interact1(a1, a2, d, r, p1, p2, ksi[Z2])
-
-        for a in range(natoms):
-            Z = numbers[a]
-            p = self.par[Z]
-            try:
-                ds = -log(self.sigma1[a] / 12) / (beta * p['eta2'])
-            except (OverflowError, ValueError):
-                self.deds[a] = 0.0
-                self.energy -= p['E0']
-                continue
-            x = p['lambda'] * ds
-            y = exp(-x)
-            z = 6 * p['V0'] * exp(-p['kappa'] * ds)
-            self.deds[a] = ((x * y * p['E0'] * p['lambda'] + p['kappa'] * z) /
-                            (self.sigma1[a] * beta * p['eta2']))
-            self.energy += p['E0'] * ((1 + x) * y - 1) + z
-
-        for a1 in range(natoms):
-            Z1 = numbers[a1]
-            p1 = self.par[Z1]
-            ksi = self.ksi[Z1]
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            offsets = np.dot(offsets, cell)
-            for a2, offset in zip(neighbors, offsets):
-                d = positions[a2] + offset - positions[a1]
-                r = sqrt(np.dot(d, d))
-                if r < self.rc_list:
-                    Z2 = numbers[a2]
-                    p2 = self.par[Z2]
-                    self.interact2(a1, a2, d, r, p1, p2, ksi[Z2])
-
-        self.results['energy'] = self.energy
-        self.results['free_energy'] = self.energy
-        self.results['forces'] = self.forces
-
-    def interact1(self, a1, a2, d, r, p1, p2, ksi):
-        x = exp(self.acut * (r - self.rc))
-        theta = 1.0 / (1.0 + x)
-        y1 = (0.5 * p1['V0'] * exp(-p2['kappa'] * (r / beta - p2['s0'])) *
-              ksi / p1['gamma2'] * theta)
-        y2 = (0.5 * p2['V0'] * exp(-p1['kappa'] * (r / beta - p1['s0'])) /
-              ksi / p2['gamma2'] * theta)
-        self.energy -= y1 + y2
-        f = ((y1 * p2['kappa'] + y2 * p1['kappa']) / beta +
-             (y1 + y2) * self.acut * theta * x) * d / r
-        self.forces[a1] += f
-        self.forces[a2] -= f
-        self.sigma1[a1] += (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
-                            ksi * theta / p1['gamma1'])
-        self.sigma1[a2] += (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
-                            ksi * theta / p2['gamma1'])
-
-    def interact2(self, a1, a2, d, r, p1, p2, ksi):
-        x = exp(self.acut * (r - self.rc))
+        self.results.update(self.evaluate([self.atoms], properties)[0])
+        self.energy = self.results['energy']
+        self.forces = self.results['forces']
+
+    def calculate_batch(self, images, properties=['energy']):
+        Z = np.unique(np.concatenate([atoms.numbers for atoms in images]))
+        if self.parameters.asap_cutoff:
+            # The cutoff depends on the elements present.
+            if any(len(np.unique(atoms.numbers)) != len(Z)
+                   for atoms in images):
+                return Calculator.calculate_batch(self, images, properties)
+        self.reset()
+        self.initialize(Atoms(numbers=Z))
+        return self.evaluate(images, properties)
+
+    def evaluate(self, images, properties):
+        """Evaluate properties of all images in one pass.
+
+        The pair arrays of the images are concatenated, with atom indices
+        offset so that the images are treated as one system of
+        disconnected parts.  Returns a list of results dictionaries."""
+        if 'stress' in properties and any(
+                atoms.number_of_lattice_vectors != 3 for atoms in images):
+            raise PropertyNotImplementedError
+
+        nimages = len(images)
+        natoms_k = [len(atoms) for atoms in images]
+        offsets = np.cumsum([0] + natoms_k)
+        natoms = offsets[-1]
+        image_a = np.repeat(np.arange(nimages), natoms_k)
+
+        # Per-atom parameter arrays.
+        numbers = np.concatenate([atoms.numbers for atoms in images])
+        Z_u, index_i = np.unique(numbers, return_inverse=True)
+        p = dict((key, np.array([self.par[Z][key] for Z in Z_u])[index_i])
+                 for key in ['E0', 's0', 'V0', 'eta2', 'kappa', 'lambda',
+                             'n0', 'gamma1', 'gamma2'])
+
+        # Full neighbor list: every pair appears once for each direction.
+        # The contributions of a pair to atom i are evaluated for the
+        # (i, j) entry, those to atom j for the (j, i) entry.
+        i_n = []
+        j_n = []
+        r_n = []
+        d_n = []
+        for atoms, offset in zip(images, offsets):
+            i, j, r, d = neighbor_list('ijdD', atoms, self.rc_list,
+                                       method='linkedcell')
+            i_n.append(i + offset)
+            j_n.append(j + offset)
+            r_n.append(r)
+            d_n.append(d)
+        i = np.concatenate(i_n)
+        j = np.concatenate(j_n)
+        r = np.concatenate(r_n)
+        d = np.concatenate(d_n).reshape((-1, 3))
+        image_n = image_a[i]
+
+        x = np.exp(self.acut * (r - self.rc))
         theta = 1.0 / (1.0 + x)
-        y1 = (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
-              ksi / p1['gamma1'] * theta * self.deds[a1])
-        y2 = (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
-              ksi / p2['gamma1'] * theta * self.deds[a2])
-        f = ((y1 * p2['eta2'] + y2 * p1['eta2']) +
-             (y1 + y2) * self.acut * theta * x) * d / r
-        self.forces[a1] -= f
-        self.forces[a2] += f
+        ksi = p['n0'][j] / p['n0'][i]
+
+        # Pair part of the energy and the neighbor density sigma1.
+        y1 = (0.5 * p['V0'][i] *
+              np.exp(-p['kappa'][j] * (r / beta - p['s0'][j])) *
+              ksi / p['gamma2'][i] * theta)
+        energy_k = np.zeros(nimages)
+        energy_k -= np.bincount(image_n, weights=y1, minlength=nimages)
+        f = y1 * p['kappa'][j] / beta + y1 * self.acut * theta * x
+
+        density = (np.exp(-p['eta2'][j] * (r - beta * p['s0'][j])) *
+                   ksi * theta / p['gamma1'][i])
+        sigma1 = np.bincount(i, weights=density, minlength=natoms)
+
+        # Embedding energy. Atoms without neighbors contribute -E0.
+        deds = np.zeros(natoms)
+        embedding = -p['E0'].copy()
+        mask = sigma1 > 0.0
+        ds = -np.log(sigma1[mask] / 12) / (beta * p['eta2'][mask])
+        lam = p['lambda'][mask]
+        E0 = p['E0'][mask]
+        kappa = p['kappa'][mask]
+        x1 = lam * ds
+        y = np.exp(-x1)
+        z = 6 * p['V0'][mask] * np.exp(-kappa * ds)
+        deds[mask] = ((x1 * y * E0 * lam + kappa * z) /
+                      (sigma1[mask] * beta * p['eta2'][mask]))
+        embedding[mask] = E0 * ((1 + x1) * y - 1) + z
+        energy_k += np.bincount(image_a, weights=embedding,
+                                minlength=nimages)
+
+        y2 = density * deds[i]
+        f -= y2 * p['eta2'][j] + y2 * self.acut * theta * x
+
+        # f is the derivative of the energy with respect to the pair
+        # distance, so f * d / r is the force on atom i from this pair.
+        f_nc = (f / r)[:, np.newaxis] * d
+        forces = np.zeros((natoms, 3))
+        for c in range(3):
+            forces[:, c] = (np.bincount(i, weights=f_nc[:, c],
+                                        minlength=natoms) -
+                            np.bincount(j, weights=f_nc[:, c],
+                                        minlength=natoms))
+
+        if 'stress' in properties:
+            virial_kv = np.zeros((nimages, 9))
+            for c1 in range(3):
+                for c2 in range(3):
+                    virial_kv[:, 3 * c1 + c2] = np.bincount(
+                        image_n, weights=f_nc[:, c1] * d[:, c2],
+                        minlength=nimages)
+
+        results = []
+        for k, atoms in enumerate(images):
+            res = {'energy': energy_k[k],
+                   'free_energy': energy_k[k],
+                   'forces': forces[offsets[k]:offsets[k + 1]]}
+            if 'stress' in properties:
+                stress = virial_kv[k] / atoms.get_volume()
+                res['stress'] = stress[[0, 4, 8, 5, 2, 1]]
+            results.append(res)
+        return results
@@ -1,44 +1,43 @@
 import numpy as np
 
-from math import exp, sqrt
+from ase.calculators.pairpotential import PairPotential
 
-from ase.calculators.calculator import Calculator
 
-
-class MorsePotential(Calculator):
+class MorsePotential(PairPotential):
     """Morse potential.
 
     Default values chosen to be similar as Lennard-Jones.
+
+    epsilon: float
+        Depth of the potential well.
+    rho0: float
+        Dimensionless inverse width of the potential well.
+    r0: float
+        Equilibrium distance.
+    rc: float
+        Cutoff radius.  Default is 3 * r0.
+
+    See :class:`~ase.calculators.pairpotential.PairPotential` for the
+    *smooth* and *ro* parameters.
     """
 
-    implemented_properties = ['energy', 'forces']
     default_parameters = {'epsilon': 1.0,
                           'rho0': 6.0,
-                          'r0': 1.0}
-    nolabel = True
-
-    def __init__(self, **kwargs):
-        Calculator.__init__(self, **kwargs)
-
-    def calculate(self, atoms=None, properties=['energy'],
-                  system_changes=['positions', 'numbers', 'cell',
-                                  'pbc', 'charges', 'magmoms']):
-        Calculator.calculate(self, atoms, properties, system_changes)
+                          'r0': 1.0,
+                          'rc': None,
+                          'ro': None,
+                          'smooth': False}
+
+    def get_cutoff(self):
+        rc = self.parameters.rc
+        if rc is None:
+            rc = 3 * self.parameters.r0
+        return rc
+
+    def pair_energy(self, r):
         epsilon = self.parameters.epsilon
         rho0 = self.parameters.rho0
         r0 = self.parameters.r0
-        positions = self.atoms.get_positions()
-        energy = 0.0
-        forces = np.zeros((len(self.atoms), 3))
-        preF = 2 * epsilon * rho0 / r0
-        for i1, p1 in enumerate(positions):
-            for i2, p2 in enumerate(positions[:i1]):
-                diff = p2 - p1
-                r = sqrt(np.dot(diff, diff))
-                expf = exp(rho0 * (1.0 - r / r0))
-                energy += epsilon * expf * (expf - 2)
-                F = preF * expf * (expf - 1) * diff / r
-                forces[i1] -= F
-                forces[i2] += F
-        self.results['energy'] = energy
-        self.results['forces'] = forces
+        expf = np.exp(rho0 * (1.0 - r / r0))
+        return (epsilon * expf * (expf - 2),
+                -2 * epsilon * rho0 / r0 * expf * (expf - 1))
@@ -0,0 +1,141 @@
+"""Base class for pair potentials."""
+from __future__ import division
+
+import numpy as np
+
+from ase.neighborlist import neighbor_list
+from ase.constraints import full_3x3_to_voigt_6_stress
+from ase.calculators.calculator import Calculator, all_changes
+from ase.calculators.calculator import PropertyNotImplementedError
+
+
+def cutoff_function(r, ro, rc):
+    """Smooth cutoff function and its derivative.
+
+    Goes from 1 at *ro* to 0 at *rc* with vanishing derivative at both
+    ends."""
+    t = np.clip((r - ro) / (rc - ro), 0.0, 1.0)
+    fc = 1 - t**2 * (3 - 2 * t)
+    dfc = -6 * t * (1 - t) / (rc - ro)
+    return fc, dfc
+
+
+class PairPotential(Calculator):
+    """Base class for pair potentials.
+
+    The energy is a sum of pair terms over all pairs of atoms closer than
+    the cutoff radius *rc*.  Subclasses implement :meth:`pair_energy` and
+    :meth:`get_cutoff`; energies, forces and stress are evaluated on the
+    pair arrays of :func:`~ase.neighborlist.neighbor_list`.
+
+    Parameters common to all pair potentials:
+
+    rc: float
+        Cutoff radius.  Default is chosen by the subclass.
+    smooth: bool
+        If False (default), the pair energy is shifted so that it vanishes
+        at *rc*, but the forces are discontinuous at *rc*.  If True, the
+        pair energy is multiplied by a cutoff function going smoothly from
+        1 at *ro* to 0 at *rc*.
+    ro: float
+        Onset of the smooth cutoff function.  Default is 0.66 * rc.
+
+    Per-atom energies and stresses assign half of each pair term to each
+    of the two atoms.
+    """
+
+    implemented_properties = ['energy', 'energies', 'forces', 'stress',
+                              'stresses']
+    nolabel = True
+
+    def __init__(self, **kwargs):
+        Calculator.__init__(self, **kwargs)
+
+    def get_cutoff(self):
+        """Return cutoff radius."""
+        return self.parameters.rc
+
+    def pair_energy(self, r):
+        """Return pair energies and their derivatives for distances *r*."""
+        raise NotImplementedError
+
+    def calculate(self, atoms=None,
+                  properties=['energy'],
+                  system_changes=all_changes):
+        Calculator.calculate(self, atoms, properties, system_changes)
+        self.results.update(self.evaluate([self.atoms], properties)[0])
+
+    def calculate_batch(self, images, properties=['energy']):
+        return self.evaluate(images, properties)
+
+    def evaluate(self, images, properties):
+        """Evaluate properties of all images in one pass.
+
+        The pair arrays of the images are concatenated, with atom indices
+        offset so that the images are treated as one system of
+        disconnected parts.  Returns a list of results dictionaries."""
+        rc = self.get_cutoff()
+        stress = 'stress' in properties or 'stresses' in properties
+        if stress and any(atoms.number_of_lattice_vectors != 3
+                          for atoms in images):
+            raise PropertyNotImplementedError
+
+        offsets = np.cumsum([0] + [len(atoms) for atoms in images])
+        natoms = offsets[-1]
+
+        # Full neighbor lists: every pair appears once for each direction.
+        i_n = []
+        j_n = []
+        r_n = []
+        d_n = []
+        for atoms, offset in zip(images, offsets):
+            i, j, r, d = neighbor_list('ijdD', atoms, rc, method='linkedcell')
+            i_n.append(i + offset)
+            j_n.append(j + offset)
+            r_n.append(r)
+            d_n.append(d)
+        i = np.concatenate(i_n)
+        r = np.concatenate(r_n)
+        d = np.concatenate(d_n).reshape((-1, 3))
+
+        e, dedr = self.pair_energy(r)
+        if self.parameters.smooth:
+            ro = self.parameters.ro
+            if ro is None:
+                ro = 0.66 * rc
+            fc, dfc = cutoff_function(r, ro, rc)
+            dedr = dedr * fc + e * dfc
+            e = e * fc
+        else:
+            e = e - self.pair_energy(np.array([rc]))[0]
+
+        energies = 0.5 * np.bincount(i, weights=e, minlength=natoms)
+
+        # Force on atom i from its pair with atom j.  The reaction force on
+        # atom j is counted with the (j, i) entry.
+        f = (dedr / r)[:, np.newaxis] * d
+        forces = np.zeros((natoms, 3))
+        for c in range(3):
+            forces[:, c] = np.bincount(i, weights=f[:, c], minlength=natoms)
+
+        if stress:
+            virial = 0.5 * f[:, :, np.newaxis] * d[:, np.newaxis, :]
+            stresses = np.zeros((natoms, 3, 3))
+            for c1 in range(3):
+                for c2 in range(3):
+                    stresses[:, c1, c2] = np.bincount(
+                        i, weights=virial[:, c1, c2], minlength=natoms)
+
+        results = []
+        for atoms, a1, a2 in zip(images, offsets[:-1], offsets[1:]):
+            energy = energies[a1:a2].sum()
+            res = {'energy': energy,
+                   'energies': energies[a1:a2],
+                   'free_energy': energy,
+                   'forces': forces[a1:a2]}
+            if stress:
+                s = stresses[a1:a2] / atoms.get_volume()
+                res['stresses'] = full_3x3_to_voigt_6_stress(s)
+                res['stress'] = full_3x3_to_voigt_6_stress(s.sum(axis=0))
+            results.append(res)
+        return results
@@ -1,6 +1,8 @@
 from __future__ import print_function
 import os
 import socket
+import threading
+from collections import deque
 from subprocess import Popen
 
 import numpy as np
@@ -647,3 +649,69 @@ class SocketIOCalculator(Calculator):
 
     def __exit__(self, type, value, traceback):
         self.close()
+
+
+class SocketIOExecutor:
+    def __init__(self, calcs):
+        """Run calculations on several socket calculators at the same time.
+
+        This can be used as the executor of
+        :meth:`ase.vibrations.Vibrations.run` and
+        :meth:`ase.phonons.Phonons.run`.  The clients keep running
+        between calculations, so only new positions are sent for each
+        displaced structure.
+
+        Parameters:
+
+        calcs: list of SocketIOCalculator objects
+            One calculator for each client.
+
+        The calculators are closed together with the executor:
+
+        >>> calcs = [SocketIOCalculator(Espresso(...), unixsocket=name)
+        ...          for name in ['ipi0', 'ipi1']]
+        >>> with SocketIOExecutor(calcs) as executor:
+        ...     vib.run(executor=executor)"""
+
+        self.calcs = calcs
+
+    def map(self, fn, iterable):
+        """Return list of fn(args) for every args tuple in iterable.
+
+        The first element of each tuple is an Atoms object, which is
+        given one of the calculators that is not busy."""
+        jobs = deque(enumerate(iterable))
+        results = [None] * len(jobs)
+        errors = []
+
+        def run(calc):
+            while jobs and not errors:
+                try:
+                    i, args = jobs.popleft()
+                except IndexError:
+                    return
+                args[0].calc = calc
+                try:
+                    results[i] = fn(args)
+                except Exception as ex:
+                    errors.append(ex)
+
+        threads = [threading.Thread(target=run, args=(calc,))
+                   for calc in self.calcs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    def close(self):
+        for calc in self.calcs:
+            calc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
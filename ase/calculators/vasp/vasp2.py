@@ -110,6 +110,9 @@ class Vasp2(GenerateVaspInput, FileIOCalculator):
         # Store atoms objects from vasprun.xml here - None => uninitialized
         self._xml_data = None
 
+        # Lines read from OUTCAR so far, see load_outcar()
+        self._outcar = None
+
         label = os.path.join(directory, label)
 
         if restart is True:
@@ -261,6 +264,7 @@ class Vasp2(GenerateVaspInput, FileIOCalculator):
 
         self.check_cell()      # Check for zero-length lattice vectors
         self._xml_data = None     # Reset the stored data
+        self._outcar = None
 
         command = self.make_command(self.command)
         self.write_input(self.atoms, properties, system_changes)
@@ -428,8 +432,9 @@ class Vasp2(GenerateVaspInput, FileIOCalculator):
 
     def read_results(self):
         """Read the results from VASP output files"""
-        # Temporarily load OUTCAR into memory
-        outcar = self.load_file('OUTCAR')
+        # Load OUTCAR into memory.  Only the part written since the
+        # last call is read from the file.
+        outcar = self.load_outcar()
 
         # Read the data we can from vasprun.xml
         atoms_xml = self._read_from_xml()
@@ -526,6 +531,35 @@ class Vasp2(GenerateVaspInput, FileIOCalculator):
         with open(filename, 'r') as f:
             return f.readlines()
 
+    def load_outcar(self):
+        """Return the lines of OUTCAR.
+
+        The lines are kept between calls.  If OUTCAR is still the same
+        file and has only grown, e.g. while VASP is running, only the
+        appended lines are read.
+        """
+        filename = os.path.join(self.directory, 'OUTCAR')
+        stat = os.stat(filename)
+        key = (stat.st_dev, stat.st_ino)
+        with open(filename, 'rb') as f:
+            if self._outcar is not None:
+                oldkey, head, offset, lines = self._outcar
+                if (key != oldkey or stat.st_size < offset or
+                    f.read(len(head)) != head):
+                    # A new file
+                    self._outcar = None
+            if self._outcar is None:
+                head = f.read(1024)
+                offset = 0
+                lines = []
+            f.seek(offset)
+            data = f.read()
+        # Leave a partially written line for the next call:
+        end = data.rfind(b'\n') + 1
+        lines += data[:end].decode().splitlines(True)
+        self._outcar = (key, head, offset + end, lines)
+        return lines
+
     @contextmanager
     def load_file_iter(self, filename):
         """Return a file iterator"""
@@ -1,7 +1,12 @@
 from __future__ import print_function
 import os
 
-from ase.io import read, write
+from ase.io import iread, write
+from ase.io.formats import filetype
+
+# Formats whose write functions consume the images one at a time:
+STREAMING_FORMATS = {'traj', 'xyz', 'extxyz', 'db', 'postgresql'}
+DB_FORMATS = {'db', 'json', 'postgresql'}
 
 
 class CLICommand:
@@ -47,6 +52,8 @@ class CLICommand:
             help='Write output frames to individual files. '
             'Output file name should be a format string with '
             'a single integer field, e.g. out-{:0>5}.xyz')
+        add('-j', '--workers', type=int, default=1, metavar='N',
+            help='Parse xyz and extxyz input in N processes.')
 
     @staticmethod
     def run(args, parser):
@@ -61,34 +68,97 @@ class CLICommand:
             if args.verbose:
                 print('Filtering to include info: ', ', '.join(args.info))
 
-        configs = []
-        for filename in args.input:
-            atoms = read(filename, args.image_number, format=args.input_format)
-            if isinstance(atoms, list):
-                configs.extend(atoms)
-            else:
-                configs.append(atoms)
-
-        new_configs = []
-        for atoms in configs:
-            if args.arrays:
-                atoms.arrays = dict((k, atoms.arrays[k]) for k in args.arrays)
-            if args.info:
-                atoms.info = dict((k, atoms.info[k]) for k in args.info)
-            if args.exec_code:
-                # avoid exec() for Py 2+3 compat.
-                eval(compile(args.exec_code, '<string>', 'exec'))
-            if args.exec_file:
-                eval(compile(open(args.exec_file).read(), args.exec_file, 'exec'))
-            if  "_output" not in atoms.info or atoms.info["_output"]:
-                new_configs.append(atoms)
-        configs = new_configs
-
         if not args.force and os.path.isfile(args.output):
             parser.error('File already exists: {}'.format(args.output))
 
-        if args.split_output:
-            for i, atoms in enumerate(configs):
-                write(args.output.format(i), atoms, format=args.output_format)
-        else:
-            write(args.output, configs, format=args.output_format)
+        output_format = args.output_format
+        if output_format is None and args.output != '-':
+            output_format = filetype(args.output, read=False)
+
+        output = args.output
+        if is_input(output, args.input):
+            # Don't truncate a file that is still being read:
+            root, ext = os.path.splitext(output)
+            output = '{}.tmp{}{}'.format(root, os.getpid(), ext)
+        try:
+            convert(args, output, output_format)
+        except BaseException:
+            if output != args.output and os.path.exists(output):
+                os.remove(output)
+            raise
+        if output != args.output:
+            replace = getattr(os, 'replace', os.rename)  # Python 2
+            replace(output, args.output)
+
+
+def is_input(output, filenames):
+    """Check if output file is also one of the input files."""
+    if not os.path.isfile(output):
+        return False
+    return any(os.path.isfile(filename) and
+               os.path.samefile(filename, output)
+               for filename in filenames)
+
+
+def convert(args, output, output_format):
+    transform = args.arrays or args.info or args.exec_code or \
+        args.exec_file
+    if (not transform and not args.split_output and
+        output_format in DB_FORMATS and
+        all((args.input_format or filetype(filename)) in DB_FORMATS
+            for filename in args.input)):
+        copy_rows(args.input, output, output_format, args.image_number)
+        return
+
+    configs = read_configs(args.input, args.image_number,
+                           args.input_format, args.workers)
+    if transform:
+        configs = transform_configs(configs, args)
+
+    if args.split_output:
+        for i, atoms in enumerate(configs):
+            write(output.format(i), atoms, format=args.output_format)
+    elif output_format in STREAMING_FORMATS:
+        write(output, configs, format=output_format)
+    else:
+        write(output, list(configs), format=output_format)
+
+
+def read_configs(filenames, index, format, workers):
+    for filename in filenames:
+        for atoms in iread(filename, index, format=format, workers=workers):
+            yield atoms
+
+
+def transform_configs(configs, args):
+    if args.exec_code:
+        # avoid exec() for Py 2+3 compat.
+        code = compile(args.exec_code, '<string>', 'exec')
+    if args.exec_file:
+        code_file = compile(open(args.exec_file).read(), args.exec_file,
+                            'exec')
+    for atoms in configs:
+        if args.arrays:
+            atoms.arrays = dict((k, atoms.arrays[k]) for k in args.arrays)
+        if args.info:
+            atoms.info = dict((k, atoms.info[k]) for k in args.info)
+        if args.exec_code:
+            eval(code)
+        if args.exec_file:
+            eval(code_file)
+        if "_output" not in atoms.info or atoms.info["_output"]:
+            yield atoms
+
+
+def copy_rows(filenames, output, format, index):
+    """Copy rows between databases without creating Atoms objects.
+
+    Key-value pairs and data are copied too."""
+    import ase.db
+    from ase.io.db import select_rows
+
+    con = ase.db.connect(output, type=format, serial=True)
+    with con:
+        for filename in filenames:
+            db = ase.db.connect(filename, serial=True)
+            con.write_many(select_rows(db, index))
@@ -5,7 +5,6 @@ from ase.geometry import find_mic
 from ase.calculators.calculator import PropertyNotImplementedError
 
 import numpy as np
-from scipy.linalg import expm
 
 __all__ = ['FixCartesian', 'FixBondLength', 'FixedMode', 'FixConstraintSingle',
            'FixAtoms', 'UnitCellFilter', 'ExpCellFilter', 'FixScaled', 'StrainFilter',
@@ -1684,6 +1683,8 @@ class ExpCellFilter(UnitCellFilter):
         current deformation gradient.
         '''
 
+        from scipy.linalg import expm
+
         natoms = len(self.atoms)
         self.atom_positions[:] = new[:natoms]
         self.deform_grad_log = new[natoms:]
@@ -1710,6 +1711,8 @@ class ExpCellFilter(UnitCellFilter):
         computed from the stress tensor.
         '''
 
+        from scipy.linalg import expm
+
         atoms_forces = self.atoms.get_forces()
         stress = self.atoms.get_stress()
 
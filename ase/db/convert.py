@@ -31,7 +31,7 @@ def convert(name, opts):
                         kvp[key] = np.nan
 
             atoms = row.toatoms()
-            if opts.remove_constrints:
+            if opts.remove_constraints:
                 atoms.constraints = []
             con2.write(atoms, data=row.get('data'), **kvp)
 
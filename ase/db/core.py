@@ -119,7 +119,8 @@ def str_represents(value, t=int):
 
 
 def connect(name, type='extract_from_name', create_indices=True,
-            use_lock_file=True, append=True, serial=False):
+            use_lock_file=True, append=True, serial=False,
+            compress_data=False):
     """Create connection to database.
 
     name: str
@@ -133,6 +134,8 @@ def connect(name, type='extract_from_name', create_indices=True,
         You can turn this off if you know what you are doing ...
     append: bool
         Use append=False to start a new database.
+    compress_data: bool
+        Compress the data dicts of new rows (SQLite only).
     """
 
     if type == 'extract_from_name':
@@ -166,13 +169,36 @@ def connect(name, type='extract_from_name', create_indices=True,
     if type == 'db':
         from ase.db.sqlite import SQLite3Database
         return SQLite3Database(name, create_indices, use_lock_file,
-                               serial=serial)
+                               serial=serial, compress_data=compress_data)
     if type == 'postgresql':
         from ase.db.postgresql import PostgreSQLDatabase
         return PostgreSQLDatabase(name)
     raise ValueError('Unknown database type: ' + type)
 
 
+def sql_sort_key(sort):
+    """Translate 'age' and 'user' sort keys to SQL column names."""
+    if sort:
+        if sort == 'age':
+            sort = '-ctime'
+        elif sort == '-age':
+            sort = 'ctime'
+        elif sort.lstrip('-') == 'user':
+            sort += 'name'
+    return sort
+
+
+def column_array(column, values):
+    """Convert list of values from select_columns() to array.
+
+    None becomes NaN for numbers."""
+    if column in ['id', 'natoms']:
+        return np.array(values, int)
+    if any(isinstance(value, basestring) for value in values):
+        return np.array(values, object)
+    return np.array(values, float)
+
+
 def lock(method):
     """Decorator for using a lock-file."""
     @functools.wraps(method)
@@ -330,6 +356,39 @@ class Database:
         check(key_value_pairs)
         return 1
 
+    @parallel_function
+    @lock
+    def write_many(self, images, key_value_pairs={}, batch_size=1000):
+        """Write many rows in one go.
+
+        images: iterable of Atoms or AtomsRow objects
+            Key-value pairs and data of AtomsRow objects are written too.
+        key_value_pairs: dict
+            Key-value pairs added to all rows.
+        batch_size: int
+            Number of rows to insert at a time.
+
+        All rows are written in a single transaction, which is much
+        faster than calling write() for each row.
+
+        Returns list of integer ids of the new rows.
+        """
+        return self._write_many(images, key_value_pairs, batch_size)
+
+    def _write_many(self, images, key_value_pairs, batch_size):
+        ids = []
+        for atoms in images:
+            kvp = self._key_value_pairs(atoms, key_value_pairs)
+            ids.append(self._write(atoms, kvp, {}, None))
+        return ids
+
+    def _key_value_pairs(self, atoms, key_value_pairs):
+        if isinstance(atoms, AtomsRow):
+            kvp = atoms.key_value_pairs
+            kvp.update(key_value_pairs)
+            return kvp
+        return dict(key_value_pairs)
+
     @parallel_function
     @lock
     def reserve(self, **key_value_pairs):
@@ -451,14 +510,7 @@ class Database:
             queries can be speeded up by setting columns=['id', 'energy'].
         """
 
-        if sort:
-            if sort == 'age':
-                sort = '-ctime'
-            elif sort == '-age':
-                sort = 'ctime'
-            elif sort.lstrip('-') == 'user':
-                sort += 'name'
-
+        sort = sql_sort_key(sort)
         keys, cmps = parse_selection(selection, **kwargs)
         for row in self._select(keys, cmps, explain=explain,
                                 verbosity=verbosity,
@@ -468,6 +520,37 @@ class Database:
             if filter is None or filter(row):
                 yield row
 
+    @parallel_function
+    def select_columns(self, selection=None, columns=['id'], limit=None,
+                       offset=0, sort=None, **kwargs):
+        """Read columns of the selected rows into NumPy arrays.
+
+        columns: list of str
+            Names of scalar columns (id, energy, fmax, natoms, ...)
+            and/or keys of key-value pairs.
+
+        Returns dict mapping column names to arrays.  Numbers are
+        float arrays (id and natoms are int arrays) with NaN for rows
+        that don't have the key.  Strings are object arrays with None
+        for missing values.  See the select() method for the selection
+        syntax and the limit, offset and sort arguments.
+
+        >>> c = db.select_columns('relaxed', ['energy', 'natoms', 'gap'])
+        >>> energy_per_atom = c['energy'] / c['natoms']
+        """
+        sort = sql_sort_key(sort)
+        keys, cmps = parse_selection(selection, **kwargs)
+        return self._select_columns(keys, cmps, columns, limit, offset, sort)
+
+    def _select_columns(self, keys, cmps, columns, limit, offset, sort):
+        values = [[] for column in columns]
+        for row in self._select(keys, cmps, limit=limit, offset=offset,
+                                sort=sort, include_data=False):
+            for column, lst in zip(columns, values):
+                lst.append(row.get(column))
+        return dict((column, column_array(column, lst))
+                    for column, lst in zip(columns, values))
+
     def count(self, selection=None, **kwargs):
         """Count rows.
 
@@ -4,7 +4,7 @@ import sys
 
 import numpy as np
 
-from ase.db.core import Database, ops, lock, now
+from ase.db.core import Database, ops, lock, now, check
 from ase.db.row import AtomsRow
 from ase.io.jsonio import encode, decode
 from ase.parallel import world, parallel_function
@@ -21,6 +21,40 @@ class JSONDatabase(Database, object):
     def _write(self, atoms, key_value_pairs, data, id):
         Database._write(self, atoms, key_value_pairs, data)
 
+        bigdct, ids, nextid = self._read_or_create()
+
+        dct = self._row_dict(atoms, key_value_pairs, data)
+
+        if id is None:
+            id = nextid
+            ids.append(id)
+            nextid += 1
+        else:
+            assert id in bigdct
+
+        bigdct[id] = dct
+        self._write_json(bigdct, ids, nextid)
+        return id
+
+    def _write_many(self, images, key_value_pairs, batch_size):
+        check(key_value_pairs)
+
+        bigdct, ids, nextid = self._read_or_create()
+
+        newids = []
+        for atoms in images:
+            kvp = self._key_value_pairs(atoms, key_value_pairs)
+            check(kvp)
+            data = atoms.data if isinstance(atoms, AtomsRow) else None
+            bigdct[nextid] = self._row_dict(atoms, kvp, data)
+            newids.append(nextid)
+            nextid += 1
+
+        ids += newids
+        self._write_json(bigdct, ids, nextid)
+        return newids
+
+    def _read_or_create(self):
         bigdct = {}
         ids = []
         nextid = 1
@@ -32,6 +66,9 @@ class JSONDatabase(Database, object):
             except (SyntaxError, ValueError):
                 pass
 
+        return bigdct, ids, nextid
+
+    def _row_dict(self, atoms, key_value_pairs, data):
         mtime = now()
 
         if isinstance(atoms, AtomsRow):
@@ -42,8 +79,8 @@ class JSONDatabase(Database, object):
             row.user = os.getenv('USER')
 
         dct = {}
-        for key in row.__dict__:
-            if key[0] == '_' or key in row._keys or key == 'id':
+        for key in row:
+            if key in row._keys or key == 'id':
                 continue
             dct[key] = row[key]
 
@@ -59,16 +96,7 @@ class JSONDatabase(Database, object):
         if constraints:
             dct['constraints'] = constraints
 
-        if id is None:
-            id = nextid
-            ids.append(id)
-            nextid += 1
-        else:
-            assert id in bigdct
-
-        bigdct[id] = dct
-        self._write_json(bigdct, ids, nextid)
-        return id
+        return dct
 
     def _read_json(self):
         if isinstance(self.filename, basestring):
@@ -1,9 +1,11 @@
 import json
+from itertools import count
 
 import numpy as np
 from psycopg2 import connect
 from psycopg2.extras import execute_values
 
+from ase.db.core import Database
 from ase.db.sqlite import (init_statements, index_statements, VERSION,
                            SQLite3Database)
 import ase.io.jsonio
@@ -12,6 +14,9 @@ jsonb_indices = [
     'CREATE INDEX idxkeys ON systems USING GIN (key_value_pairs);',
     'CREATE INDEX idxcalc ON systems USING GIN (calculator_parameters);']
 
+# Numbers for naming server-side cursors:
+cursor_numbers = count()
+
 
 def remove_nan_and_inf(obj):
     if isinstance(obj, float) and not np.isfinite(obj):
@@ -37,8 +42,8 @@ class Connection:
     def __init__(self, con):
         self.con = con
 
-    def cursor(self):
-        return Cursor(self.con.cursor())
+    def cursor(self, name=None):
+        return Cursor(self.con.cursor(name))
 
     def commit(self):
         self.con.commit()
@@ -46,6 +51,10 @@ class Connection:
     def close(self):
         self.con.close()
 
+    @property
+    def closed(self):
+        return self.con.closed
+
 
 class Cursor:
     def __init__(self, cur):
@@ -57,6 +66,12 @@ class Cursor:
     def fetchall(self):
         return self.cur.fetchall()
 
+    def fetchmany(self, size):
+        return self.cur.fetchmany(size)
+
+    def close(self):
+        self.cur.close()
+
     def execute(self, statement, *args):
         self.cur.execute(statement.replace('?', '%s'), *args)
 
@@ -149,6 +164,38 @@ class PostgreSQLDatabase(SQLite3Database):
 
         self.initialized = True
 
+    def _fetch_rows(self, con, statement, what):
+        # A named cursor keeps the result on the server, which sends
+        # fetchsize rows at a time.  Readers don't block writers in
+        # PostgreSQL, so the statement can stay open while looping.
+        # Each cursor needs its own name, as selections can be nested:
+        sql, args = statement(what)
+        cur = con.cursor(name='ase_select_{}'.format(next(cursor_numbers)))
+        try:
+            cur.execute(sql, args)
+            while True:
+                rows = cur.fetchmany(self.fetchsize)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            if not con.closed:
+                cur.close()
+
+    def _select_columns(self, keys, cmps, columns, limit, offset, sort):
+        # The join used for SQLite relies on LIMIT -1 and on COALESCE
+        # accepting both text and numbers:
+        return Database._select_columns(self, keys, cmps, columns,
+                                        limit, offset, sort)
+
+    def _insert_systems(self, cur, values):
+        # Other clients may take ids from the sequence at the same time:
+        q = 'DEFAULT, ' + ', '.join('?' * len(values[0]))
+        cur.executemany('INSERT INTO systems VALUES ({}) RETURNING id'
+                        .format(q), values)
+        return [id for id, in cur.fetchall()]
+
     def get_last_id(self, cur):
         cur.execute('SELECT last_value FROM systems_id_seq')
         id = cur.fetchone()[0]
@@ -178,6 +225,8 @@ def schema_update(sql):
     for column in arrays_2D:
         sql = sql.replace('{} BLOB,'.format(column),
                           '{} DOUBLE PRECISION[][],'.format(column))
+    sql = sql.replace('data BLOB,', 'data TEXT,')  # stored as JSONB
+
     for column in txt2jsonb:
         sql = sql.replace('{} TEXT,'.format(column),
                           '{} JSONB,'.format(column))
@@ -8,7 +8,7 @@ from ase.calculators.calculator import get_calculator, all_properties
 from ase.calculators.calculator import PropertyNotImplementedError
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.data import chemical_symbols, atomic_masses
-from ase.io.jsonio import decode
+from ase.io.jsonio import decode, decode_binary
 from ase.utils import formula_metal, basestring
 
 
@@ -62,7 +62,12 @@ def atoms2dict(atoms):
 
 
 class AtomsRow:
-    def __init__(self, dct):
+    def __init__(self, dct, lazy=None):
+        """Row from dict or Atoms object.
+
+        lazy: dict
+            Values that are decoded when first needed.  Maps keys to
+            tuples of a function and its arguments."""
         if isinstance(dct, dict):
             dct = dct.copy()
             if 'calculator_parameters' in dct:
@@ -79,17 +84,42 @@ class AtomsRow:
         self._data = dct.pop('data', {})
         kvp = dct.pop('key_value_pairs', {})
         self._keys = list(kvp.keys())
+        self._lazy = lazy or {}
         self.__dict__.update(kvp)
         self.__dict__.update(dct)
-        if 'cell' not in dct:
+        if 'cell' not in self:
             self.cell = np.zeros((3, 3))
             self.pbc = np.zeros(3, bool)
 
+    def __getattr__(self, key):
+        # Only called when normal lookup fails: decode lazy value
+        lazy = self.__dict__.get('_lazy')
+        if lazy and key in lazy:
+            args = lazy.pop(key)
+            value = args[0](*args[1:])
+            self.__dict__[key] = value
+            return value
+        raise AttributeError(key)
+
+    def __getstate__(self):
+        # Decode lazy values first: the functions that decode them may
+        # belong to a database with an open connection.
+        for key in list(self._lazy):
+            getattr(self, key)
+        if not isinstance(self._data, (dict, basestring, bytes)):
+            self.data  # buffer objects can't be pickled
+        return self.__dict__
+
     def __contains__(self, key):
-        return key in self.__dict__
+        return key in self.__dict__ or key in self._lazy
 
     def __iter__(self):
-        return (key for key in self.__dict__ if key[0] != '_')
+        for key in list(self.__dict__):
+            if key[0] != '_':
+                yield key
+        for key in list(self._lazy):
+            if key not in self.__dict__:
+                yield key
 
     def get(self, key, default=None):
         """Return value of key if present or default if not."""
@@ -140,8 +170,10 @@ class AtomsRow:
     @property
     def data(self):
         """Data dict."""
-        if not isinstance(self._data, dict):
+        if isinstance(self._data, basestring):
             self._data = decode(self._data)  # lazy decoding
+        elif not isinstance(self._data, dict):
+            self._data = decode_binary(self._data)
         return FancyDict(self._data)
 
     @property
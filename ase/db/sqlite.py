@@ -11,6 +11,7 @@ Versions:
 6) Use REAL for magmom and drop possibility for non-collinear spin
 7) Volume can be None
 8) Added name='metadata' row to "information" table
+9) Store arrays in data as binary blobs
 """
 
 from __future__ import absolute_import, print_function
@@ -19,20 +20,24 @@ import numbers
 import os
 import sqlite3
 import sys
+from itertools import islice
 
 import numpy as np
 
 import ase.io.jsonio
+from ase.io.jsonio import encode_binary, decode_binary
 from ase.data import atomic_numbers
 from ase.db.row import AtomsRow
-from ase.db.core import Database, ops, now, lock, invop, parse_selection
+from ase.db.core import (Database, ops, now, lock, invop,
+                         parse_selection, check, column_array,
+                         reserved_keys)
 from ase.parallel import parallel_function
 from ase.utils import basestring
 
 if sys.version >= '3':
     buffer = memoryview
 
-VERSION = 8
+VERSION = 9
 
 init_statements = [
     """CREATE TABLE systems (
@@ -61,8 +66,8 @@ init_statements = [
     magmoms BLOB,
     magmom REAL,
     charges BLOB,
-    key_value_pairs TEXT,  -- key-value pairs and data as json
-    data TEXT,
+    key_value_pairs TEXT,  -- key-value pairs as json
+    data BLOB,  -- json with arrays in binary form (json text before v9)
     natoms INTEGER,  -- stuff for making queries faster
     fmax REAL,
     smax REAL,
@@ -112,6 +117,11 @@ index_statements = [
 all_tables = ['systems', 'species', 'keys',
               'text_key_values', 'number_key_values']
 
+# Columns of the systems table with numbers and strings:
+sql_columns = ['id', 'unique_id', 'ctime', 'mtime', 'username',
+               'calculator', 'energy', 'free_energy', 'magmom', 'natoms',
+               'fmax', 'smax', 'volume', 'mass', 'charge']
+
 
 def float_if_not_none(x):
     """Convert numpy.float64 to float - old db-interfaces need that."""
@@ -126,9 +136,16 @@ class SQLite3Database(Database, object):
     default = 'NULL'  # used for autoincrement id
     connection = None
     version = None
+    fetchsize = 1000  # number of rows read at a time by select()
     columnnames = [line.split()[0].lstrip()
                    for line in init_statements[0].splitlines()[1:]]
 
+    def __init__(self, filename=None, create_indices=True,
+                 use_lock_file=False, serial=False, compress_data=False):
+        Database.__init__(self, filename, create_indices, use_lock_file,
+                          serial)
+        self.compress_data = compress_data
+
     def encode(self, obj):
         return ase.io.jsonio.encode(obj)
 
@@ -164,6 +181,25 @@ class SQLite3Database(Database, object):
             array.shape = shape
         return array
 
+    def encode_data(self, data):
+        """Convert data dict to what is stored in the data column.
+
+        Arrays are stored in binary form (zlib compressed if
+        compress_data is True).  Files older than version 9 store JSON
+        text.  The undecoded data of a row read from a database can also
+        be given."""
+        if self.version < 9 or self.type == 'postgresql':
+            if isinstance(data, basestring):
+                return data
+            if not isinstance(data, dict):
+                data = decode_binary(data)
+            return self.encode(data)
+        if isinstance(data, basestring):
+            data = ase.io.jsonio.decode(data)
+        elif not isinstance(data, dict):
+            return data
+        return buffer(encode_binary(data, self.compress_data))
+
     def _connect(self):
         return sqlite3.connect(self.filename, timeout=600)
 
@@ -230,7 +266,6 @@ class SQLite3Database(Database, object):
 
     def _write(self, atoms, key_value_pairs, data, id):
         Database._write(self, atoms, key_value_pairs, data)
-        encode = self.encode
 
         con = self.connection or self._connect()
         self._initialize(con)
@@ -238,24 +273,83 @@ class SQLite3Database(Database, object):
 
         mtime = now()
 
-        blob = self.blob
+        row = self._make_row(atoms, mtime)
 
-        text_key_values = []
-        number_key_values = []
+        if id:
+            self._delete(cur, [id], ['keys', 'text_key_values',
+                                     'number_key_values', 'species'])
+        else:
+            if not key_value_pairs:
+                key_value_pairs = row.key_value_pairs
+
+        values = self._systems_values(row, key_value_pairs, data, mtime)
+
+        if id is None:
+            id = self._insert_systems(cur, [values])[0]
+        else:
+            q = ', '.join(name + '=?' for name in self.columnnames[1:])
+            cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
+                        values + (id,))
+
+        tables = self._index_values(row, key_value_pairs, id)
+        self._insert_index_values(cur, *tables)
+
+        if self.connection is None:
+            con.commit()
+            con.close()
 
+        return id
+
+    def _write_many(self, images, key_value_pairs, batch_size):
+        check(key_value_pairs)
+
+        con = self.connection or self._connect()
+        self._initialize(con)
+        cur = con.cursor()
+
+        ids = []
+        images = iter(images)
+        while True:
+            batch = []
+            for atoms in islice(images, batch_size):
+                kvp = self._key_value_pairs(atoms, key_value_pairs)
+                check(kvp)
+                mtime = now()
+                batch.append((self._make_row(atoms, mtime), kvp, mtime))
+            if not batch:
+                break
+
+            values = [self._systems_values(row, kvp, None, mtime)
+                      for row, kvp, mtime in batch]
+            batchids = self._insert_systems(cur, values)
+
+            tables = ([], [], [], [])
+            for (row, kvp, mtime), id in zip(batch, batchids):
+                for table, more in zip(tables,
+                                       self._index_values(row, kvp, id)):
+                    table.extend(more)
+            self._insert_index_values(cur, *tables)
+            ids += batchids
+
+        if self.connection is None:
+            con.commit()
+            con.close()
+
+        return ids
+
+    def _make_row(self, atoms, mtime):
         if not isinstance(atoms, AtomsRow):
             row = AtomsRow(atoms)
             row.ctime = mtime
             row.user = os.getenv('USER')
         else:
             row = atoms
+        return row
 
-        if id:
-            self._delete(cur, [id], ['keys', 'text_key_values',
-                                     'number_key_values', 'species'])
-        else:
-            if not key_value_pairs:
-                key_value_pairs = row.key_value_pairs
+    def _systems_values(self, row, key_value_pairs, data, mtime):
+        """Values for the columns of the systems table (except id)."""
+        encode = self.encode
+        blob = self.blob
 
         constraints = row._constraints
         if constraints:
@@ -286,8 +380,7 @@ class SQLite3Database(Database, object):
 
         if not data:
             data = row._data
-        if not isinstance(data, basestring):
-            data = encode(data)
+        data = self.encode_data(data)
 
         values += (row.get('energy'),
                    row.get('free_energy'),
@@ -305,23 +398,20 @@ class SQLite3Database(Database, object):
                    float_if_not_none(row.get('volume')),
                    float(row.mass),
                    float(row.charge))
+        return values
 
-        if id is None:
-            q = self.default + ', ' + ', '.join('?' * len(values))
-            cur.execute('INSERT INTO systems VALUES ({})'.format(q),
-                        values)
-            id = self.get_last_id(cur)
-        else:
-            q = ', '.join(name + '=?' for name in self.columnnames[1:])
-            cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
-                        values + (id,))
+    def _insert_systems(self, cur, values):
+        """Insert rows into the systems table and return their ids."""
+        q = self.default + ', ' + ', '.join('?' * len(values[0]))
+        cur.executemany('INSERT INTO systems VALUES ({})'.format(q), values)
+        # We hold the write lock, so the new ids are consecutive:
+        id = self.get_last_id(cur)
+        return list(range(id - len(values) + 1, id + 1))
 
-        count = row.count_atoms()
-        if count:
-            species = [(atomic_numbers[symbol], n, id)
-                       for symbol, n in count.items()]
-            cur.executemany('INSERT INTO species VALUES (?, ?, ?)',
-                            species)
+    def _index_values(self, row, key_value_pairs, id):
+        """Rows for the species, keys and key-value tables."""
+        species = [(atomic_numbers[symbol], n, id)
+                   for symbol, n in row.count_atoms().items()]
 
         text_key_values = []
         number_key_values = []
@@ -332,18 +422,18 @@ class SQLite3Database(Database, object):
                 assert isinstance(value, basestring)
                 text_key_values.append([key, value, id])
 
+        keys = [(key, id) for key in key_value_pairs]
+        return species, text_key_values, number_key_values, keys
+
+    def _insert_index_values(self, cur, species, text_key_values,
+                             number_key_values, keys):
+        cur.executemany('INSERT INTO species VALUES (?, ?, ?)',
+                        species)
         cur.executemany('INSERT INTO text_key_values VALUES (?, ?, ?)',
                         text_key_values)
         cur.executemany('INSERT INTO number_key_values VALUES (?, ?, ?)',
                         number_key_values)
-        cur.executemany('INSERT INTO keys VALUES (?, ?)',
-                        [(key, id) for key in key_value_pairs])
-
-        if self.connection is None:
-            con.commit()
-            con.close()
-
-        return id
+        cur.executemany('INSERT INTO keys VALUES (?, ?)', keys)
 
     def get_last_id(self, cur):
         cur.execute('SELECT seq FROM sqlite_sequence WHERE name="systems"')
@@ -379,50 +469,65 @@ class SQLite3Database(Database, object):
                'ctime': values[2],
                'mtime': values[3],
                'user': values[4],
-               'numbers': deblob(values[5], np.int32),
-               'positions': deblob(values[6], shape=(-1, 3)),
-               'cell': deblob(values[7], shape=(3, 3))}
+               'numbers': deblob(values[5], np.int32)}
+
+        # Arrays and calculator parameters are decoded by the row
+        # when they are first used:
+        lazy = {'positions': (deblob, values[6], float, (-1, 3)),
+                'cell': (deblob, values[7], float, (3, 3))}
 
         if values[8] is not None:
             dct['pbc'] = (values[8] & np.array([1, 2, 4])).astype(bool)
         if values[9] is not None:
-            dct['initial_magmoms'] = deblob(values[9])
+            lazy['initial_magmoms'] = (deblob, values[9])
         if values[10] is not None:
-            dct['initial_charges'] = deblob(values[10])
+            lazy['initial_charges'] = (deblob, values[10])
         if values[11] is not None:
-            dct['masses'] = deblob(values[11])
+            lazy['masses'] = (deblob, values[11])
         if values[12] is not None:
-            dct['tags'] = deblob(values[12], np.int32)
+            lazy['tags'] = (deblob, values[12], np.int32)
         if values[13] is not None:
-            dct['momenta'] = deblob(values[13], shape=(-1, 3))
+            lazy['momenta'] = (deblob, values[13], float, (-1, 3))
         if values[14] is not None:
             dct['constraints'] = values[14]
         if values[15] is not None:
             dct['calculator'] = values[15]
         if values[16] is not None:
-            dct['calculator_parameters'] = decode(values[16])
+            lazy['calculator_parameters'] = (self._decode_parameters,
+                                             values[16])
         if values[17] is not None:
             dct['energy'] = values[17]
         if values[18] is not None:
             dct['free_energy'] = values[18]
         if values[19] is not None:
-            dct['forces'] = deblob(values[19], shape=(-1, 3))
+            lazy['forces'] = (deblob, values[19], float, (-1, 3))
         if values[20] is not None:
-            dct['stress'] = deblob(values[20])
+            lazy['stress'] = (deblob, values[20])
         if values[21] is not None:
-            dct['dipole'] = deblob(values[21])
+            lazy['dipole'] = (deblob, values[21])
         if values[22] is not None:
-            dct['magmoms'] = deblob(values[22])
+            lazy['magmoms'] = (deblob, values[22])
         if values[23] is not None:
             dct['magmom'] = values[23]
         if values[24] is not None:
-            dct['charges'] = deblob(values[24])
+            lazy['charges'] = (deblob, values[24])
         if values[25] != '{}':
             dct['key_value_pairs'] = decode(values[25])
         if len(values) >= 27 and values[26] != 'null':
-            dct['data'] = decode(values[26])
+            if self.type == 'postgresql':
+                dct['data'] = decode(values[26])
+            else:
+                dct['data'] = values[26]  # decoded when row.data is used
 
-        return AtomsRow(dct)
+        return AtomsRow(dct, lazy)
+
+    def _decode_parameters(self, obj):
+        params = self.decode(obj)
+        # Earlier version of ASE would encode the calculator
+        # parameter dict again and again and again ...
+        while isinstance(params, basestring):
+            params = self.decode(params)
+        return params
 
     def _old2new(self, values):
         if self.type == 'postgresql':
@@ -439,10 +544,11 @@ class SQLite3Database(Database, object):
 
     def create_select_statement(self, keys, cmps,
                                 sort=None, order=None, sort_table=None,
-                                what='systems.*'):
-        tables = ['systems']
+                                what='systems.*', joins=[]):
+        # joins: list of (sql, arg) tuples joined onto the systems table
+        tables = [' '.join(['systems'] + [join for join, arg in joins])]
         where = []
-        args = []
+        args = [arg for join, arg in joins]
         for key in keys:
             if key == 'forces':
                 where.append('systems.fmax IS NOT NULL')
@@ -518,7 +624,9 @@ class SQLite3Database(Database, object):
                 args += [key, float(value)]
 
         if sort:
-            if sort_table != 'systems':
+            if sort_table is None:
+                pass  # sort is an SQL expression
+            elif sort_table != 'systems':
                 tables.append('{} AS sort_table'.format(sort_table))
                 where.append('systems.id=sort_table.id AND '
                              'sort_table.key=?')
@@ -530,9 +638,10 @@ class SQLite3Database(Database, object):
         if where:
             sql += '\n  WHERE\n  ' + ' AND\n  '.join(where)
         if sort:
+            if sort_table is not None:
+                sort = '{}.{}'.format(sort_table, sort)
             # XXX use "?" instead of "{}"
-            sql += '\nORDER BY {0}.{1} IS NULL, {0}.{1} {2}'.format(
-                sort_table, sort, order)
+            sql += '\nORDER BY {0} IS NULL, {0} {1}'.format(sort, order)
 
         return sql, args
 
@@ -542,15 +651,12 @@ class SQLite3Database(Database, object):
         con = self._connect()
         self._initialize(con)
 
-        values = np.array([None for i in range(27)])
-        values[25] = '{}'
-        values[26] = 'null'
-
         if columns == 'all':
             columnindex = list(range(26))
         else:
+            # The id is always needed for reading the rows in batches:
             columnindex = [c for c in range(0, 26)
-                           if self.columnnames[c] in columns]
+                           if c == 0 or self.columnnames[c] in columns]
         if include_data:
             columnindex.append(26)
 
@@ -581,49 +687,156 @@ class SQLite3Database(Database, object):
             order = None
             sort_table = None
 
-        what = ', '.join('systems.' + name
-                         for name in
-                         np.array(self.columnnames)[np.array(columnindex)])
+        what = ', '.join('systems.' + self.columnnames[c]
+                         for c in columnindex)
 
-        sql, args = self.create_select_statement(keys, cmps, sort, order,
-                                                 sort_table, what)
+        def statement(what):
+            sql, args = self.create_select_statement(keys, cmps, sort, order,
+                                                     sort_table, what)
+            if explain:
+                sql = 'EXPLAIN QUERY PLAN ' + sql
 
-        if explain:
-            sql = 'EXPLAIN QUERY PLAN ' + sql
+            if limit:
+                sql += '\nLIMIT {0}'.format(limit)
 
-        if limit:
-            sql += '\nLIMIT {0}'.format(limit)
+            if offset:
+                sql += '\nOFFSET {0}'.format(offset)
 
-        if offset:
-            sql += '\nOFFSET {0}'.format(offset)
+            if verbosity == 2:
+                print(sql, args)
 
-        if verbosity == 2:
-            print(sql, args)
+            return sql, args
 
-        cur = con.cursor()
-        cur.execute(sql, args)
         if explain:
+            cur = con.cursor()
+            cur.execute(*statement(what))
             for row in cur.fetchall():
                 yield {'explain': row}
+            return
+
+        if columnindex == list(range(27)):
+            def convert(shortvalues):
+                return shortvalues
         else:
-            n = 0
-            for shortvalues in cur.fetchall():
-                values[columnindex] = shortvalues
-                yield self._convert_tuple_to_row(tuple(values))
-                n += 1
-
-            if sort and sort_table != 'systems':
-                # Yield rows without sort key last:
-                if limit is not None:
-                    if n == limit:
-                        return
-                    limit -= n
-                for row in self._select(keys + ['-' + sort], cmps,
-                                        limit=limit, offset=offset,
-                                        include_data=include_data,
-                                        columns=columns):
+            def convert(shortvalues):
+                values = [None] * 27
+                values[25] = '{}'
+                values[26] = 'null'
+                for c, value in zip(columnindex, shortvalues):
+                    values[c] = value
+                return tuple(values)
+
+        n = 0
+        for shortvalues in self._fetch_rows(con, statement, what):
+            yield self._convert_tuple_to_row(convert(shortvalues))
+            n += 1
+
+        if sort and sort_table != 'systems':
+            # Yield rows without sort key last:
+            if limit is not None:
+                if n == limit:
+                    return
+                limit -= n
+            for row in self._select(keys + ['-' + sort], cmps,
+                                    limit=limit, offset=offset,
+                                    include_data=include_data,
+                                    columns=columns):
+                yield row
+
+    def _fetch_rows(self, con, statement, what):
+        """Yield the selected rows as tuples, fetchsize rows at a time.
+
+        The ids of all selected rows are read first, and then the rows
+        themselves in batches.  No statement is left running while
+        rows are yielded: an open read would keep the database locked
+        and block writes done while looping over a selection."""
+        sql, args = statement('systems.id')
+        cur = con.cursor()
+        cur.execute(sql, args)
+        ids = np.fromiter((id for id, in cur), int)
+        for i in range(0, len(ids), self.fetchsize):
+            batch = ids[i:i + self.fetchsize].tolist()
+            cur.execute('SELECT {} FROM systems WHERE id IN ({})'
+                        .format(what, ', '.join(str(id) for id in batch)))
+            rows = dict((row[0], row) for row in cur.fetchall())
+            for id in batch:
+                row = rows.get(id)
+                if row is not None:  # deleted while we were looping
                     yield row
 
+    def _select_columns(self, keys, cmps, columns, limit, offset, sort):
+        names = ['username' if column == 'user' else column
+                 for column in columns]
+        if sort:
+            names.append(sort.lstrip('-'))
+        for name in names:
+            if name not in sql_columns and name in reserved_keys:
+                # Not stored in a column of its own:
+                return Database._select_columns(self, keys, cmps, columns,
+                                                limit, offset, sort)
+
+        con = self._connect()
+        self._initialize(con)
+        cur = con.cursor()
+
+        what = []
+        joins = []
+        text = []  # columns with strings
+        for name in names:
+            if name in sql_columns:
+                what.append('systems.' + name)
+                text.append(name in ['username', 'calculator', 'unique_id'])
+                continue
+            values = []
+            istext = False
+            for table in ['number_key_values', 'text_key_values']:
+                cur.execute('SELECT COUNT(*) FROM (SELECT id FROM {} '
+                            'WHERE key=? LIMIT 1)'.format(table), [name])
+                if cur.fetchone()[0] == 0:
+                    continue
+                # A LIMIT on the subquery makes SQLite create an index on
+                # id for the join instead of scanning the key's rows for
+                # every system:
+                alias = 'k{}'.format(len(joins))
+                joins.append(('LEFT JOIN (SELECT id, value FROM {} '
+                              'WHERE key=? LIMIT -1) AS {} ON {}.id=systems.id'
+                              .format(table, alias, alias), name))
+                values.append(alias + '.value')
+                istext = table == 'text_key_values'
+            if not values:
+                what.append('NULL')
+            elif len(values) == 1:
+                what.append(values[0])
+            else:
+                what.append('COALESCE({})'.format(', '.join(values)))
+            text.append(istext)
+
+        if sort:
+            order = 'DESC' if sort[0] == '-' else 'ASC'
+            sort = what.pop()
+            text.pop()
+        else:
+            order = None
+
+        sql, args = self.create_select_statement(keys, cmps, sort, order,
+                                                 what=', '.join(what),
+                                                 joins=joins)
+        if limit:
+            sql += '\nLIMIT {0}'.format(limit)
+        if offset:
+            sql += '\nOFFSET {0}'.format(offset)
+
+        cur.execute(sql, args)
+        rows = cur.fetchall()
+        if rows:
+            values = zip(*rows)
+        else:
+            values = [[]] * len(columns)
+
+        return dict((column, np.array(lst, object) if istext
+                     else column_array(column, lst))
+                    for column, istext, lst in zip(columns, text, values))
+
     @parallel_function
     def count(self, selection=None, **kwargs):
         keys, cmps = parse_selection(selection, **kwargs)
@@ -5,7 +5,12 @@ from ase.io.formats import string2index
 
 def read_db(filename, index, **kwargs):
     db = ase.db.connect(filename, serial=True, **kwargs)
+    for row in select_rows(db, index):
+        yield row.toatoms()
 
+
+def select_rows(db, index):
+    """Yield rows of db selected by index (int, slice or query string)."""
     if isinstance(index, basestring):
         try:
             index = string2index(index)
@@ -18,14 +23,14 @@ def read_db(filename, index, **kwargs):
     if isinstance(index, basestring):
         # index is a database query string:
         for row in db.select(index):
-            yield row.toatoms()
+            yield row
     else:
         start, stop, step = index.indices(db.count())
         if start == stop:
             return
         assert step == 1
         for row in db.select(offset=start, limit=stop - start):
-            yield row.toatoms()
+            yield row
 
 
 def write_db(filename, images, **kwargs):
@@ -40,8 +40,21 @@ KEY_VALUE = re.compile(r'([A-Za-z_]+[A-Za-z0-9_]*)\s*=' +
                        r'\s*([^\s]+)\s*')
 KEY_RE = re.compile(r'([A-Za-z_]+[A-Za-z0-9_-]*)\s*')
 
+# A whitespace separated key or key=value pair, where the value can be
+# quoted with "" or {}, but contains no escapes or nested brackets:
+KEY_VALUE_PAIR = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_-]*)'
+                            r'(?:=("[^"\'(){}\[\]\\]+"|'
+                            r'\{[^"\'(){}\[\]\\]+\}|'
+                            r'[^\s"\'(){}\[\]\\=]+))?(?=\s|$)')
+
 UNPROCESSED_KEYS = ['uid']
 
+# Parsed comment lines and Properties strings, to avoid parsing the same
+# header again for every frame:
+MAX_CACHED_HEADERS = 1000
+_header_cache = {}
+_properties_cache = {}
+
 
 def key_val_str_to_dict(string, sep=None):
     """
@@ -56,6 +69,45 @@ def key_val_str_to_dict(string, sep=None):
     key value pairs with the given separator.
 
     """
+    if sep is None:
+        kv_dict = _header_cache.get(string)
+        if kv_dict is None:
+            pairs = _split_key_values(string)
+            if pairs is None:
+                pairs = _split_key_values_full(string, sep)
+            kv_dict = _convert_key_values(pairs)
+            if len(_header_cache) >= MAX_CACHED_HEADERS:
+                _header_cache.clear()
+            _header_cache[string] = kv_dict
+        return dict((key, value.copy() if hasattr(value, 'copy') else value)
+                    for key, value in kv_dict.items())
+
+    return _convert_key_values(_split_key_values_full(string, sep))
+
+
+def _split_key_values(string):
+    """Split simple key=value strings with a regular expression.
+
+    Returns list of (key, value) pairs or None if the string needs the
+    full character-by-character parser."""
+    pairs = []
+    string = string.strip()
+    pos = 0
+    while pos < len(string):
+        match = KEY_VALUE_PAIR.match(string, pos)
+        if match is None:
+            return None
+        key, value = match.groups()
+        if value is None:
+            value = 'T'
+        elif value[0] in '"{':
+            value = value[1:-1]
+        pairs.append((key, value))
+        pos = match.end()
+    return pairs
+
+
+def _split_key_values_full(string, sep):
     # store the closing delimiters to match opening ones
     delimiters = {
         "'": "'",
@@ -104,8 +156,7 @@ def key_val_str_to_dict(string, sep=None):
         else:
             kv_pairs[-1][-1].append(char)
 
-    kv_dict = {}
-
+    pairs = []
     for kv_pair in kv_pairs:
         if len(kv_pair) == 0:  # empty line
             continue
@@ -114,7 +165,15 @@ def key_val_str_to_dict(string, sep=None):
         else:  # Smush anything else with kv-splitter '=' between them
             key, value = ''.join(kv_pair[0]), '='.join(
                 ''.join(x) for x in kv_pair[1:])
+        pairs.append((key, value))
+    return pairs
+
+
+def _convert_key_values(pairs):
+    """Convert values of (key, value) pairs to native types."""
+    kv_dict = {}
 
+    for key, value in pairs:
         if key.lower() not in UNPROCESSED_KEYS:
             # Try to convert to (arrays of) floats, ints
             split_value = re.findall(r'[^\s,]+', value)
@@ -267,6 +326,16 @@ def parse_properties(prop_str):
     TYPE is one of R, I, S, L for real, integer, string and logical.
     NCOLS is number of columns for that property.
     """
+    parsed = _properties_cache.get(prop_str)
+    if parsed is None:
+        parsed = _parse_properties(prop_str)
+        if len(_properties_cache) >= MAX_CACHED_HEADERS:
+            _properties_cache.clear()
+        _properties_cache[prop_str] = parsed
+    return parsed
+
+
+def _parse_properties(prop_str):
 
     properties = {}
     properties_list = []
@@ -310,6 +379,64 @@ def parse_properties(prop_str):
     return properties, properties_list, dtype, converters
 
 
+def _parse_atom_lines(block, properties, names, convs):
+    """Convert the per-atom lines of a frame column by column.
+
+    Returns None if the lines do not all have the number of columns
+    given by the properties."""
+    ncols = len(convs)
+    values = ' '.join(block).split()
+    if len(values) != len(block) * ncols:
+        return None
+    table = np.array(values, object).reshape((len(block), ncols))
+
+    arrays = {}
+    c = 0
+    for name in names:
+        ase_name, cols = properties[name]
+        columns = table[:, c] if cols == 1 else table[:, c:c + cols]
+        conv = convs[c]
+        c += cols
+        try:
+            if conv is float:
+                value = columns.astype('d')
+            elif conv is int:
+                value = columns.astype('i')
+            elif conv is str:
+                value = columns.copy()
+            else:
+                value = (columns == 'T') | (columns == 'True')
+        except (ValueError, OverflowError):
+            return None
+        arrays[ase_name] = value
+    return arrays
+
+
+def _parse_atom_lines_slow(block, properties, names, dtype, convs):
+    data = []
+    for line in block:
+        vals = line.split()
+        row = tuple([conv(val) for conv, val in zip(convs, vals)])
+        data.append(row)
+
+    try:
+        data = np.array(data, dtype)
+    except TypeError:
+        raise XYZError('Badly formatted data '
+                       'or end of file reached before end of frame')
+
+    arrays = {}
+    for name in names:
+        ase_name, cols = properties[name]
+        if cols == 1:
+            value = data[name]
+        else:
+            value = np.vstack([data[name + str(c)]
+                              for c in range(cols)]).T
+        arrays[ase_name] = value
+    return arrays
+
+
 def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0):
     # comment line
     line = next(lines)
@@ -345,22 +472,14 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0
     properties, names, dtype, convs = parse_properties(info['Properties'])
     del info['Properties']
 
-    data = []
-    for ln in range(natoms):
-        try:
-            line = next(lines)
-        except StopIteration:
-            raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
-                           .format(len(data), natoms))
-        vals = line.split()
-        row = tuple([conv(val) for conv, val in zip(convs, vals)])
-        data.append(row)
-
-    try:
-        data = np.array(data, dtype)
-    except TypeError:
-        raise XYZError('Badly formatted data '
-                       'or end of file reached before end of frame')
+    block = list(islice(lines, natoms))
+    if len(block) < natoms:
+        raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
+                       .format(len(block), natoms))
+    arrays = _parse_atom_lines(block, properties, names, convs)
+    if arrays is None:
+        arrays = _parse_atom_lines_slow(block, properties, names, dtype,
+                                        convs)
 
     #Read VEC entries if present
     if nvec > 0:
@@ -388,15 +507,6 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0
             raise XYZError('Problem with number of cell vectors')
         pbc = tuple(pbc)
 
-    arrays = {}
-    for name in names:
-        ase_name, cols = properties[name]
-        if cols == 1:
-            value = data[name]
-        else:
-            value = np.vstack([data[name + str(c)]
-                              for c in range(cols)]).T
-        arrays[ase_name] = value
 
     symbols = None
     if 'symbols' in arrays:
@@ -465,28 +575,47 @@ class XYZError(IOError):
 
 
 class XYZChunk:
-    def __init__(self, lines, natoms):
+    def __init__(self, lines, natoms, nvec=0):
         self.lines = lines
         self.natoms = natoms
+        self.nvec = nvec
 
-    def build(self):
+    def build(self, properties_parser=key_val_str_to_dict):
         """Convert unprocessed chunk into Atoms."""
-        return _read_xyz_frame(iter(self.lines), self.natoms)
+        return _read_xyz_frame(iter(self.lines), self.natoms,
+                               properties_parser, self.nvec)
 
 
 def ixyzchunks(fd):
-    """Yield unprocessed chunks (header, lines) for each xyz image."""
+    """Yield unprocessed chunks (header, lines) for each xyz image.
+
+    After each chunk, fd is positioned at the start of the next image."""
     while True:
-        line = next(fd).strip()  # Raises StopIteration on empty file
+        line = fd.readline()
+        if line.strip() == '':
+            return
         try:
             natoms = int(line)
         except ValueError:
-            raise XYZError('Expected integer, found "{0}"'.format(line))
-        try:
-            lines = [next(fd) for _ in range(1 + natoms)]
-        except StopIteration:
+            raise XYZError('Expected integer, found "{0}"'
+                           .format(line.strip()))
+        lines = [fd.readline() for _ in range(1 + natoms)]
+        if not lines[-1]:
             raise XYZError('Incomplete XYZ chunk')
-        yield XYZChunk(lines, natoms)
+        # check for VEC
+        nvec = 0
+        while True:
+            pos = fd.tell()
+            line = fd.readline()
+            if line.lstrip().startswith('VEC'):
+                lines.append(line)
+                nvec += 1
+                if nvec > 3:
+                    raise XYZError('ase.io.extxyz: More than 3 VECX entries')
+            else:
+                fd.seek(pos)
+                break
+        yield XYZChunk(lines, natoms, nvec)
 
 
 class ImageIterator:
@@ -842,3 +971,4 @@ def write_xyz(fileobj, images, comment='', columns=None, write_info=True,
 # create aliases for read/write functions
 read_extxyz = read_xyz
 write_extxyz = write_xyz
+iextxyzchunks = ixyzchunks
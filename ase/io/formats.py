@@ -8,6 +8,7 @@ elements:
 * a write(filename, images) function
 * a 'single' boolean (False if multiple configurations is supported)
 * a 'acceptsfd' boolean (True if file-descriptors are accepted)
+* an optional ichunks(fd) generator yielding unprocessed frames (see below)
 
 There is a dict 'ioformats' that is filled with IOFormat objects as they are
 needed.  The 'initialize()' function will create the IOFormat object by
@@ -22,6 +23,12 @@ Example
 The xyz format is implemented in the ase/io/xyz.py file which has a
 read_xyz() generator and a write_xyz() function.
 
+Text formats with many frames can also have an ixyzchunks()-style chunk
+iterator: a generator yielding one object per frame with a build() method
+that returns the Atoms object, leaving fd positioned at the start of the
+next frame.  For those formats, a file of frame offsets stored next to
+the file (see build_frame_index()) gives fast access to any frame.
+
 """
 
 import collections
@@ -29,6 +36,9 @@ import functools
 import inspect
 import os
 import sys
+from itertools import islice
+
+import numpy as np
 
 from ase.atoms import Atoms
 from ase.utils import import_module, basestring, PurePath
@@ -40,7 +50,8 @@ class UnknownFileTypeError(Exception):
 
 
 IOFormat = collections.namedtuple('IOFormat',
-                                  'read, write, single, acceptsfd, isbinary')
+                                  'read, write, single, acceptsfd, isbinary, '
+                                  'ichunks')
 ioformats = {}  # will be filled at run-time
 
 # 1=single, +=multiple, F=accepts a file-descriptor, S=needs a file-name str,
@@ -112,7 +123,7 @@ all_formats = {
     'turbomole-gradient': ('TURBOMOLE gradient file', '+F'),
     'v-sim': ('V_Sim ascii file', '1F'),
     'vasp': ('VASP POSCAR/CONTCAR file', '1F'),
-    'vasp-out': ('VASP OUTCAR file', '+F'),
+    'vasp-out': ('VASP OUTCAR file', '+B'),
     'vasp-xdatcar': ('VASP XDATCAR file', '+S'),
     'vasp-xml': ('VASP vasprun.xml file', '+F'),
     'vti': ('VTK XML Image Data', '1F'),
@@ -181,6 +192,35 @@ extension2format = {
     'phonon': 'castep-phonon',
     'xtl': 'mustem'}
 
+# File contents recognized by filetype() without importing the
+# format modules.  Start of file:
+magic_prefixes = [
+    ('traj', b'- of UlmASE-Trajectory'),
+    ('traj', b'AFFormatASE-Trajectory'),
+    ('gpw', b'- of UlmGPAW'),
+    ('gpw', b'AFFormatGPAW'),
+    ('trj', b'PickleTrajectory'),
+    ('turbomole', b'$coord'),
+    ('turbomole-gradient', b'$grad'),
+    ('dftb', b'Geometry')]
+
+# Anywhere in the first 50000 bytes:
+magic_substrings = [
+    ('gpaw-out', b'  ___ ___ ___ _ _ _'),
+    ('espresso-in', b'\n&system'),
+    ('espresso-in', b'\n&SYSTEM'),
+    ('espresso-out', b'Program PWSCF'),
+    ('aims-output', b'Invoking FHI-aims ...'),
+    ('lammps-dump', b'\nITEM: TIMESTEP\n'),
+    ('qbox', b':simulation xmlns:'),
+    ('xsf', b'\nANIMSTEPS'),
+    ('xsf', b'\nCRYSTAL'),
+    ('xsf', b'\nSLAB'),
+    ('xsf', b'\nPOLYMER'),
+    ('xsf', b'\nMOLECULE'),
+    ('xsf', b'\nATOMS'),
+    ('dacapo-text', b'&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&\n')]
+
 netcdfconventions2format = {
     'http://www.etsf.eu/fileformats': 'etsf',
     'AMBER': 'netcdftrajectory'
@@ -203,6 +243,7 @@ def initialize(format):
 
     read = getattr(module, 'read_' + _format, None)
     write = getattr(module, 'write_' + _format, None)
+    ichunks = getattr(module, 'i' + _format + 'chunks', None)
 
     if read and not inspect.isgeneratorfunction(read):
         read = functools.partial(wrap_read_function, read)
@@ -213,7 +254,8 @@ def initialize(format):
     assert code[1] in 'BFS'
     acceptsfd = code[1] != 'S'
     isbinary = code[1] == 'B'
-    ioformats[format] = IOFormat(read, write, single, acceptsfd, isbinary)
+    ioformats[format] = IOFormat(read, write, single, acceptsfd, isbinary,
+                                 ichunks)
 
 
 def get_ioformat(format):
@@ -474,14 +516,23 @@ def read(filename, index=None, format=None, parallel=True, **kwargs):
                            parallel=parallel, **kwargs))
 
 
-def iread(filename, index=None, format=None, parallel=True, **kwargs):
+def iread(filename, index=None, format=None, parallel=True, workers=1,
+          **kwargs):
     """Iterator for reading Atoms objects from file.
 
     Works as the `read` function, but yields one Atoms object at a time
-    instead of all at once."""
+    instead of all at once.
+
+    workers: int
+        Number of processes used for parsing frames.  Only for
+        uncompressed files in formats with a chunk iterator (xyz and
+        extxyz); other files are read sequentially."""
 
     if isinstance(index, basestring):
-        index = string2index(index)
+        try:
+            index = string2index(index)
+        except ValueError:
+            pass
 
     filename, index = parse_filename(filename, index)
 
@@ -495,19 +546,27 @@ def iread(filename, index=None, format=None, parallel=True, **kwargs):
     io = get_ioformat(format)
 
     for atoms in _iread(filename, index, format, io, parallel=parallel,
-                        **kwargs):
+                        workers=workers, **kwargs):
         yield atoms
 
 
 @parallel_generator
 def _iread(filename, index, format, io, parallel=None, full_output=False,
-           **kwargs):
+           workers=1, **kwargs):
     if isinstance(filename, basestring):
         filename = os.path.expanduser(filename)
 
     if not io.read:
         raise ValueError("Can't read from {}-format".format(format))
 
+    if workers > 1:
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+        except ImportError:
+            raise ImportError('Reading with workers > 1 requires the '
+                              'concurrent.futures module (Python 3 or the '
+                              'futures package)')
+
     if io.single:
         start = index.start
         assert start is None or start == 0 or start == -1
@@ -515,6 +574,25 @@ def _iread(filename, index, format, io, parallel=None, full_output=False,
     else:
         args = (index,)
 
+    if (io.ichunks and isinstance(filename, basestring) and
+        isinstance(index, slice) and get_compression(filename)[1] is None):
+        offsets = read_frame_index(filename, format)
+        if offsets is None and workers > 1:
+            offsets = scan_frame_offsets(filename, format)
+        if offsets is not None:
+            offsets = _select_offsets(offsets, index)
+            if workers > 1:
+                images = _iread_processes(filename, format, offsets, workers,
+                                          ProcessPoolExecutor, **kwargs)
+            else:
+                images = _iread_indexed(filename, offsets, io, **kwargs)
+            for atoms in images:
+                if full_output:
+                    yield {'atoms': atoms}
+                else:
+                    yield atoms
+            return
+
     must_close_fd = False
     if isinstance(filename, basestring):
         if io.acceptsfd:
@@ -541,6 +619,123 @@ def _iread(filename, index, format, io, parallel=None, full_output=False,
             fd.close()
 
 
+def _select_offsets(offsets, index):
+    try:
+        return islice(offsets, index.start, index.stop, index.step)
+    except ValueError:
+        # Negative indices: we need the number of frames
+        offsets = list(offsets)
+        return [offsets[i] for i in range(*index.indices(len(offsets)))]
+
+
+def _iread_indexed(filename, offsets, io, **kwargs):
+    with open(filename, 'rb' if io.isbinary else 'r') as fd:
+        for offset in offsets:
+            fd.seek(int(offset))
+            yield next(io.ichunks(fd)).build(**kwargs)
+
+
+def _read_frames(filename, format, offsets, kwargs):
+    """Read the frames starting at offsets (runs in worker process)."""
+    io = get_ioformat(format)
+    return list(_iread_indexed(filename, offsets, io, **kwargs))
+
+
+def _iread_processes(filename, format, offsets, workers, executor_class,
+                     framesperjob=100, **kwargs):
+    """Read frames in a pool of worker processes.
+
+    Batches of framesperjob frames are read in parallel by an
+    executor_class(workers) executor and yielded in order.  At most two
+    batches per worker are read ahead."""
+    offsets = iter(offsets)
+    futures = collections.deque()
+    executor = executor_class(workers)
+    try:
+        while True:
+            while len(futures) < 2 * workers:
+                batch = [int(offset)
+                         for offset in islice(offsets, framesperjob)]
+                if not batch:
+                    break
+                futures.append(executor.submit(_read_frames, filename,
+                                               format, batch, kwargs))
+            if not futures:
+                break
+            for atoms in futures.popleft().result():
+                yield atoms
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+
+
+def frame_index_filename(filename):
+    """Name of file with frame offsets for filename."""
+    return filename + '.index'
+
+
+def _file_signature(filename):
+    st = os.stat(filename)
+    return [st.st_size, int(st.st_mtime * 1e6)]
+
+
+def build_frame_index(filename, format=None):
+    """Write offsets of all frames to a file next to filename.
+
+    Later calls to read() and iread() use the offsets to go directly to
+    the requested frames instead of scanning the whole file.  The index
+    is rebuilt automatically when the file changes.  Only uncompressed
+    files in formats with a chunk iterator can be indexed.
+
+    Returns the offsets."""
+
+    format = format or filetype(filename)
+    io = get_ioformat(format)
+    if not io.ichunks or get_compression(filename)[1] is not None:
+        raise ValueError("Can't index {}-format".format(format))
+
+    signature = _file_signature(filename)
+    offsets = list(scan_frame_offsets(filename, format))
+    data = np.array(signature + offsets, np.int64)
+    try:
+        with open(frame_index_filename(filename), 'wb') as fd:
+            np.save(fd, data)
+    except (IOError, OSError):
+        pass  # read-only directory: use offsets this time only
+    return data[2:]
+
+
+def scan_frame_offsets(filename, format):
+    """Yield offsets of frames found by the chunk iterator of format."""
+    io = get_ioformat(format)
+    with open(filename, 'rb' if io.isbinary else 'r') as fd:
+        pos = fd.tell()
+        for chunk in io.ichunks(fd):
+            yield pos
+            pos = fd.tell()
+
+
+def read_frame_index(filename, format=None):
+    """Return offsets of all frames from index file.
+
+    Returns None if filename has no index file.  An index file that does
+    not match the current size and modification time of filename is
+    rebuilt."""
+
+    indexname = frame_index_filename(filename)
+    if (get_compression(filename)[1] is not None or
+        not os.path.isfile(indexname)):
+        return None
+    try:
+        data = np.load(indexname, mmap_mode='r')
+    except (IOError, OSError, ValueError):
+        data = None
+    if data is None or list(data[:2]) != _file_signature(filename):
+        return build_frame_index(filename, format)
+    return data[2:]
+
+
 def parse_filename(filename, index=None):
     if not isinstance(filename, basestring):
         return filename, index
@@ -672,32 +867,11 @@ def filetype(filename, read=True, guess=True):
                 raise UnknownFileTypeError("NetCDF file does not have a "
                                            "'Conventions' attribute.")
 
-    for format, magic in [('traj', b'- of UlmASE-Trajectory'),
-                          ('traj', b'AFFormatASE-Trajectory'),
-                          ('gpw', b'- of UlmGPAW'),
-                          ('gpw', b'AFFormatGPAW'),
-                          ('trj', b'PickleTrajectory'),
-                          ('turbomole', b'$coord'),
-                          ('turbomole-gradient', b'$grad'),
-                          ('dftb', b'Geometry')]:
+    for format, magic in magic_prefixes:
         if data.startswith(magic):
             return format
 
-    for format, magic in [('gpaw-out', b'  ___ ___ ___ _ _ _'),
-                          ('espresso-in', b'\n&system'),
-                          ('espresso-in', b'\n&SYSTEM'),
-                          ('espresso-out', b'Program PWSCF'),
-                          ('aims-output', b'Invoking FHI-aims ...'),
-                          ('lammps-dump', b'\nITEM: TIMESTEP\n'),
-                          ('qbox', b':simulation xmlns:'),
-                          ('xsf', b'\nANIMSTEPS'),
-                          ('xsf', b'\nCRYSTAL'),
-                          ('xsf', b'\nSLAB'),
-                          ('xsf', b'\nPOLYMER'),
-                          ('xsf', b'\nMOLECULE'),
-                          ('xsf', b'\nATOMS'),
-                          ('dacapo-text',
-                           b'&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&\n')]:
+    for format, magic in magic_substrings:
         if magic in data:
             return format
 
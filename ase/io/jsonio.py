@@ -1,5 +1,7 @@
 import datetime
 import json
+import struct
+import zlib
 
 import numpy as np
 from ase.utils import basestring
@@ -40,6 +42,8 @@ mydecode = json.JSONDecoder(object_hook=object_hook).decode
 
 
 def intkey(key):
+    if key[:1] not in '-0123456789':
+        return key  # skip the slow exception for ordinary keys
     try:
         return int(key)
     except ValueError:
@@ -69,6 +73,74 @@ def decode(txt):
     return numpyfy(mydecode(txt))
 
 
+class BinaryEncoder(MyEncoder):
+    """JSON encoder that puts numeric arrays in a separate binary part."""
+    def __init__(self):
+        MyEncoder.__init__(self, separators=(',', ':'))
+        self.arrays = []
+        self.nbytes = 0
+
+    def default(self, obj):
+        if (isinstance(obj, np.ndarray) and obj.dtype.kind in 'biufc' and
+            obj.ndim > 0):
+            array = np.ascontiguousarray(obj, obj.dtype.newbyteorder('<'))
+            ref = {'__ndarray_blob__': [self.nbytes, array.dtype.str,
+                                        array.shape]}
+            self.arrays.append(array)
+            self.nbytes += -(-array.nbytes // 8) * 8  # 8-byte aligned
+            return ref
+        return MyEncoder.default(self, obj)
+
+
+def encode_binary(obj, compress=False):
+    """Encode object to bytes with arrays stored in binary form.
+
+    The first byte tells if the rest is zlib compressed (1) or not (0).
+    The rest is the length of the JSON text (8 bytes), the JSON text
+    padded to a multiple of 8 bytes and the little-endian array data.
+    Each array starts at a multiple of 8 bytes counted from the end of
+    the first byte.  Arrays with no dimensions are stored as JSON
+    numbers.
+    """
+    encoder = BinaryEncoder()
+    txt = encoder.encode(obj).encode()
+    txt += b' ' * (-len(txt) % 8)
+    parts = [struct.pack('<Q', len(txt)), txt]
+    for array in encoder.arrays:
+        parts.append(array.tobytes())
+        parts.append(b'\0' * (-array.nbytes % 8))
+    payload = b''.join(parts)
+    if compress:
+        return b'\1' + zlib.compress(payload)
+    return b'\0' + payload
+
+
+def decode_binary(buf):
+    """Decode bytes from encode_binary().
+
+    The arrays share memory with one writable copy of the data.  The
+    copy leaves out the first byte so that the arrays are aligned."""
+    if bytearray(buf[:1]) == b'\1':
+        buf = bytearray(zlib.decompress(bytes(buf[1:])))
+    else:
+        buf = bytearray(buf[1:])
+    n, = struct.unpack('<Q', bytes(buf[:8]))
+    start = 8
+    txt = bytes(buf[start:start + n]).decode()
+    start += n
+
+    def hook(dct):
+        if '__ndarray_blob__' in dct:
+            offset, dtype, shape = dct['__ndarray_blob__']
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            array = np.frombuffer(buf, dtype, count, start + offset)
+            return array.reshape(shape)
+        return object_hook(dct)
+
+    return numpyfy(json.JSONDecoder(object_hook=hook).decode(txt))
+
+
 def read_json(name):
     if isinstance(name, basestring):
         fd = open(name, 'r')
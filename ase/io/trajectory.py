@@ -11,11 +11,18 @@ from ase.atoms import Atoms
 from ase.io.jsonio import encode, decode
 from ase.io.pickletrajectory import PickleTrajectory
 from ase.parallel import world
+from ase.utils import basestring
 
 __all__ = ['Trajectory', 'PickleTrajectory']
 
+# Arrays with one row per atom.  A codec given as a string is only used
+# for these:
+per_atom_arrays = ['positions', 'momenta', 'masses', 'magmoms', 'charges',
+                   'forces']
 
-def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
+
+def Trajectory(filename, mode='r', atoms=None, properties=None, master=None,
+               mmap=False, codecs=None, buffersize=0, flush_interval=None):
     """A Trajectory can be created in read, write or append mode.
 
     Parameters:
@@ -41,18 +48,37 @@ def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
         Controls which process does the actual writing. The
         default is that process number 0 does this.  If this
         argument is given, processes where it is True will write.
-
-    The atoms, properties and master arguments are ignores in read mode.
+    mmap: bool
+        Read arrays through a memory-map of the file, so that only the
+        parts of the file that are needed are touched.  Read mode only.
+    codecs: str or dict
+        Store arrays in reduced precision and/or compressed, for example
+        'float32+delta+zlib' for all per-atom arrays or
+        {'positions': 'delta+zlib'} for selected arrays.  See
+        :mod:`ase.io.ulm`.  Write and append mode only.
+    buffersize: int
+        Keep up to this many images in memory and write them to the file
+        in one block.  Useful when writing every step of a fast
+        simulation.  Write and append mode only.
+    flush_interval: float
+        With buffersize, also write the buffered images when this many
+        seconds have passed since the last write.
+
+    The atoms, properties, master, codecs, buffersize and flush_interval
+    arguments are ignored in read mode.
     """
     if mode == 'r':
-        return TrajectoryReader(filename)
-    return TrajectoryWriter(filename, mode, atoms, properties, master=master)
+        return TrajectoryReader(filename, mmap=mmap)
+    return TrajectoryWriter(filename, mode, atoms, properties, master=master,
+                            codecs=codecs, buffersize=buffersize,
+                            flush_interval=flush_interval)
 
 
 class TrajectoryWriter:
     """Writes Atoms objects to a .traj file."""
     def __init__(self, filename, mode='w', atoms=None, properties=None,
-                 extra=[], master=None):
+                 extra=[], master=None, codecs=None, buffersize=0,
+                 flush_interval=None):
         """A Trajectory writer, in write or append mode.
 
         Parameters:
@@ -78,12 +104,27 @@ class TrajectoryWriter:
             Controls which process does the actual writing. The
             default is that process number 0 does this.  If this
             argument is given, processes where it is True will write.
+        codecs: str or dict
+            Codecs for storing arrays.  See :mod:`ase.io.ulm`.  A string
+            is used for the per-atom arrays (positions, momenta, masses,
+            magmoms, charges and forces) only.
+        buffersize: int
+            Number of images to keep in memory before writing them to
+            the file in one block.
+        flush_interval: float
+            With buffersize, also write the buffered images when this
+            many seconds have passed since the last write.
         """
         if master is None:
             master = (world.rank == 0)
         self.master = master
         self.atoms = atoms
         self.properties = properties
+        if isinstance(codecs, basestring):
+            codecs = dict((name, codecs) for name in per_atom_arrays)
+        self.codecs = codecs
+        self.buffersize = buffersize
+        self.flush_interval = flush_interval
 
         self.description = {}
         self.header_data = None
@@ -105,7 +146,10 @@ class TrajectoryWriter:
         if mode not in 'aw':
             raise ValueError('mode must be "w" or "a".')
         if self.master:
-            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory')
+            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory',
+                                    codecs=self.codecs,
+                                    buffersize=self.buffersize,
+                                    flush_interval=self.flush_interval)
             if len(self.backend) > 0 and mode == 'a':
                 atoms = Trajectory(filename)[0]
                 self.header_data = get_header_data(atoms)
@@ -198,6 +242,10 @@ class TrajectoryWriter:
 
         b.sync()
 
+    def flush(self):
+        """Write buffered images to the file."""
+        self.backend.flush()
+
     def close(self):
         """Close the trajectory file."""
         self.backend.close()
@@ -208,16 +256,19 @@ class TrajectoryWriter:
 
 class TrajectoryReader:
     """Reads Atoms objects from a .traj file."""
-    def __init__(self, filename):
+    def __init__(self, filename, mmap=False):
         """A Trajectory in read mode.
 
-        The filename traditionally ends in .traj.
+        The filename traditionally ends in .traj.  With mmap=True, arrays
+        are read through a memory-map of the file.
         """
 
         self.numbers = None
         self.pbc = None
         self.masses = None
 
+        self.mmap = mmap
+
         self._open(filename)
 
     def __enter__(self):
@@ -228,7 +279,7 @@ class TrajectoryReader:
 
     def _open(self, filename):
         import ase.io.ulm as ulm
-        self.backend = ulm.open(filename, 'r')
+        self.backend = ulm.open(filename, 'r', mmap=self.mmap)
         self._read_header()
 
     def _read_header(self):
@@ -276,6 +327,57 @@ class TrajectoryReader:
         for i in range(len(self)):
             yield self[i]
 
+    def read_array(self, name, index=slice(None)):
+        """Read one quantity for several frames as a stacked array.
+
+        name: str
+            Per-atom array ('positions', 'momenta', ...), 'cell' or a
+            calculator property ('energy', 'forces', 'stress', ...).
+        index: slice
+            Frames to read.
+
+        No Atoms objects are created, so this is much faster than
+        iterating over the trajectory.  Returns an array of shape
+        (nframes,) + shape of the quantity.  All frames must have the
+        quantity with the same shape."""
+
+        return self._read_frames(name, range(*index.indices(len(self))))
+
+    def iter_arrays(self, name, index=slice(None), chunksize=1000):
+        """Yield stacked arrays of up to *chunksize* frames.
+
+        See read_array()."""
+
+        indices = range(*index.indices(len(self)))
+        for n in range(0, len(indices), chunksize):
+            yield self._read_frames(name, indices[n:n + chunksize])
+
+    def _read_frames(self, name, indices):
+        array = None
+        for n, i in enumerate(indices):
+            value = np.asarray(self._read_value(i, name))
+            if array is None:
+                array = np.empty((len(indices),) + value.shape, value.dtype)
+            elif value.shape != array.shape[1:]:
+                raise ValueError('Shape of {} changes in frame {}'
+                                 .format(name, i))
+            array[n] = value
+        if array is None:
+            return np.empty(0)
+        return array
+
+    def _read_value(self, i, name):
+        b = self.backend[i]
+        if 'calculator' in b and name in b.calculator:
+            return b.calculator.get(name)
+        if name in b:
+            return b.get(name)
+        header = {'pbc': self.pbc, 'numbers': self.numbers,
+                  'masses': self.masses}
+        if header.get(name) is not None:
+            return header[name]
+        raise KeyError('No {} in frame {}'.format(name, i))
+
 
 def get_header_data(atoms):
     return {'pbc': atoms.pbc.copy(),
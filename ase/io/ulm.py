@@ -51,11 +51,30 @@ Versions:
 
 3) Changed magic string from "AFFormat" to "- of Ulm".
 
+4) Added optional array codecs (float32, delta, zlib, lzma).  Files
+   without encoded arrays are still written as version 3.
+
+Codecs:
+
+Arrays can be stored with a codec given as a string of stages joined by
+"+", for example ``'float32+delta+zlib'``:
+
+* float32: store float64 arrays in single precision (lossy)
+* delta: store the bitwise XOR with the same array of a reference frame
+  written up to ``DELTA_INTERVAL`` items earlier (lossless)
+* zlib, lzma: compress the bytes (grouped by significance)
+
+>>> w = ulm.open('x.ulm', 'w', codecs={'a': 'float32+zlib'})
+
+Pass a string instead of a dict to use the same codec for all
+floating-point ndarrays, whatever their name or size.  Reading decodes
+the arrays transparently.
 """
 
 from __future__ import print_function
 import os
 import sys
+import time
 import numbers
 
 import numpy as np
@@ -68,18 +87,28 @@ if sys.version_info[0] >= 3:
 else:
     import __builtin__ as builtins
 
-VERSION = 3
+VERSION = 4
+CODEC_VERSION = 4  # first version with array codecs
 N1 = 42  # block size - max number of items: 1, N1, N1*N1, N1*N1*N1, ...
+CODECS = ['float32', 'delta', 'zlib', 'lzma']
+DELTA_INTERVAL = 100  # number of delta-encoded items per reference item
+
 
+def open(filename, mode='r', index=None, tag='', mmap=False, codecs=None,
+         buffersize=0, flush_interval=None):
+    """Open ulm-file.
 
-def open(filename, mode='r', index=None, tag=''):
-    """Open ulm-file."""
+    With mmap=True, arrays are returned as read-only views into a
+    memory-map of the file instead of being read into new buffers.
+    See the module docstring for *codecs* and :class:`Writer` for
+    *buffersize* and *flush_interval*."""
     if mode == 'r':
-        return Reader(filename, index or 0)
+        return Reader(filename, index or 0, mmap=mmap)
     if mode not in 'wa':
         2 / 0
     assert index is None
-    return Writer(filename, mode, tag)
+    return Writer(filename, mode, tag, codecs=codecs, buffersize=buffersize,
+                  flush_interval=flush_interval)
 
 
 ulmopen = open
@@ -112,6 +141,40 @@ def readints(fd, n):
     return a
 
 
+def check_codec(codec):
+    for stage in codec.split('+'):
+        if stage not in CODECS:
+            raise ValueError('Unknown codec: {}'.format(stage))
+
+
+def compress(buf, codec, itemsize):
+    if 'zlib' in codec or 'lzma' in codec:
+        # Group bytes of equal significance; compresses much better:
+        buf = buf.reshape((-1, itemsize)).T.tobytes()
+    else:
+        return buf.tobytes()
+    if 'zlib' in codec:
+        import zlib
+        buf = zlib.compress(buf)
+    elif 'lzma' in codec:
+        import lzma
+        buf = lzma.compress(buf)
+    return buf
+
+
+def decompress(buf, codec, itemsize):
+    if 'zlib' in codec:
+        import zlib
+        buf = zlib.decompress(buf)
+    elif 'lzma' in codec:
+        import lzma
+        buf = lzma.decompress(buf)
+    else:
+        return np.frombuffer(buf, np.uint8)
+    a = np.frombuffer(buf, np.uint8)
+    return a.reshape((itemsize, -1)).T.reshape(-1)
+
+
 def file_has_fileno(fd):
     """Tell whether file implements fileio() or not.
 
@@ -129,8 +192,42 @@ def file_has_fileno(fd):
     return True
 
 
+class BufferedFile:
+    """Collect data written to the end of a file in memory."""
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.chunks = []
+        self.size = 0
+        self.base = fd.seek(0, 2) or fd.tell()
+
+    def tell(self):
+        return self.base + self.size
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+
+    def flush(self):
+        pass
+
+    def seek(self, offset, whence=0):
+        assert (offset, whence) == (0, 2)
+
+    def write_out(self):
+        """Write collected data to the file."""
+        self.fd.seek(self.base)
+        self.fd.write(b''.join(self.chunks))
+        self.chunks = []
+        self.size = 0
+
+    def close(self):
+        self.fd.close()
+
+
 class Writer:
-    def __init__(self, fd, mode='w', tag='', data=None):
+    def __init__(self, fd, mode='w', tag='', data=None, codecs=None,
+                 buffersize=0, flush_interval=None):
         """Create writer object.
 
         fd: str
@@ -140,6 +237,16 @@ class Writer:
             existing one) and 'a' for appending to an existing file.
         tag: str
             Magic ID string.
+        codecs: str or dict
+            Codec for all floating-point arrays or a dict mapping array
+            names to codecs.  See the module docstring.
+        buffersize: int
+            Keep up to this many items in memory and write them to the
+            file in one block.  Default is to write each item when
+            sync() is called.
+        flush_interval: float
+            With buffersize, also write the buffered items when this
+            many seconds have passed since the last write.
         """
 
         assert mode in 'aw'
@@ -159,12 +266,15 @@ class Writer:
                 self.nitems = 0
                 self.pos0 = 48
                 self.offsets = np.array([-1], np.int64)
+                # Bumped to CODEC_VERSION when an array is encoded:
+                self.version = CODEC_VERSION - 1
 
                 if fd_is_string:
                     fd = builtins.open(fd, 'wb')
 
                 # File format identifier and other stuff:
-                a = np.array([VERSION, self.nitems, self.pos0], np.int64)
+                a = np.array([self.version, self.nitems, self.pos0],
+                             np.int64)
                 if not np.little_endian:
                     a.byteswap(True)
                 self.header = ('- of Ulm{0:16}'.format(tag).encode('ascii') +
@@ -174,8 +284,9 @@ class Writer:
                 if fd_is_string:
                     fd = builtins.open(fd, 'r+b')
 
-                version, self.nitems, self.pos0, offsets = read_header(fd)[1:]
-                assert version == VERSION
+                (self.version, self.nitems, self.pos0,
+                 offsets) = read_header(fd)[1:]
+                assert self.version <= VERSION
                 n = 1
                 while self.nitems > n:
                     n *= N1
@@ -183,10 +294,31 @@ class Writer:
                 self.offsets = np.concatenate((offsets, padding))
                 fd.seek(0, 2)
 
+        self.buffersize = buffersize
+        self.flush_interval = flush_interval
+        if buffersize:
+            fd = BufferedFile(fd)
+            # Offsets of items not yet written to the file:
+            self.buffered = []
+            self.flush_time = time.time()
+
         self.fd = fd
         self.hasfileno = file_has_fileno(fd)
 
         self.data = data
+        # Writer of the file header (child writers share it):
+        self.root = self
+        self.new_version = False
+
+        if isinstance(codecs, basestring):
+            check_codec(codecs)
+        elif codecs is not None:
+            for codec in codecs.values():
+                check_codec(codec)
+        self.codecs = codecs
+        self.path = ''
+        # Reference items for delta encoding:
+        self.references = {}
 
         # date for array being filled:
         self.nmissing = 0  # number of missing numbers
@@ -257,32 +389,65 @@ class Writer:
         writeint(self.fd, len(s))
         self.fd.write(s)
 
-        n = len(self.offsets)
-        if self.nitems >= n:
-            offsets = np.zeros(n * N1, np.int64)
-            offsets[:n] = self.offsets
-            self.pos0 = align(self.fd)
-
-            buf = offsets if np.little_endian else offsets.byteswap()
+        if self.buffersize:
+            self.buffered.append(i)
+            if (len(self.buffered) >= self.buffersize or
+                self.flush_interval is not None and
+                time.time() - self.flush_time > self.flush_interval):
+                self.flush()
+        else:
+            self._add_items(self.fd, [i])
 
-            if self.hasfileno:
-                buf.tofile(self.fd)
-            else:
-                self.fd.write(buf.tobytes())
-            writeint(self.fd, self.pos0, 40)
-            self.offsets = offsets
-
-        self.offsets[self.nitems] = i
-        writeint(self.fd, i, self.pos0 + self.nitems * 8)
-        self.nitems += 1
-        writeint(self.fd, self.nitems, 32)
-        self.fd.flush()
-        self.fd.seek(0, 2)  # end of file
         if np.little_endian:
             self.data = {}
         else:
             self.data = {'_little_endian': False}
 
+    def flush(self):
+        """Write buffered items to the file."""
+        if not self.buffersize:
+            return
+        if self.buffered:
+            self.fd.write_out()
+            self._add_items(self.fd.fd, self.buffered)
+            self.fd.base = self.fd.fd.tell()
+            self.buffered = []
+        self.flush_time = time.time()
+
+    def _add_items(self, fd, offsets):
+        """Add item offsets to table and update number of items."""
+        nitems = self.nitems + len(offsets)
+        n = len(self.offsets)
+        if nitems > n:
+            while n < nitems:
+                n *= N1
+            table = np.zeros(n, np.int64)
+            table[:len(self.offsets)] = self.offsets
+            self.pos0 = align(fd)
+
+            buf = table if np.little_endian else table.byteswap()
+
+            if file_has_fileno(fd):
+                buf.tofile(fd)
+            else:
+                fd.write(buf.tobytes())
+            writeint(fd, self.pos0, 40)
+            self.offsets = table
+
+        self.offsets[self.nitems:nitems] = offsets
+        fd.seek(self.pos0 + self.nitems * 8)
+        buf = np.array(offsets, np.int64)
+        if not np.little_endian:
+            buf.byteswap(True)
+        fd.write(buf.tobytes())
+        self.nitems = nitems
+        writeint(fd, self.nitems, 32)
+        if self.new_version:
+            writeint(fd, self.version, 24)
+            self.new_version = False
+        fd.flush()
+        fd.seek(0, 2)  # end of file
+
     def write(self, *args, **kwargs):
         """Write data.
 
@@ -309,16 +474,85 @@ class Writer:
                                   type(None))):
                 self.data[name] = value
             elif isinstance(value, np.ndarray):
-                self.add_array(name, value.shape, value.dtype)
-                self.fill(value)
+                codec = self.get_codec(name, value)
+                if codec:
+                    self.write_encoded(name, value, codec)
+                else:
+                    self.add_array(name, value.shape, value.dtype)
+                    self.fill(value)
             else:
                 value.write(self.child(name))
 
+    def get_codec(self, name, array):
+        """Return list of codec stages for array."""
+        if self.codecs is None:
+            return None
+        if isinstance(self.codecs, basestring):
+            if array.dtype.kind != 'f':
+                return None
+            codec = self.codecs
+        else:
+            codec = self.codecs.get(name)
+            if codec is None:
+                return None
+        codec = codec.split('+')
+        if array.dtype != np.float64 and 'float32' in codec:
+            codec.remove('float32')
+        return codec
+
+    def write_encoded(self, name, array, codec):
+        """Write ndarray with codec."""
+
+        self._write_header()
+        assert self.nmissing == 0, 'last array not done'
+
+        root = self.root
+        if root.version < CODEC_VERSION:
+            root.version = CODEC_VERSION
+            root.new_version = True
+
+        dtype = np.float32 if 'float32' in codec else array.dtype
+        stored = np.ascontiguousarray(array, dtype).reshape(-1)
+        buf = stored.view(np.uint8)
+        reference = None
+        new_reference = False
+        if 'delta' in codec:
+            key = self.path + name
+            ref = self.references.get(key)
+            if (ref is not None and ref[0].shape == buf.shape and
+                ref[3] < DELTA_INTERVAL):
+                buf = buf ^ ref[0]
+                reference = ref[1:3]
+                ref[3] += 1
+            else:
+                # This item will be the reference for the next ones:
+                codec = [stage for stage in codec if stage != 'delta']
+                new_reference = True
+                raw = buf.copy()
+        buf = compress(buf, codec, stored.itemsize)
+
+        i = align(self.fd)
+        self.fd.write(buf)
+        if new_reference:
+            self.references[key] = [raw, i, len(buf), 0]
+
+        info = {'ndarray': (tuple(int(s) for s in array.shape),
+                            array.dtype.name, i),
+                'codec': '+'.join(codec),
+                'nbytes': len(buf)}
+        if reference is not None:
+            info['reference'] = reference
+        self.data[name + '.'] = info
+
     def child(self, name):
         """Create child-writer object."""
         self._write_header()
         dct = self.data[name + '.'] = {}
-        return Writer(self.fd, data=dct)
+        writer = Writer(self.fd, data=dct, codecs=self.codecs)
+        writer.path = self.path + name + '.'
+        writer.references = self.references
+        writer.root = self.root
+        return writer
 
     def close(self):
         """Close file."""
@@ -330,9 +564,16 @@ class Writer:
         else:
             # Make sure header has been written (empty ulm-file):
             self._write_header()
+        if self.buffersize:
+            if self.fd.size > 0 and not self.buffered:
+                # Only the header:
+                self.fd.write_out()
+            self.flush()
         self.fd.close()
 
     def __len__(self):
+        if self.buffersize:
+            return int(self.nitems) + len(self.buffered)
         return int(self.nitems)
 
 
@@ -340,6 +581,9 @@ class DummyWriter:
     def add_array(self, name, shape, dtype=float):
         pass
 
+    def flush(self):
+        pass
+
     def fill(self, a):
         pass
 
@@ -375,14 +619,29 @@ class InvalidULMFileError(IOError):
 
 
 class Reader:
-    def __init__(self, fd, index=0, data=None, little_endian=None):
-        """Create reader."""
+    def __init__(self, fd, index=0, data=None, little_endian=None,
+                 mmap=False):
+        """Create reader.
+
+        mmap: bool or np.memmap
+            Return arrays as read-only views into a memory-map of the file.
+            Ignored for files without a file descriptor (e.g. in tar-files).
+        """
 
         if isinstance(fd, basestring):
             fd = builtins.open(fd, 'rb')
 
+        if mmap is True:
+            if file_has_fileno(fd) and os.fstat(fd.fileno()).st_size > 0:
+                mmap = np.memmap(fd, np.uint8, 'r')
+            else:
+                mmap = None
+        elif mmap is False:
+            mmap = None
+
         self._fd = fd
         self._index = index
+        self._mmap = mmap
 
         if data is None:
             (self._tag, self._version, self._nitems, self._pos0,
@@ -414,10 +673,13 @@ class Reader:
                                           shape,
                                           np.dtype(dtype),
                                           offset,
-                                          self._little_endian)
+                                          self._little_endian,
+                                          self._mmap,
+                                          value if 'codec' in value else None)
                 else:
                     value = Reader(self._fd, data=value,
-                                   little_endian=self._little_endian)
+                                   little_endian=self._little_endian,
+                                   mmap=self._mmap)
                 name = name[:-1]
 
             self._data[name] = value
@@ -484,7 +746,7 @@ class Reader:
 
     def __getitem__(self, index):
         data = self._read_data(index)
-        return Reader(self._fd, index, data, self._little_endian)
+        return Reader(self._fd, index, data, self._little_endian, self._mmap)
 
     def tostr(self, verbose=False, indent='    '):
         keys = sorted(self._data)
@@ -511,8 +773,11 @@ class Reader:
 
 
 class NDArrayReader:
-    def __init__(self, fd, shape, dtype, offset, little_endian):
+    def __init__(self, fd, shape, dtype, offset, little_endian, mmap=None,
+                 encoding=None):
         self.fd = fd
+        self.mmap = mmap
+        self.encoding = encoding
         self.hasfileno = file_has_fileno(fd)
         self.shape = tuple(shape)
         self.dtype = dtype
@@ -534,6 +799,13 @@ class NDArrayReader:
         return self[:]
 
     def __getitem__(self, i):
+        if self.encoding is not None:
+            a = self.decode()[i]
+            if self.length_of_last_dimension is not None:
+                a = a[..., :self.length_of_last_dimension]
+            if self.scale != 1.0:
+                a = a * self.scale
+            return a
         if isinstance(i, numbers.Integral):
             if i < 0:
                 i += len(self)
@@ -541,26 +813,58 @@ class NDArrayReader:
         start, stop, step = i.indices(len(self))
         stride = np.prod(self.shape[1:], dtype=int)
         offset = self.offset + start * self.itemsize * stride
-        self.fd.seek(offset)
-        count = (stop - start) * stride
-        if self.hasfileno:
-            a = np.fromfile(self.fd, self.dtype, count)
+        count = max(stop - start, 0) * stride
+        if self.mmap is not None:
+            # Read-only view; pages are only touched when accessed:
+            a = np.ndarray((count,), self.dtype, self.mmap, offset)
+            a.shape = (max(stop - start, 0),) + self.shape[1:]
+            if step != 1:
+                a = a[::step]
+            if self.little_endian != np.little_endian:
+                a = a.byteswap()
         else:
-            # Not as fast, but works for reading from tar-files:
-            a = np.frombuffer(self.fd.read(int(count * self.itemsize)),
-                              self.dtype)
-        a.shape = (stop - start,) + self.shape[1:]
-        if step != 1:
-            a = a[::step].copy()
-        if self.little_endian != np.little_endian:
-            a.byteswap(True)
+            self.fd.seek(offset)
+            if self.hasfileno:
+                a = np.fromfile(self.fd, self.dtype, count)
+            else:
+                # Not as fast, but works for reading from tar-files:
+                a = np.frombuffer(self.fd.read(int(count * self.itemsize)),
+                                  self.dtype)
+            a.shape = (stop - start,) + self.shape[1:]
+            if step != 1:
+                a = a[::step].copy()
+            if self.little_endian != np.little_endian:
+                a.byteswap(True)
         if self.length_of_last_dimension is not None:
             a = a[..., :self.length_of_last_dimension]
         if self.scale != 1.0:
-            a *= self.scale
+            a = a * self.scale
         return a
 
+    def read_bytes(self, offset, nbytes):
+        if self.mmap is not None:
+            return self.mmap[offset:offset + nbytes].tobytes()
+        self.fd.seek(offset)
+        return self.fd.read(nbytes)
+
+    def decode(self):
+        """Read and decode whole array stored with a codec."""
+        codec = self.encoding['codec'].split('+')
+        dtype = np.dtype(np.float32 if 'float32' in codec else self.dtype)
+        a = decompress(self.read_bytes(self.offset, self.encoding['nbytes']),
+                       codec, dtype.itemsize)
+        if 'delta' in codec:
+            offset, nbytes = self.encoding['reference']
+            a = a ^ decompress(self.read_bytes(offset, nbytes), codec,
+                               dtype.itemsize)
+        a = np.ascontiguousarray(a).view(dtype)
+        if self.little_endian != np.little_endian:
+            a = a.byteswap()
+        return a.astype(self.dtype).reshape(self.shape)
+
     def proxy(self, *indices):
+        if self.encoding is not None:
+            raise ValueError('Can not make proxy for array stored with codec')
         stride = self.size // len(self)
         start = 0
         for i, index in enumerate(indices):
@@ -568,7 +872,7 @@ class NDArrayReader:
             stride //= self.shape[i + 1]
         offset = self.offset + start * self.itemsize
         p = NDArrayReader(self.fd, self.shape[i + 1:], self.dtype,
-                          offset, self.little_endian)
+                          offset, self.little_endian, self.mmap)
         p.scale = self.scale
         return p
 
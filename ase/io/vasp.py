@@ -4,8 +4,12 @@ Atoms object in VASP POSCAR format.
 
 """
 
+import io
 import os
 import re
+from collections import deque
+from itertools import chain, islice
+
 import ase.units
 
 from ase.utils import basestring
@@ -228,141 +232,266 @@ def read_vasp(filename='CONTCAR'):
     return atoms
 
 
-def read_vasp_out(filename='OUTCAR', index=-1, force_consistent=False):
-    """Import OUTCAR type file.
+def _select_images(images, index):
+    """Return an iterator over images[index] for an iterator of images.
 
-    Reads unitcell, atom positions, energies, and forces from the OUTCAR file
-    and attempts to read constraints (if any) from CONTCAR/POSCAR, if present.
+    Only the images that are needed are kept in memory, unless the
+    selection depends on the total number of images."""
+    if isinstance(index, int):
+        index = slice(index, index + 1 or None)
+    start, stop, step = index.start, index.stop, index.step
+    if ((start is None or start >= 0) and (stop is None or stop >= 0) and
+        (step is None or step > 0)):
+        return islice(images, start, stop, step)
+    if start is not None and start < 0 and stop is None and (step or 1) > 0:
+        return islice(deque(images, maxlen=-start), 0, None, step)
+    return iter(list(images)[index])
+
+
+_digit_minus_digit = re.compile('([0-9])-([0-9])')
+
+
+class OutcarReader:
+    """Read images from an OUTCAR file, also while it is being written.
+
+    The reader remembers how far into the file it has read, so that
+    repeated calls to :meth:`read` only parse the part of the file
+    appended since the previous call::
+
+        reader = OutcarReader('OUTCAR')
+        while running:
+            for atoms in reader.read():
+                ...
+
+    An image is returned when the energy following its positions and
+    forces has been read.  Use ``read(final=True)`` once the file is
+    complete to also get an image still waiting for its energy.
     """
-    import numpy as np
-    from ase.calculators.singlepoint import SinglePointCalculator
-    from ase import Atoms, Atom
 
-    try:  # try to read constraints, first from CONTCAR, then from POSCAR
-        constr = read_vasp('CONTCAR').constraints
-    except Exception:
-        try:
-            constr = read_vasp('POSCAR').constraints
-        except Exception:
-            constr = None
+    def __init__(self, filename='OUTCAR', force_consistent=False,
+                 constraints=None):
+        self.filename = filename
+        self.force_consistent = force_consistent
+        self.constraints = constraints
+        self.offset = 0
+
+        # From the header:
+        self.species = []
+        self.symbols = []
+        self.natoms = 0
+
+        # From the current ionic step:
+        self.cell = None
+        self.energy = 0
+        self.stress = None
+        self.magnetization = []
+        self.magmom = None
+
+        # VASP 5.11? and up write the energy after positions and forces,
+        # so the image has to wait for it:
+        self.energy_after_positions = None
+        self.pending = None
+
+    def read(self, final=False):
+        """Return the images written since the last call."""
+        with open(self.filename, 'rb') as fd:
+            fd.seek(self.offset)
+            images = list(self.parse(fd, final))
+            self.offset = fd.tell()
+        return images
+
+    def parse(self, fd, final=True):
+        """Yield images from fd, starting at its current position.
+
+        With final=False, fd must be opened in binary mode.  A block
+        cut short by the end of the file is then left unread so that
+        parsing can continue from fd.tell() when more has been
+        written."""
+        while True:
+            if not final:
+                start = fd.tell()
+            try:
+                atoms = self._parse_line(fd, final)
+            except EOFError:
+                if not final:
+                    fd.seek(start)
+                break
+            if atoms is not None:
+                yield atoms
+
+        if final and self.pending is not None:
+            atoms = self.pending
+            self.pending = None
+            yield atoms
+
+    def _readline(self, fd, final):
+        line = fd.readline()
+        if not line or not final and not line.endswith(b'\n'):
+            raise EOFError
+        if isinstance(line, bytes):
+            line = line.decode('latin-1')
+        return _digit_minus_digit.sub(r'\1 -\2', line)
+
+    def _parse_line(self, fd, final):
+        """Parse a line and the block it starts.
+
+        Returns the image completed by the block, if any."""
+        line = self._readline(fd, final)
 
-    if isinstance(filename, basestring):
-        f = open(filename)
-    else:  # Assume it's a file-like object
-        f = filename
-    data = f.readlines()
-    natoms = 0
-    images = []
-    atoms = Atoms(pbc=True, constraint=constr)
-    energy = 0
-    species = []
-    species_num = []
-    stress = None
-    symbols = []
-    ecount = 0
-    poscount = 0
-    magnetization = []
-    magmom = None
-
-    for n, line in enumerate(data):
-        if re.search('[0-9]-[0-9]',line):
-            data[n] = re.sub('([0-9])-([0-9])',r'\1 -\2',line)
-    for n, line in enumerate(data):
         if 'POTCAR:' in line:
             temp = line.split()[2]
             for c in ['.', '_', '1']:
                 if c in temp:
                     temp = temp[0:temp.find(c)]
-            species += [temp]
-        if 'ions per type' in line:
-            species = species[:len(species) // 2]
+            self.species += [temp]
+        elif 'ions per type' in line:
+            self.species = self.species[:len(self.species) // 2]
             temp = line.split()
-            ntypes = min(len(temp)-4, len(species))
+            ntypes = min(len(temp) - 4, len(self.species))
             for ispecies in range(ntypes):
-                species_num += [int(temp[ispecies + 4])]
-                natoms += species_num[-1]
-                for iatom in range(species_num[-1]):
-                    symbols += [species[ispecies]]
-        if 'direct lattice vectors' in line:
-            cell = []
-            for i in range(3):
-                temp = data[n + 1 + i].split()
-                cell += [[float(temp[0]), float(temp[1]), float(temp[2])]]
-            atoms.set_cell(cell)
-        if 'FREE ENERGIE OF THE ION-ELECTRON SYSTEM' in line:
+                n = int(temp[ispecies + 4])
+                self.natoms += n
+                self.symbols += [self.species[ispecies]] * n
+        elif 'direct lattice vectors' in line:
+            self.cell = [[float(x) for x in
+                          self._readline(fd, final).split()[:3]]
+                         for i in range(3)]
+        elif 'FREE ENERGIE OF THE ION-ELECTRON SYSTEM' in line:
+            lines = [self._readline(fd, final) for i in range(4)]
             # choose between energy wigh smearing extrapolated to zero
             # or free energy (latter is consistent with forces)
-            energy_zero = float(data[n + 4].split()[6])
-            energy_free = float(data[n + 2].split()[4])
-            energy = energy_zero
-            if force_consistent:
-                energy = energy_free
-            if ecount < poscount:
-                # reset energy for LAST set of atoms, not current one -
-                # VASP 5.11? and up
-                images[-1].calc.results['energy'] = energy
-                images[-1].calc.set(energy=energy)
-            ecount += 1
-        if 'magnetization (x)' in line:
-            magnetization = []
-            for i in range(natoms):
-                magnetization += [float(data[n + 4 + i].split()[4])]
-        if 'number of electron' in line:
+            energy_zero = float(lines[3].split()[6])
+            energy_free = float(lines[1].split()[4])
+            self.energy = energy_zero
+            if self.force_consistent:
+                self.energy = energy_free
+            if self.energy_after_positions is None:
+                self.energy_after_positions = False
+            if self.pending is not None:
+                atoms = self.pending
+                self.pending = None
+                atoms.calc.results['energy'] = self.energy
+                atoms.calc.set(energy=self.energy)
+                return atoms
+        elif 'magnetization (x)' in line:
+            lines = [self._readline(fd, final)
+                     for i in range(3 + self.natoms)]
+            self.magnetization = [float(line.split()[4])
+                                  for line in lines[3:]]
+        elif 'number of electron' in line:
             parts = line.split()
             if len(parts) > 5 and parts[0].strip() != "NELECT":
-                magmom = float(parts[5])
-        if 'in kB ' in line:
+                self.magmom = float(parts[5])
+        elif 'in kB ' in line:
+            import numpy as np
             stress = -np.array([float(a) for a in line.split()[2:]])
-            stress = stress[[0, 1, 2, 4, 5, 3]] * 1e-1 * ase.units.GPa
-        if 'POSITION          ' in line:
-            forces = []
-            positions = []
-            for iatom in range(natoms):
-                temp = data[n + 2 + iatom].split()
-                atoms += Atom(symbols[iatom],
-                              [float(temp[0]), float(temp[1]), float(temp[2])])
-                forces += [[float(temp[3]), float(temp[4]), float(temp[5])]]
-                positions += [[float(temp[0]), float(temp[1]), float(temp[2])]]
-            atoms.set_calculator(SinglePointCalculator(atoms,
-                                                       energy=energy,
-                                                       forces=forces,
-                                                       stress=stress))
-            images += [atoms]
-            if len(magnetization) > 0:
-                mag = np.array(magnetization, float)
-                images[-1].calc.magmoms = mag
-                images[-1].calc.results['magmoms'] = mag
-            if magmom:
-                images[-1].calc.results['magmom'] = magmom
-            atoms = Atoms(pbc=True, constraint=constr)
-            poscount += 1
-
-    # return requested images, code borrowed from ase/io/trajectory.py
-    if isinstance(index, int):
-        return images[index]
+            self.stress = stress[[0, 1, 2, 4, 5, 3]] * 1e-1 * ase.units.GPa
+        elif 'POSITION          ' in line:
+            return self._parse_positions(fd, final)
+
+    def _parse_positions(self, fd, final):
+        import numpy as np
+        from ase import Atoms
+        from ase.calculators.singlepoint import SinglePointCalculator
+
+        self._readline(fd, final)
+        data = np.array([self._readline(fd, final).split()[:6]
+                         for iatom in range(self.natoms)], float)
+        data = data.reshape((-1, 6))
+        atoms = Atoms(self.symbols, positions=data[:, :3], cell=self.cell,
+                      pbc=True, constraint=self.constraints)
+        atoms.set_calculator(SinglePointCalculator(atoms,
+                                                   energy=self.energy,
+                                                   forces=data[:, 3:],
+                                                   stress=self.stress))
+        if len(self.magnetization) > 0:
+            mag = np.array(self.magnetization, float)
+            atoms.calc.magmoms = mag
+            atoms.calc.results['magmoms'] = mag
+        if self.magmom:
+            atoms.calc.results['magmom'] = self.magmom
+
+        if self.energy_after_positions is None:
+            self.energy_after_positions = True
+        if not self.energy_after_positions:
+            return atoms
+        # Wait for the energy.  The previous image never got one:
+        previous = self.pending
+        self.pending = atoms
+        return previous
+
+
+def _read_last_outcar_image(fd, reader):
+    """Read the last image of an OUTCAR file opened in binary mode.
+
+    The header is parsed from the beginning of the file, and after that
+    only as much of the end of the file as needed to hold the last two
+    ionic steps."""
+    images = reader.parse(fd)
+    last = next(images, None)
+    if last is None:
+        return None
+
+    header = fd.tell()
+    try:
+        fd.seek(0, 2)
+    except (ValueError, OSError):
+        pass  # Compressed file that can't seek from the end
     else:
-        step = index.step or 1
-        if step > 0:
-            start = index.start or 0
-            if start < 0:
-                start += len(images)
-            stop = index.stop or len(images)
-            if stop < 0:
-                stop += len(images)
+        size = fd.tell()
+        chunksize = 2**20
+        while True:
+            start = max(size - chunksize, header)
+            fd.seek(start)
+            data = fd.read(size - start)
+            if start > header:
+                # Skip the partial first line:
+                data = data[data.find(b'\n') + 1:]
+            if start == header or data.count(b'POSITION          ') >= 2:
+                break
+            chunksize *= 4
+        reader.pending = None
+        images = reader.parse(io.BytesIO(data))
+
+    for atoms in images:
+        last = atoms
+    return last
+
+
+def read_vasp_out(filename='OUTCAR', index=-1, force_consistent=False):
+    """Import OUTCAR type file.
+
+    Reads unitcell, atom positions, energies, and forces from the OUTCAR file
+    and attempts to read constraints (if any) from CONTCAR/POSCAR, if present.
+
+    Images are parsed one at a time while reading the file.  For the
+    last image, only the header and the end of the file are read.
+    """
+    try:  # try to read constraints, first from CONTCAR, then from POSCAR
+        constr = read_vasp('CONTCAR').constraints
+    except Exception:
+        try:
+            constr = read_vasp('POSCAR').constraints
+        except Exception:
+            constr = None
+
+    if isinstance(filename, basestring):
+        f = open(filename, 'rb')
+    else:  # Assume it's a file-like object
+        f = filename
+
+    reader = OutcarReader(filename, force_consistent, constr)
+    try:
+        if index in [-1, slice(-1, None)] and isinstance(f.read(0), bytes):
+            atoms = _read_last_outcar_image(f, reader)
+            if atoms is not None:
+                yield atoms
         else:
-            if index.start is None:
-                start = len(images) - 1
-            else:
-                start = index.start
-                if start < 0:
-                    start += len(images)
-            if index.stop is None:
-                stop = -1
-            else:
-                stop = index.stop
-                if stop < 0:
-                    stop += len(images)
-        return [images[i] for i in range(start, stop, step)]
+            for atoms in _select_images(reader.parse(f), index):
+                yield atoms
+    finally:
+        if f is not filename:
+            f.close()
 
 
 def read_vasp_xdatcar(filename, index=-1):
@@ -458,21 +587,38 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
 
     Reads unit cell, atom positions, energies, forces, and constraints
     from vasprun.xml file
-    """
 
+    The XML tree of an ionic step is discarded once it has been parsed,
+    unless the step is selected by index.
+    """
+    steps = _iread_vasp_xml(filename)
+    step, context = next(steps)
+    if step is None:
+        # Truncated file without any complete ionic steps:
+        yield context[0]
+        return
+    for step, context in _select_images(chain([(step, context)], steps),
+                                        index):
+        yield _read_xml_step(step, *context)
+
+
+def _iread_vasp_xml(filename):
+    """Yield (calculation element, context) for each ionic step.
+
+    The context holds the information from before the ionic steps
+    needed by _read_xml_step()."""
     import numpy as np
     import xml.etree.ElementTree as ET
     from ase import Atoms
     from ase.constraints import FixAtoms, FixScaled
-    from ase.calculators.singlepoint import (SinglePointDFTCalculator,
-                                             SinglePointKPoint)
-    from ase.units import GPa
     from collections import OrderedDict
 
     tree = ET.iterparse(filename, events=['start', 'end'])
 
+    root = None
     atoms_init = None
-    calculation = []
+    calculation = None  # the step being parsed
+    nsteps = 0
     ibz_kpts = None
     kpt_weights = None
     parameters = OrderedDict()
@@ -550,124 +696,132 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
                                        constraint=constraints,
                                        pbc=True)
 
-                elif elem.tag=='dipole':
-                    dblock = elem.find('v[@name="dipole"]')
-                    if dblock is not None:
-                        dipole = np.array([float(val) for val in dblock.text.split()])
+                elif elem.tag == 'calculation':
+                    calculation = None
+                    nsteps += 1
+                    yield elem, (atoms_init, ibz_kpts, kpt_weights,
+                                 parameters)
+                    root.remove(elem)
 
-            elif event == 'start' and elem.tag == 'calculation':
-                calculation.append(elem)
+            elif event == 'start':
+                if root is None:
+                    root = elem
+                elif elem.tag == 'calculation':
+                    calculation = elem
 
     except ET.ParseError as parse_error:
         if atoms_init is None:
             raise parse_error
-        if calculation[-1].find('energy') is None:
-            calculation = calculation[:-1]
-        if not calculation:
-            yield atoms_init
-
-    if calculation:
-        if isinstance(index, int):
-            steps = [calculation[index]]
-        else:
-            steps = calculation[index]
-    else:
-        steps = []
-
-    for step in steps:
-        # Workaround for VASP bug, e_0_energy contains the wrong value
-        # in calculation/energy, but calculation/scstep/energy does not
-        # include classical VDW corrections. So, first calculate
-        # e_0_energy - e_fr_energy from calculation/scstep/energy, then
-        # apply that correction to e_fr_energy from calculation/energy.
-        lastscf = step.findall('scstep/energy')[-1]
-        try:
-            lastdipole = step.findall('scstep/dipole')[-1]
-        except:
-            lastdipole = None
-
-        de = (float(lastscf.find('i[@name="e_0_energy"]').text) -
-              float(lastscf.find('i[@name="e_fr_energy"]').text))
-
-        free_energy = float(step.find('energy/i[@name="e_fr_energy"]').text)
-        energy = free_energy + de
-
-        cell = np.zeros((3, 3), dtype=float)
-        for i, vector in enumerate(step.find(
-                'structure/crystal/varray[@name="basis"]')):
-            cell[i] = np.array([float(val) for val in vector.text.split()])
-
-        scpos = np.zeros((natoms, 3), dtype=float)
-        for i, vector in enumerate(step.find(
-                'structure/varray[@name="positions"]')):
-            scpos[i] = np.array([float(val) for val in vector.text.split()])
-
-        forces = None
-        fblocks = step.find('varray[@name="forces"]')
-        if fblocks is not None:
-            forces = np.zeros((natoms, 3), dtype=float)
-            for i, vector in enumerate(fblocks):
-                forces[i] = np.array([float(val)
-                                      for val in vector.text.split()])
-
-        stress = None
-        sblocks = step.find('varray[@name="stress"]')
-        if sblocks is not None:
-            stress = np.zeros((3, 3), dtype=float)
-            for i, vector in enumerate(sblocks):
-                stress[i] = np.array([float(val)
-                                      for val in vector.text.split()])
-            stress *= -0.1 * GPa
-            stress = stress.reshape(9)[[0, 4, 8, 5, 2, 1]]
-
-        dipole = None
-        if lastdipole is not None:
-            dblock = lastdipole.find('v[@name="dipole"]')
-            if dblock is not None:
-                dipole = np.zeros((1,3), dtype=float)
-                dipole = np.array([float(val) for val in dblock.text.split()])
-
-        dblock = step.find('dipole/v[@name="dipole"]')
+        context = (atoms_init, ibz_kpts, kpt_weights, parameters)
+        if calculation is not None and calculation.find('energy') is not None:
+            nsteps += 1
+            yield calculation, context
+        if not nsteps:
+            yield None, context
+
+
+def _read_xml_step(step, atoms_init, ibz_kpts, kpt_weights, parameters):
+    """Create Atoms with a calculator from a calculation element."""
+    import numpy as np
+    from ase.calculators.singlepoint import (SinglePointDFTCalculator,
+                                             SinglePointKPoint)
+    from ase.units import GPa
+
+    natoms = len(atoms_init)
+
+    # Workaround for VASP bug, e_0_energy contains the wrong value
+    # in calculation/energy, but calculation/scstep/energy does not
+    # include classical VDW corrections. So, first calculate
+    # e_0_energy - e_fr_energy from calculation/scstep/energy, then
+    # apply that correction to e_fr_energy from calculation/energy.
+    lastscf = step.findall('scstep/energy')[-1]
+    try:
+        lastdipole = step.findall('scstep/dipole')[-1]
+    except:
+        lastdipole = None
+
+    de = (float(lastscf.find('i[@name="e_0_energy"]').text) -
+          float(lastscf.find('i[@name="e_fr_energy"]').text))
+
+    free_energy = float(step.find('energy/i[@name="e_fr_energy"]').text)
+    energy = free_energy + de
+
+    cell = np.zeros((3, 3), dtype=float)
+    for i, vector in enumerate(step.find(
+            'structure/crystal/varray[@name="basis"]')):
+        cell[i] = np.array([float(val) for val in vector.text.split()])
+
+    scpos = np.zeros((natoms, 3), dtype=float)
+    for i, vector in enumerate(step.find(
+            'structure/varray[@name="positions"]')):
+        scpos[i] = np.array([float(val) for val in vector.text.split()])
+
+    forces = None
+    fblocks = step.find('varray[@name="forces"]')
+    if fblocks is not None:
+        forces = np.zeros((natoms, 3), dtype=float)
+        for i, vector in enumerate(fblocks):
+            forces[i] = np.array([float(val)
+                                  for val in vector.text.split()])
+
+    stress = None
+    sblocks = step.find('varray[@name="stress"]')
+    if sblocks is not None:
+        stress = np.zeros((3, 3), dtype=float)
+        for i, vector in enumerate(sblocks):
+            stress[i] = np.array([float(val)
+                                  for val in vector.text.split()])
+        stress *= -0.1 * GPa
+        stress = stress.reshape(9)[[0, 4, 8, 5, 2, 1]]
+
+    dipole = None
+    if lastdipole is not None:
+        dblock = lastdipole.find('v[@name="dipole"]')
         if dblock is not None:
             dipole = np.zeros((1,3), dtype=float)
             dipole = np.array([float(val) for val in dblock.text.split()])
 
-        efermi = step.find('dos/i[@name="efermi"]')
-        if efermi is not None:
-            efermi = float(efermi.text)
-
-        kpoints = []
-        for ikpt in range(1, len(ibz_kpts) + 1):
-            kblocks = step.findall(
-                'eigenvalues/array/set/set/set[@comment="kpoint %d"]' % ikpt)
-            if kblocks is not None:
-                for spin, kpoint in enumerate(kblocks):
-                    eigenvals = kpoint.findall('r')
-                    eps_n = np.zeros(len(eigenvals))
-                    f_n = np.zeros(len(eigenvals))
-                    for j, val in enumerate(eigenvals):
-                        val = val.text.split()
-                        eps_n[j] = float(val[0])
-                        f_n[j] = float(val[1])
-                    if len(kblocks) == 1:
-                        f_n *= 2
-                    kpoints.append(SinglePointKPoint(kpt_weights[ikpt - 1],
-                                                     spin, ikpt, eps_n, f_n))
-        if len(kpoints) == 0:
-            kpoints = None
-
-        atoms = atoms_init.copy()
-        atoms.set_cell(cell)
-        atoms.set_scaled_positions(scpos)
-        atoms.set_calculator(
-            SinglePointDFTCalculator(atoms, energy=energy, forces=forces,
-                                     stress=stress, free_energy=free_energy,
-                                     ibzkpts=ibz_kpts,
-                                     efermi=efermi, dipole=dipole))
-        atoms.calc.name = 'vasp'
-        atoms.calc.kpts = kpoints
-        atoms.calc.parameters = parameters
-        yield atoms
+    dblock = step.find('dipole/v[@name="dipole"]')
+    if dblock is not None:
+        dipole = np.zeros((1,3), dtype=float)
+        dipole = np.array([float(val) for val in dblock.text.split()])
+
+    efermi = step.find('dos/i[@name="efermi"]')
+    if efermi is not None:
+        efermi = float(efermi.text)
+
+    kpoints = []
+    for ikpt in range(1, len(ibz_kpts) + 1):
+        kblocks = step.findall(
+            'eigenvalues/array/set/set/set[@comment="kpoint %d"]' % ikpt)
+        if kblocks is not None:
+            for spin, kpoint in enumerate(kblocks):
+                eigenvals = kpoint.findall('r')
+                eps_n = np.zeros(len(eigenvals))
+                f_n = np.zeros(len(eigenvals))
+                for j, val in enumerate(eigenvals):
+                    val = val.text.split()
+                    eps_n[j] = float(val[0])
+                    f_n[j] = float(val[1])
+                if len(kblocks) == 1:
+                    f_n *= 2
+                kpoints.append(SinglePointKPoint(kpt_weights[ikpt - 1],
+                                                 spin, ikpt, eps_n, f_n))
+    if len(kpoints) == 0:
+        kpoints = None
+
+    atoms = atoms_init.copy()
+    atoms.set_cell(cell)
+    atoms.set_scaled_positions(scpos)
+    atoms.set_calculator(
+        SinglePointDFTCalculator(atoms, energy=energy, forces=forces,
+                                 stress=stress, free_energy=free_energy,
+                                 ibzkpts=ibz_kpts,
+                                 efermi=efermi, dipole=dipole))
+    atoms.calc.name = 'vasp'
+    atoms.calc.kpts = kpoints
+    atoms.calc.parameters = parameters
+    return atoms
 
 
 def write_vasp(filename, atoms, label='', direct=False, sort=None,
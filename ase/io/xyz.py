@@ -4,8 +4,9 @@ compatible with standard XYZ format."""
 
 from ase.atoms import Atoms
 from ase.io.extxyz import read_extxyz as read_xyz, write_extxyz as write_xyz
+from ase.io.extxyz import ixyzchunks
 
-__all__ = ['read_xyz', 'write_xyz']
+__all__ = ['read_xyz', 'write_xyz', 'ixyzchunks']
 
 
 def simple_read_xyz(fileobj, index):
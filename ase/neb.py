@@ -9,7 +9,7 @@ import numpy as np
 import ase.parallel as mpi
 from ase import Atoms
 from ase.build import minimize_rotation_and_translation
-from ase.calculators.calculator import Calculator
+from ase.calculators.calculator import Calculator, calculate_images
 from ase.calculators.singlepoint import SinglePointCalculator
 from ase.io import read
 from ase.optimize import MDMin
@@ -43,8 +43,12 @@ class NEB:
             Spring constant(s) in eV/Ang.  One number or one for each spring.
         climb: bool
             Use a climbing image (default is no climbing image).
-        parallel: bool
-            Distribute images over processors.
+        parallel: bool or 'processes'
+            Distribute images over processors.  With 'processes', the
+            images are calculated by a pool of local worker processes,
+            one per image, which do not need MPI.  Each worker holds a
+            copy of its image and calculator; only the positions are sent
+            to it in later steps.
         remove_rotation_and_translation: bool
             TRUE actives NEB-TR for removing translation and
             rotation during NEB. By default applied non-periodic
@@ -84,7 +88,16 @@ class NEB:
             world = mpi.world
         self.world = world
 
-        if parallel:
+        if parallel == 'processes':
+            try:
+                from concurrent.futures import ProcessPoolExecutor
+            except ImportError:
+                raise ImportError("parallel='processes' requires the "
+                                  'concurrent.futures module (Python 3 or '
+                                  'the futures package)')
+            self.executor_class = ProcessPoolExecutor
+            self.pool = None
+        elif parallel:
             assert world.size == 1 or world.size % (self.nimages - 2) == 0
 
         self.real_forces = None  # ndarray of shape (nimages, natom, 3)
@@ -166,10 +179,14 @@ class NEB:
             energies[-1] = images[-1].get_potential_energy()
 
         if not self.parallel:
-            # Do all images - one at a time:
+            # Images whose calculators can evaluate many configurations
+            # in one call are done together, the rest one at a time:
+            calculate_images(images[1:-1], ['energy', 'forces'])
             for i in range(1, self.nimages - 1):
                 energies[i] = images[i].get_potential_energy()
                 forces[i - 1] = images[i].get_forces()
+        elif self.parallel == 'processes':
+            self.calculate_with_processes(energies, forces)
         elif self.world.size == 1:
             def run(image, energies, forces):
                 energies[:] = image.get_potential_energy()
@@ -307,6 +324,33 @@ class NEB:
         present for compatibility with ase.Atoms.get_potential_energy."""
         return self.emax
 
+    def calculate_with_processes(self, energies, forces):
+        """Calculate the inner images in the worker processes."""
+        calcs = [image.calc for image in self.images[1:-1]]
+        if self.pool is not None and any(
+                calc is not calc0
+                for calc, calc0 in zip(calcs, self.pool.calcs)):
+            # Calculators were replaced (idpp_interpolate() does that):
+            self.close()
+        if self.pool is None:
+            self.pool = ProcessPool(self.images[1:-1], self.executor_class)
+
+        try:
+            results = self.pool.calculate([image.positions
+                                           for image in self.images[1:-1]])
+        except Exception:
+            self.close()
+            raise
+        for i, (energy, f) in enumerate(results):
+            energies[i + 1] = energy
+            forces[i] = f
+
+    def close(self):
+        """Shut down worker processes started with parallel='processes'."""
+        if self.parallel == 'processes' and self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
     def __len__(self):
         # Corresponds to number of optimizable degrees of freedom, i.e.
         # virtual atom count for the optimization algorithm.
@@ -314,7 +358,8 @@ class NEB:
 
     def iterimages(self):
         # Allows trajectory to convert NEB into several images
-        if not self.parallel or self.world.size == 1:
+        if not self.parallel or (self.parallel != 'processes' and
+                                 self.world.size == 1):
             for atoms in self.images:
                 yield atoms
             return
@@ -330,6 +375,50 @@ class NEB:
                 yield atoms
 
 
+class ProcessPool:
+    """Worker processes for the inner images of an NEB.
+
+    Every image gets its own single-process executor so that the
+    calculator stays in the same process between steps.  The first job
+    sent to a worker carries the image and its calculator; later jobs
+    only carry the positions."""
+
+    def __init__(self, images, executor_class):
+        self.images = images
+        self.calcs = [image.calc for image in images]
+        self.executors = [executor_class(max_workers=1)
+                          for image in images]
+        self.started = False
+
+    def calculate(self, positions):
+        """Return list of (energy, forces) tuples for new positions."""
+        if self.started:
+            images = [None] * len(self.images)
+        else:
+            images = self.images
+        self.started = True
+        futures = [executor.submit(_calculate_image, image, pos)
+                   for executor, image, pos
+                   in zip(self.executors, images, positions)]
+        return [future.result() for future in futures]
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown()
+
+
+# Image of a worker process of a ProcessPool:
+_worker = {}
+
+
+def _calculate_image(image, positions):
+    if image is not None:
+        _worker['image'] = image
+    image = _worker['image']
+    image.set_positions(positions, apply_constraint=False)
+    return image.get_potential_energy(), image.get_forces()
+
+
 class IDPP(Calculator):
     """Image dependent pair potential.
 
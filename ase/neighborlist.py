@@ -38,9 +38,230 @@ def mic(dr, cell, pbc=None):
     return dr - np.dot(cell_shift_vectors, cell)
 
 
+def _padded_bin_pairs(bin_index_i, nbins_c, neigh_search_c):
+    """Find candidate pairs by looping over padded bins.
+
+    Every bin is padded to the occupation of the most populated bin, so the
+    cost scales with the number of bins times the square of the maximum
+    bin occupation. Returns first atom, second atom and the shift vector of
+    the neighboring bin for each candidate pair.
+    """
+    nbins = np.prod(nbins_c)
+    neigh_search_x, neigh_search_y, neigh_search_z = neigh_search_c
+
+    # atom_i contains atom index in new sort order.
+    atom_i = np.argsort(bin_index_i)
+    bin_index_i = bin_index_i[atom_i]
+
+    # Find max number of atoms per bin
+    max_natoms_per_bin = np.bincount(bin_index_i).max()
+
+    # Sort atoms into bins: atoms_in_bin_ba contains for each bin (identified
+    # by its scalar bin index) a list of atoms inside that bin. This list is
+    # homogeneous, i.e. has the same size *max_natoms_per_bin* for all bins.
+    # The list is padded with -1 values.
+    atoms_in_bin_ba = -np.ones([nbins, max_natoms_per_bin], dtype=int)
+    for i in range(max_natoms_per_bin):
+        # Create a mask array that identifies the first atom of each bin.
+        mask = np.append([True], bin_index_i[:-1] != bin_index_i[1:])
+        # Assign all first atoms.
+        atoms_in_bin_ba[bin_index_i[mask], i] = atom_i[mask]
+
+        # Remove atoms that we just sorted into atoms_in_bin_ba. The next
+        # "first" atom will be the second and so on.
+        mask = np.logical_not(mask)
+        atom_i = atom_i[mask]
+        bin_index_i = bin_index_i[mask]
+
+    # Make sure that all atoms have been sorted into bins.
+    assert len(atom_i) == 0
+    assert len(bin_index_i) == 0
+
+    # Now we construct neighbor pairs by pairing up all atoms within a bin or
+    # between bin and neighboring bin. atom_pairs_pn is a helper buffer that
+    # contains all potential pairs of atoms between two bins, i.e. it is a list
+    # of length max_natoms_per_bin**2.
+    atom_pairs_pn = np.indices((max_natoms_per_bin, max_natoms_per_bin),
+                               dtype=int)
+    atom_pairs_pn = atom_pairs_pn.reshape(2, -1)
+
+    # Initialized empty neighbor list buffers.
+    first_at_neightuple_nn = []
+    secnd_at_neightuple_nn = []
+    cell_shift_vector_x_n = []
+    cell_shift_vector_y_n = []
+    cell_shift_vector_z_n = []
+
+    # This is the main neighbor list search. We loop over neighboring bins and
+    # then construct all possible pairs of atoms between two bins, assuming
+    # that each bin contains exactly max_natoms_per_bin atoms. We then throw
+    # out pairs involving pad atoms with atom index -1 below.
+    binz_xyz, biny_xyz, binx_xyz = np.meshgrid(np.arange(nbins_c[2]),
+                                               np.arange(nbins_c[1]),
+                                               np.arange(nbins_c[0]),
+                                               indexing='ij')
+    # The memory layout of binx_xyz, biny_xyz, binz_xyz is such that computing
+    # the respective bin index leads to a linearly increasing consecutive list.
+    # The following assert statement succeeds:
+    #     b_b = (binx_xyz + nbins_c[0] * (biny_xyz + nbins_c[1] *
+    #                                     binz_xyz)).ravel()
+    #     assert (b_b == np.arange(np.prod(nbins_c))).all()
+
+    # First atoms in pair.
+    _first_at_neightuple_n = atoms_in_bin_ba[:, atom_pairs_pn[0]]
+    for dz in range(-neigh_search_z, neigh_search_z+1):
+        for dy in range(-neigh_search_y, neigh_search_y+1):
+            for dx in range(-neigh_search_x, neigh_search_x+1):
+                # Bin index of neighboring bin and shift vector.
+                shiftx_xyz, neighbinx_xyz = divmod(binx_xyz + dx, nbins_c[0])
+                shifty_xyz, neighbiny_xyz = divmod(biny_xyz + dy, nbins_c[1])
+                shiftz_xyz, neighbinz_xyz = divmod(binz_xyz + dz, nbins_c[2])
+                neighbin_b = (neighbinx_xyz + nbins_c[0] *
+                              (neighbiny_xyz + nbins_c[1] * neighbinz_xyz)
+                              ).ravel()
+
+                # Second atom in pair.
+                _secnd_at_neightuple_n = \
+                    atoms_in_bin_ba[neighbin_b][:, atom_pairs_pn[1]]
+
+                # Shift vectors.
+                _cell_shift_vector_x_n = \
+                    np.resize(shiftx_xyz.reshape(-1, 1),
+                              (max_natoms_per_bin**2, shiftx_xyz.size)).T
+                _cell_shift_vector_y_n = \
+                    np.resize(shifty_xyz.reshape(-1, 1),
+                              (max_natoms_per_bin**2, shifty_xyz.size)).T
+                _cell_shift_vector_z_n = \
+                    np.resize(shiftz_xyz.reshape(-1, 1),
+                              (max_natoms_per_bin**2, shiftz_xyz.size)).T
+
+                # We have created too many pairs because we assumed each bin
+                # has exactly max_natoms_per_bin atoms. Remove all surperfluous
+                # pairs. Those are pairs that involve an atom with index -1.
+                mask = np.logical_and(_first_at_neightuple_n != -1,
+                                      _secnd_at_neightuple_n != -1)
+                if mask.sum() > 0:
+                    first_at_neightuple_nn += [_first_at_neightuple_n[mask]]
+                    secnd_at_neightuple_nn += [_secnd_at_neightuple_n[mask]]
+                    cell_shift_vector_x_n += [_cell_shift_vector_x_n[mask]]
+                    cell_shift_vector_y_n += [_cell_shift_vector_y_n[mask]]
+                    cell_shift_vector_z_n += [_cell_shift_vector_z_n[mask]]
+
+    # Flatten overall neighbor list.
+    first_at_neightuple_n = np.concatenate(first_at_neightuple_nn)
+    secnd_at_neightuple_n = np.concatenate(secnd_at_neightuple_nn)
+    cell_shift_vector_n = np.transpose([np.concatenate(cell_shift_vector_x_n),
+                                        np.concatenate(cell_shift_vector_y_n),
+                                        np.concatenate(cell_shift_vector_z_n)])
+
+    return (first_at_neightuple_n, secnd_at_neightuple_n,
+            cell_shift_vector_n)
+
+
+def _linked_cell_pairs(bin_index_ic, bin_index_i, nbins_c, neigh_search_c,
+                       pbc, cell_shift_ic, positions, cell, max_cutoff,
+                       first_atom_i=None):
+    """Find candidate pairs with a linked-cell list.
+
+    Atoms are sorted by bin and each bin is stored as a contiguous slice of
+    the sorted atom array, so no padding is needed. For every atom and every
+    neighboring bin the atoms of that bin are enumerated directly. The cost
+    is proportional to the number of candidate pairs, i.e. linear in the
+    number of atoms at fixed density, independent of how unevenly the atoms
+    are distributed over the bins. Candidate pairs are discarded as soon as
+    they are found to be farther apart than *max_cutoff*, so that only
+    actual pairs are carried into the sorting step. If *first_atom_i* is
+    given, only pairs whose first atom is in *first_atom_i* are enumerated.
+    Returns first atom, second atom and the shift vector of the neighboring
+    bin for each pair.
+    """
+    natoms = len(bin_index_i)
+    nbins = np.prod(nbins_c)
+
+    # Atoms sorted by bin. Atoms in bin b are
+    # atom_a[first_atom_in_bin_b[b]:first_atom_in_bin_b[b]+natoms_in_bin_b[b]]
+    atom_a = np.argsort(bin_index_i, kind='mergesort')
+    natoms_in_bin_b = np.bincount(bin_index_i, minlength=nbins)
+    first_atom_in_bin_b = np.cumsum(natoms_in_bin_b) - natoms_in_bin_b
+
+    if first_atom_i is None:
+        atom_i = np.arange(natoms)
+    else:
+        atom_i = np.asarray(first_atom_i, dtype=int)
+    bin_index_of_first_atom_ic = bin_index_ic[atom_i]
+
+    first_at_neightuple_nn = []
+    secnd_at_neightuple_nn = []
+    cell_shift_vector_nn = []
+
+    neigh_search_x, neigh_search_y, neigh_search_z = neigh_search_c
+    for dz in range(-neigh_search_z, neigh_search_z+1):
+        for dy in range(-neigh_search_y, neigh_search_y+1):
+            for dx in range(-neigh_search_x, neigh_search_x+1):
+                # Bin index of neighboring bin and shift vector, for the bin
+                # of every atom.
+                shift_ic, neighbin_ic = divmod(bin_index_of_first_atom_ic +
+                                               [dx, dy, dz], nbins_c)
+
+                # Bonds crossing a nonperiodic boundary are never valid, so
+                # we drop them before enumerating any pairs.
+                mask = np.ones(len(atom_i), dtype=bool)
+                for c in range(3):
+                    if not pbc[c]:
+                        mask &= shift_ic[:, c] == 0
+                if not mask.any():
+                    continue
+                _first_at_neightuple_i = atom_i[mask]
+                shift_ic = shift_ic[mask]
+                neighbin_ic = neighbin_ic[mask]
+                neighbin_i = (neighbin_ic[:, 0] + nbins_c[0] *
+                              (neighbin_ic[:, 1] + nbins_c[1] *
+                               neighbin_ic[:, 2]))
+
+                # Each first atom pairs up with all atoms in its neighboring
+                # bin.
+                count_i = natoms_in_bin_b[neighbin_i]
+                npairs = count_i.sum()
+                if npairs == 0:
+                    continue
+
+                # Position of each pair within the sorted atom array: start
+                # of the neighboring bin plus running index within that bin.
+                pair_start_i = np.cumsum(count_i) - count_i
+                index_n = np.repeat(first_atom_in_bin_b[neighbin_i] -
+                                    pair_start_i, count_i) + np.arange(npairs)
+
+                _first_at_neightuple_n = np.repeat(_first_at_neightuple_i,
+                                                   count_i)
+                _secnd_at_neightuple_n = atom_a[index_n]
+                _cell_shift_vector_n = np.repeat(shift_ic, count_i, axis=0)
+
+                # Only keep pairs within the maximum cutoff.
+                distance_vector_nc = \
+                    positions[_secnd_at_neightuple_n] - \
+                    positions[_first_at_neightuple_n] + \
+                    (_cell_shift_vector_n +
+                     cell_shift_ic[_first_at_neightuple_n] -
+                     cell_shift_ic[_secnd_at_neightuple_n]).dot(cell)
+                mask = (distance_vector_nc**2).sum(axis=1) < max_cutoff**2
+
+                first_at_neightuple_nn += [_first_at_neightuple_n[mask]]
+                secnd_at_neightuple_nn += [_secnd_at_neightuple_n[mask]]
+                cell_shift_vector_nn += [_cell_shift_vector_n[mask]]
+
+    if len(first_at_neightuple_nn) == 0:
+        return (np.zeros(0, dtype=int), np.zeros(0, dtype=int),
+                np.zeros((0, 3), dtype=int))
+
+    return (np.concatenate(first_at_neightuple_nn),
+            np.concatenate(secnd_at_neightuple_nn),
+            np.concatenate(cell_shift_vector_nn))
+
+
 def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
                             numbers=None, self_interaction=False,
-                            use_scaled_positions=False, max_nbins=1e6):
+                            use_scaled_positions=False, max_nbins=1e6,
+                            method='bins', first_atoms=None):
     """Compute a neighbor list for an atomic configuration.
 
     Atoms outside periodic boundaries are mapped into the box. Atoms
@@ -93,6 +314,16 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
     max_nbins: int
         Maximum number of bins used in neighbor search. This is used to limit
         the maximum amount of memory required by the neighbor list.
+    method: str
+        Algorithm used to search the bins for neighbors. 'bins' (default)
+        pads every bin to the occupation of the fullest bin. 'linkedcell'
+        uses a linked-cell list that only visits actual atoms; it scales
+        linearly with the number of atoms at fixed density and is faster for
+        large or inhomogeneous systems (slabs, clusters in vacuum, melts).
+    first_atoms: list of int
+        Only return pairs whose first atom 'i' is one of these atoms.  All
+        atoms are still considered as second atom 'j'.  Default is to return
+        pairs for all atoms.
 
     Returns:
 
@@ -166,6 +397,16 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
     neigh_search_x, neigh_search_y, neigh_search_z = \
         np.ceil(bin_size * nbins_c / face_dist_c).astype(int)
 
+    # Along nonperiodic directions there are no neighbors further away than
+    # the number of bins. This matters for large cutoffs in small or
+    # nonperiodic cells.
+    if not pbc[0]:
+        neigh_search_x = min(neigh_search_x, nbins_c[0] - 1)
+    if not pbc[1]:
+        neigh_search_y = min(neigh_search_y, nbins_c[1] - 1)
+    if not pbc[2]:
+        neigh_search_z = min(neigh_search_z, nbins_c[2] - 1)
+
     # Sort atoms into bins.
     if use_scaled_positions:
         scaled_positions_ic = positions
@@ -189,110 +430,22 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
                    nbins_c[0] * (bin_index_ic[:, 1] +
                                  nbins_c[1] * bin_index_ic[:, 2]))
 
-    # atom_i contains atom index in new sort order.
-    atom_i = np.argsort(bin_index_i)
-    bin_index_i = bin_index_i[atom_i]
-
-    # Find max number of atoms per bin
-    max_natoms_per_bin = np.bincount(bin_index_i).max()
-
-    # Sort atoms into bins: atoms_in_bin_ba contains for each bin (identified
-    # by its scalar bin index) a list of atoms inside that bin. This list is
-    # homogeneous, i.e. has the same size *max_natoms_per_bin* for all bins.
-    # The list is padded with -1 values.
-    atoms_in_bin_ba = -np.ones([nbins, max_natoms_per_bin], dtype=int)
-    for i in range(max_natoms_per_bin):
-        # Create a mask array that identifies the first atom of each bin.
-        mask = np.append([True], bin_index_i[:-1] != bin_index_i[1:])
-        # Assign all first atoms.
-        atoms_in_bin_ba[bin_index_i[mask], i] = atom_i[mask]
-
-        # Remove atoms that we just sorted into atoms_in_bin_ba. The next
-        # "first" atom will be the second and so on.
-        mask = np.logical_not(mask)
-        atom_i = atom_i[mask]
-        bin_index_i = bin_index_i[mask]
-
-    # Make sure that all atoms have been sorted into bins.
-    assert len(atom_i) == 0
-    assert len(bin_index_i) == 0
-
-    # Now we construct neighbor pairs by pairing up all atoms within a bin or
-    # between bin and neighboring bin. atom_pairs_pn is a helper buffer that
-    # contains all potential pairs of atoms between two bins, i.e. it is a list
-    # of length max_natoms_per_bin**2.
-    atom_pairs_pn = np.indices((max_natoms_per_bin, max_natoms_per_bin),
-                               dtype=int)
-    atom_pairs_pn = atom_pairs_pn.reshape(2, -1)
-
-    # Initialized empty neighbor list buffers.
-    first_at_neightuple_nn = []
-    secnd_at_neightuple_nn = []
-    cell_shift_vector_x_n = []
-    cell_shift_vector_y_n = []
-    cell_shift_vector_z_n = []
-
-    # This is the main neighbor list search. We loop over neighboring bins and
-    # then construct all possible pairs of atoms between two bins, assuming
-    # that each bin contains exactly max_natoms_per_bin atoms. We then throw
-    # out pairs involving pad atoms with atom index -1 below.
-    binz_xyz, biny_xyz, binx_xyz = np.meshgrid(np.arange(nbins_c[2]),
-                                               np.arange(nbins_c[1]),
-                                               np.arange(nbins_c[0]),
-                                               indexing='ij')
-    # The memory layout of binx_xyz, biny_xyz, binz_xyz is such that computing
-    # the respective bin index leads to a linearly increasing consecutive list.
-    # The following assert statement succeeds:
-    #     b_b = (binx_xyz + nbins_c[0] * (biny_xyz + nbins_c[1] *
-    #                                     binz_xyz)).ravel()
-    #     assert (b_b == np.arange(np.prod(nbins_c))).all()
-
-    # First atoms in pair.
-    _first_at_neightuple_n = atoms_in_bin_ba[:, atom_pairs_pn[0]]
-    for dz in range(-neigh_search_z, neigh_search_z+1):
-        for dy in range(-neigh_search_y, neigh_search_y+1):
-            for dx in range(-neigh_search_x, neigh_search_x+1):
-                # Bin index of neighboring bin and shift vector.
-                shiftx_xyz, neighbinx_xyz = divmod(binx_xyz + dx, nbins_c[0])
-                shifty_xyz, neighbiny_xyz = divmod(biny_xyz + dy, nbins_c[1])
-                shiftz_xyz, neighbinz_xyz = divmod(binz_xyz + dz, nbins_c[2])
-                neighbin_b = (neighbinx_xyz + nbins_c[0] *
-                              (neighbiny_xyz + nbins_c[1] * neighbinz_xyz)
-                              ).ravel()
-
-                # Second atom in pair.
-                _secnd_at_neightuple_n = \
-                    atoms_in_bin_ba[neighbin_b][:, atom_pairs_pn[1]]
-
-                # Shift vectors.
-                _cell_shift_vector_x_n = \
-                    np.resize(shiftx_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftx_xyz.size)).T
-                _cell_shift_vector_y_n = \
-                    np.resize(shifty_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shifty_xyz.size)).T
-                _cell_shift_vector_z_n = \
-                    np.resize(shiftz_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftz_xyz.size)).T
-
-                # We have created too many pairs because we assumed each bin
-                # has exactly max_natoms_per_bin atoms. Remove all surperfluous
-                # pairs. Those are pairs that involve an atom with index -1.
-                mask = np.logical_and(_first_at_neightuple_n != -1,
-                                      _secnd_at_neightuple_n != -1)
-                if mask.sum() > 0:
-                    first_at_neightuple_nn += [_first_at_neightuple_n[mask]]
-                    secnd_at_neightuple_nn += [_secnd_at_neightuple_n[mask]]
-                    cell_shift_vector_x_n += [_cell_shift_vector_x_n[mask]]
-                    cell_shift_vector_y_n += [_cell_shift_vector_y_n[mask]]
-                    cell_shift_vector_z_n += [_cell_shift_vector_z_n[mask]]
-
-    # Flatten overall neighbor list.
-    first_at_neightuple_n = np.concatenate(first_at_neightuple_nn)
-    secnd_at_neightuple_n = np.concatenate(secnd_at_neightuple_nn)
-    cell_shift_vector_n = np.transpose([np.concatenate(cell_shift_vector_x_n),
-                                        np.concatenate(cell_shift_vector_y_n),
-                                        np.concatenate(cell_shift_vector_z_n)])
+    neigh_search_c = (neigh_search_x, neigh_search_y, neigh_search_z)
+    if method == 'bins':
+        first_at_neightuple_n, secnd_at_neightuple_n, cell_shift_vector_n = \
+            _padded_bin_pairs(bin_index_i, nbins_c, neigh_search_c)
+        if first_atoms is not None:
+            m = np.in1d(first_at_neightuple_n, first_atoms)
+            first_at_neightuple_n = first_at_neightuple_n[m]
+            secnd_at_neightuple_n = secnd_at_neightuple_n[m]
+            cell_shift_vector_n = cell_shift_vector_n[m]
+    elif method == 'linkedcell':
+        first_at_neightuple_n, secnd_at_neightuple_n, cell_shift_vector_n = \
+            _linked_cell_pairs(bin_index_ic, bin_index_i, nbins_c,
+                               neigh_search_c, pbc, cell_shift_ic, positions,
+                               cell, max_cutoff, first_atom_i=first_atoms)
+    else:
+        raise ValueError('Unknown neighbor list method: {0}'.format(method))
 
     # Add global cell shift to shift vectors
     cell_shift_vector_n += cell_shift_ic[first_at_neightuple_n] - \
@@ -404,7 +557,7 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
 
 
 def neighbor_list(quantities, a, cutoff, self_interaction=False,
-                  max_nbins=1e6):
+                  max_nbins=1e6, method='bins'):
     """Compute a neighbor list for an atomic configuration.
 
     Atoms outside periodic boundaries are mapped into the box. Atoms
@@ -449,6 +602,12 @@ def neighbor_list(quantities, a, cutoff, self_interaction=False,
     max_nbins: int
         Maximum number of bins used in neighbor search. This is used to limit
         the maximum amount of memory required by the neighbor list.
+    method: str
+        Algorithm used to search the bins for neighbors. 'bins' (default)
+        pads every bin to the occupation of the fullest bin. 'linkedcell'
+        uses a linked-cell list that only visits actual atoms; it scales
+        linearly with the number of atoms at fixed density and is faster for
+        large or inhomogeneous systems (slabs, clusters in vacuum, melts).
 
     Returns:
 
@@ -514,7 +673,7 @@ def neighbor_list(quantities, a, cutoff, self_interaction=False,
                                    a.get_cell(complete=True),
                                    a.positions, cutoff, numbers=a.numbers,
                                    self_interaction=self_interaction,
-                                   max_nbins=max_nbins)
+                                   max_nbins=max_nbins, method=method)
 
 
 def first_neighbors(natoms, first_atom):
@@ -640,6 +799,17 @@ class NewPrimitiveNeighborList:
     bothways: bool
         Return all neighbors.  Default is to return only "half" of
         the neighbors.
+    method: str
+        Neighbor search algorithm passed on to
+        :func:`~ase.neighborlist.primitive_neighbor_list`: 'bins' or
+        'linkedcell'.
+    incremental: bool
+        If only a few atoms have moved more than the skin-distance, search
+        new neighbors for those atoms only and patch the existing list
+        instead of rebuilding it from scratch.  A full rebuild is still done
+        if the cell or boundary conditions change or if more than a quarter
+        of the atoms have moved.  The number of full and partial rebuilds
+        is counted in the attributes *nfullupdates* and *npartialupdates*.
 
     Example::
 
@@ -649,14 +819,19 @@ class NewPrimitiveNeighborList:
     """
 
     def __init__(self, cutoffs, skin=0.3, sorted=False, self_interaction=True,
-                 bothways=False, use_scaled_positions=False):
+                 bothways=False, use_scaled_positions=False, method='bins',
+                 incremental=False):
         self.cutoffs = np.asarray(cutoffs) + skin
         self.skin = skin
         self.sorted = sorted
         self.self_interaction = self_interaction
         self.bothways = bothways
         self.nupdates = 0
+        self.nfullupdates = 0
+        self.npartialupdates = 0
         self.use_scaled_positions = use_scaled_positions
+        self.method = method
+        self.incremental = incremental
         self.nneighbors = 0
         self.npbcneighbors = 0
 
@@ -667,12 +842,20 @@ class NewPrimitiveNeighborList:
             self.build(pbc, cell, positions, numbers=numbers)
             return True
 
-        if ((self.pbc != pbc).any() or (self.cell != cell).any() or
-            ((self.positions - positions)**2).sum(1).max() > self.skin**2):
+        if (self.pbc != pbc).any() or (self.cell != cell).any():
             self.build(pbc, cell, positions, numbers=numbers)
             return True
 
-        return False
+        moved = ((self.positions - positions)**2).sum(1) > self.skin**2
+        if not moved.any():
+            return False
+
+        if self.incremental and 4 * moved.sum() <= len(positions):
+            self.partial_build(positions, np.nonzero(moved)[0],
+                               numbers=numbers)
+        else:
+            self.build(pbc, cell, positions, numbers=numbers)
+        return True
 
     def build(self, pbc, cell, positions, numbers=None):
         """Build the list.
@@ -685,42 +868,107 @@ class NewPrimitiveNeighborList:
             primitive_neighbor_list(
                 'ijS', pbc, cell, positions, self.cutoffs, numbers=numbers,
                 self_interaction=self.self_interaction,
-                use_scaled_positions=self.use_scaled_positions)
+                use_scaled_positions=self.use_scaled_positions,
+                method=self.method)
 
         if len(positions) > 0 and not self.bothways:
-            mask = np.logical_or(
-                np.logical_and(
-                    self.pair_first <= self.pair_second,
-                    (self.offset_vec == 0).all(axis=1)
-                    ),
-                np.logical_or(
-                    self.offset_vec[:, 0] > 0,
-                    np.logical_and(
-                        self.offset_vec[:, 0] == 0,
-                        np.logical_or(
-                            self.offset_vec[:, 1] > 0,
-                            np.logical_and(
-                                self.offset_vec[:, 1] == 0,
-                                self.offset_vec[:, 2] > 0)
-                            )
-                        )
-                    )
-                )
-            self.pair_first = self.pair_first[mask]
-            self.pair_second = self.pair_second[mask]
-            self.offset_vec = self.offset_vec[mask]
+            self._remove_reverse_pairs()
 
         if len(positions) > 0 and self.sorted:
-            mask = np.argsort(self.pair_first * len(self.pair_first) +
-                              self.pair_second)
+            self._sort_pairs()
+
+        # Compute the index array point to the first neighbor
+        self.first_neigh = first_neighbors(len(positions), self.pair_first)
+
+        self.nupdates += 1
+        self.nfullupdates += 1
+
+    def partial_build(self, positions, moved_atoms, numbers=None):
+        """Update the list for atoms that have moved.
+
+        Pairs involving any of the atoms in *moved_atoms* are removed and
+        the neighbors of these atoms are searched again at their new
+        positions.  All other atoms keep the reference positions of the
+        last build, so that the list stays valid as long as no atom moves
+        more than the skin-distance away from its reference position.
+        """
+        natoms = len(self.positions)
+        positions = np.asarray(positions)
+        self.positions[moved_atoms] = positions[moved_atoms]
+
+        # Drop all pairs that involve a moved atom.
+        is_moved = np.zeros(natoms, dtype=bool)
+        is_moved[moved_atoms] = True
+        mask = np.logical_not(np.logical_or(is_moved[self.pair_first],
+                                            is_moved[self.pair_second]))
+        pair_first = self.pair_first[mask]
+        pair_second = self.pair_second[mask]
+        offset_vec = self.offset_vec[mask]
+
+        # Search all neighbors of the moved atoms. The linked-cell search
+        # only enumerates pairs of the moved atoms.
+        new_first, new_second, new_offset = primitive_neighbor_list(
+            'ijS', self.pbc, self.cell, self.positions, self.cutoffs,
+            numbers=numbers, self_interaction=self.self_interaction,
+            use_scaled_positions=self.use_scaled_positions,
+            method='linkedcell', first_atoms=moved_atoms)
+
+        # Pairs between two moved atoms were found in both directions, all
+        # other pairs have to be added in reverse direction.
+        mask = np.logical_not(is_moved[new_second])
+        self.pair_first = np.concatenate([pair_first, new_first,
+                                          new_second[mask]])
+        self.pair_second = np.concatenate([pair_second, new_second,
+                                           new_first[mask]])
+        self.offset_vec = np.concatenate([offset_vec, new_offset,
+                                          -new_offset[mask]])
+
+        if not self.bothways:
+            self._remove_reverse_pairs()
+
+        if self.sorted:
+            self._sort_pairs()
+        else:
+            mask = np.argsort(self.pair_first, kind='mergesort')
             self.pair_first = self.pair_first[mask]
             self.pair_second = self.pair_second[mask]
             self.offset_vec = self.offset_vec[mask]
 
-        # Compute the index array point to the first neighbor
-        self.first_neigh = first_neighbors(len(positions), self.pair_first)
+        self.first_neigh = first_neighbors(natoms, self.pair_first)
 
         self.nupdates += 1
+        self.npartialupdates += 1
+
+    def _remove_reverse_pairs(self):
+        """Keep only one of the pairs (i, j, S) and (j, i, -S)."""
+        mask = np.logical_or(
+            np.logical_and(
+                self.pair_first <= self.pair_second,
+                (self.offset_vec == 0).all(axis=1)
+                ),
+            np.logical_or(
+                self.offset_vec[:, 0] > 0,
+                np.logical_and(
+                    self.offset_vec[:, 0] == 0,
+                    np.logical_or(
+                        self.offset_vec[:, 1] > 0,
+                        np.logical_and(
+                            self.offset_vec[:, 1] == 0,
+                            self.offset_vec[:, 2] > 0)
+                        )
+                    )
+                )
+            )
+        self.pair_first = self.pair_first[mask]
+        self.pair_second = self.pair_second[mask]
+        self.offset_vec = self.offset_vec[mask]
+
+    def _sort_pairs(self):
+        mask = np.argsort(self.pair_first * len(self.pair_first) +
+                          self.pair_second)
+        self.pair_first = self.pair_first[mask]
+        self.pair_second = self.pair_second[mask]
+        self.offset_vec = self.offset_vec[mask]
 
     def get_neighbors(self, a):
         """Return neighbors of atom number a.
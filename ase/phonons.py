@@ -14,11 +14,13 @@ import numpy.fft as fft
 import ase.units as units
 from ase.parallel import rank
 from ase.dft import monkhorst_pack
+from ase.calculators.calculator import has_batch_support
 from ase.io.trajectory import Trajectory
+from ase.vibrations.vibrations import DisplacementResults, chunks
 from ase.utils import opencew, pickleload, basestring
 
 
-class Displacement:
+class Displacement(DisplacementResults):
     """Abstract base class for phonon and el-ph supercell calculations.
 
     Both phonons and the electron-phonon interaction in periodic systems can be
@@ -66,6 +68,7 @@ class Displacement:
         self.name = name
         self.delta = delta
         self.N_c = supercell
+        self.combined = None
 
         # Reference cell offset
         if refcell is None:
@@ -78,6 +81,10 @@ class Displacement:
                            N_c[1] // 2 * N_c[2] +
                            N_c[2] // 2)
 
+    # Properties that the calculator can evaluate for all displacements
+    # in one call before __call__ is invoked for each of them:
+    batch_properties = None
+
     def __call__(self, *args, **kwargs):
         """Member function called in the ``run`` function."""
 
@@ -123,7 +130,7 @@ class Displacement:
 
         return R_cN
 
-    def run(self):
+    def run(self, executor=None):
         """Run the calculations for the required displacements.
 
         This will do a calculation for 6 displacements per atom, +-x, +-y, and
@@ -132,8 +139,21 @@ class Displacement:
         file (ending with .pckl), which must be deleted before restarting the
         job. Otherwise the calculation for that displacement will not be done.
 
+        If the calculator can evaluate many configurations in one call and
+        the derived class sets ``batch_properties``, the missing
+        displacements are calculated in batches of ``batch_size``.
+
+        executor: object with a map() method
+            Distribute the displacements over the workers of an executor,
+            for example a ``concurrent.futures.ProcessPoolExecutor``.  The
+            results are collected in a single file, <name>.all.pckl.
+            Requires ``batch_properties``.
         """
 
+        if executor is not None and self.batch_properties is None:
+            raise NotImplementedError('{} can not use an executor'
+                                      .format(self.__class__.__name__))
+
         # Atoms in the supercell -- repeated in the lattice vector directions
         # beginning with the last
         atoms_N = self.atoms * self.N_c
@@ -142,19 +162,33 @@ class Displacement:
         assert self.calc is not None, "Provide calculator in __init__ method"
         atoms_N.set_calculator(self.calc)
 
-        # Do calculation on equilibrium structure
-        filename = self.name + '.eq.pckl'
+        if executor is not None:
+            def jobs():
+                for filename, atoms in self.iterdisplace(atoms_N):
+                    atoms = atoms.copy()
+                    atoms.set_calculator(self.calc)
+                    yield filename, atoms
+
+            self.calculate_with_executor(executor, jobs(),
+                                         self.batch_properties)
+        elif (self.batch_properties is not None and
+              has_batch_support(self.calc)):
+            self.run_batch(atoms_N)
+        else:
+            for filename, atoms in self.iterdisplace(atoms_N):
+                fd = opencew(filename)
+                if fd is not None:
+                    # Call derived class implementation of __call__
+                    self.write_output(self.__call__(atoms), filename, fd)
+
+    def iterdisplace(self, atoms_N):
+        """Yield filename and supercell for all required displacements.
+
+        The displaced structure is *atoms_N* itself, which is returned to
+        its initial positions afterwards."""
 
-        fd = opencew(filename)
-        if fd is not None:
-            # Call derived class implementation of __call__
-            output = self.__call__(atoms_N)
-            # Write output to file
-            if rank == 0:
-                pickle.dump(output, fd, protocol=2)
-                sys.stdout.write('Writing %s\n' % filename)
-                fd.close()
-            sys.stdout.flush()
+        # Equilibrium structure
+        yield self.name + '.eq.pckl', atoms_N
 
         # Positions of atoms to be displaced in the reference cell
         natoms = len(self.atoms)
@@ -168,40 +202,61 @@ class Displacement:
                     # Filename for atomic displacement
                     filename = '%s.%d%s%s.pckl' % \
                                (self.name, a, 'xyz'[i], ' +-'[sign])
-                    # Wait for ranks before checking for file
-                    # barrier()
-                    fd = opencew(filename)
-                    if fd is None:
-                        # Skip if already done
-                        continue
-
                     # Update atomic positions
                     atoms_N.positions[offset + a, i] = \
                         pos[a, i] + sign * self.delta
-
-                    # Call derived class implementation of __call__
-                    output = self.__call__(atoms_N)
-                    # Write output to file
-                    if rank == 0:
-                        pickle.dump(output, fd, protocol=2)
-                        sys.stdout.write('Writing %s\n' % filename)
-                        fd.close()
-                    sys.stdout.flush()
+                    yield filename, atoms_N
                     # Return to initial positions
                     atoms_N.positions[offset + a, i] = pos[a, i]
 
-    def clean(self):
-        """Delete generated pickle files."""
-
-        if isfile(self.name + '.eq.pckl'):
-            remove(self.name + '.eq.pckl')
-
+    def run_batch(self, atoms_N):
+        """Calculate missing displacements in batches of batch_size."""
+
+        # Only the structures of one batch are kept in memory:
+        jobs = ((filename, atoms.copy())
+                for filename, atoms in self.iterdisplace(atoms_N)
+                if not isfile(filename))
+        for chunk in chunks(jobs, self.batch_size):
+            images = [atoms for filename, atoms in chunk]
+            results = self.calc.calculate_batch(images, self.batch_properties)
+            # Files are only created once the results are there, so that
+            # an interrupted batch leaves no empty files behind:
+            for (filename, atoms), res in zip(chunk, results):
+                fd = opencew(filename)
+                if fd is None:
+                    continue  # done by another process in the meantime
+                self.calc.store_results(atoms, res)
+                atoms.set_calculator(self.calc)
+                self.write_output(self.__call__(atoms), filename, fd)
+
+    def write_output(self, output, filename, fd):
+        """Write output of one displacement to file."""
+
+        if rank == 0:
+            pickle.dump(output, fd, protocol=2)
+            sys.stdout.write('Writing %s\n' % filename)
+            fd.close()
+        sys.stdout.flush()
+
+    def displacement_names(self):
+        """Return names of the equilibrium and displaced structures."""
+
+        names = [self.name + '.eq']
         for a in self.indices:
             for i in 'xyz':
                 for sign in '-+':
-                    name = '%s.%d%s%s.pckl' % (self.name, a, i, sign)
-                    if isfile(name):
-                        remove(name)
+                    names.append('%s.%d%s%s' % (self.name, a, i, sign))
+        return names
+
+    def clean(self):
+        """Delete generated pickle files."""
+
+        self.combined = None
+        filenames = [name + '.pckl' for name in self.displacement_names()]
+        filenames.append(self.name + '.all.pckl')
+        for filename in filenames:
+            if isfile(filename):
+                remove(filename)
 
 
 class Phonons(Displacement):
@@ -284,6 +339,8 @@ class Phonons(Displacement):
         self.Z_avv = None
         self.eps_vv = None
 
+    batch_properties = ['forces']
+
     def __call__(self, atoms_N):
         """Calculate forces on atoms in supercell."""
 
@@ -296,7 +353,7 @@ class Phonons(Displacement):
         """Check maximum size of forces in the equilibrium structure."""
 
         fname = '%s.eq.pckl' % self.name
-        feq_av = pickleload(open(fname, 'rb'))
+        feq_av = self.load(fname)
 
         fmin = feq_av.max()
         fmax = feq_av.min()
@@ -391,8 +448,8 @@ class Phonons(Displacement):
             for j, v in enumerate('xyz'):
                 # Atomic forces for a displacement of atom a in direction v
                 basename = '%s.%d%s' % (self.name, a, v)
-                fminus_av = pickleload(open(basename + '-.pckl', 'rb'))
-                fplus_av = pickleload(open(basename + '+.pckl', 'rb'))
+                fminus_av = self.load(basename + '-.pckl')
+                fplus_av = self.load(basename + '+.pckl')
 
                 if method == 'frederiksen':
                     fminus_av[a] -= fminus_av.sum(0)
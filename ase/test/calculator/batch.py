@@ -0,0 +1,83 @@
+import os
+import numpy as np
+from ase.build import bulk
+from ase.calculators.calculator import calculate_images, has_batch_support
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+from ase.calculators.morse import MorsePotential
+from ase.calculators.tip3p import TIP3P
+from ase.phonons import Phonons
+from ase.vibrations import Vibrations
+
+atoms = bulk('Cu', cubic=True).repeat(2)
+images = []
+for seed in range(3):
+    image = atoms.copy()
+    image.rattle(0.05, seed=seed)
+    images.append(image)
+images.append(bulk('Au', cubic=True))
+
+# Calculators without their own calculate_batch() are calculated one
+# configuration at a time:
+assert not has_batch_support(TIP3P())
+
+# Batched results agree with one calculation per image.
+for calc in [EMT(), LennardJones(rc=5.0), MorsePotential()]:
+    assert has_batch_support(calc)
+    properties = ['energy', 'forces', 'stress']
+    results = calc.calculate_batch(images, properties)
+    for image, res in zip(images, results):
+        image.calc = calc.__class__(**calc.parameters)
+        e = image.get_potential_energy()
+        assert abs(res['energy'] - e) < 1e-10
+        assert abs(res['forces'] - image.get_forces()).max() < 1e-10
+        assert abs(res['stress'] - image.get_stress()).max() < 1e-10
+
+# Results are handed to the calculators of the images.
+for image in images:
+    image.calc = EMT()
+calculate_images(images, ['energy', 'forces'])
+for image in images:
+    assert not image.calc.calculation_required(image, ['energy', 'forces'])
+    e = image.get_potential_energy()
+    image.calc.reset()
+    assert abs(image.get_potential_energy() - e) < 1e-10
+
+# Vibrations and phonons calculate all displacements together.
+vib = Vibrations(images[-1], name='vib-batch')
+vib.run()
+assert len(vib.get_frequencies()) == 12
+vib.clean()
+
+ph = Phonons(bulk('Cu'), EMT(), supercell=(3, 3, 3), name='ph-batch')
+ph.run()
+ph.read()
+assert np.isfinite(ph.C_N).all()
+ph.clean()
+
+# Displacements are calculated in batches of batch_size and files are
+# only created for finished calculations.
+class FailingEMT(EMT):
+    nbatches = 0
+
+    def calculate_batch(self, images, properties=['energy']):
+        assert len(images) <= 5
+        FailingEMT.nbatches += 1
+        if FailingEMT.nbatches == 3:
+            raise RuntimeError
+        return EMT.calculate_batch(self, images, properties)
+
+
+vib = Vibrations(images[-1].copy(), name='vib-chunks')
+vib.calc = FailingEMT()
+vib.batch_size = 5
+try:
+    vib.run()
+except RuntimeError:
+    pass
+files = [name for name in os.listdir('.') if name.startswith('vib-chunks')]
+assert len(files) == 10
+assert all(os.path.getsize(name) > 0 for name in files)
+vib.run()
+assert len(vib.get_frequencies()) == 12
+vib.clean()
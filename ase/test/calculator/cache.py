@@ -0,0 +1,61 @@
+import os
+from ase.build import bulk
+from ase.calculators.calculator import ResultsCache
+from ase.calculators.emt import EMT
+
+atoms = bulk('Cu', cubic=True).repeat(2)
+atoms.rattle(0.05, seed=1)
+cache = ResultsCache(maxsize=2, directory='emt-cache')
+
+atoms.calc = EMT()
+atoms.calc.cache = cache
+e0 = atoms.get_potential_energy()
+f0 = atoms.get_forces()
+assert cache.misses == 1 and cache.hits == 0
+
+# A new calculator instance sharing the cache returns the stored results
+# for the same configuration.
+atoms2 = atoms.copy()
+atoms2.calc = EMT()
+atoms2.calc.cache = cache
+assert atoms2.get_potential_energy() == e0
+assert (atoms2.get_forces() == f0).all()
+assert cache.hits == 1
+
+# Different parameters or configurations miss the cache.
+atoms2.calc = EMT(asap_cutoff=True)
+atoms2.calc.cache = cache
+atoms2.get_potential_energy()
+atoms2.positions[0, 0] += 0.1
+atoms2.get_potential_energy()
+assert cache.misses == 3
+assert len(cache) == 2
+
+# Changes smaller than the tolerance hit the cache.
+atoms2.positions[0, 0] += 1e-12
+atoms2.get_potential_energy()
+assert cache.hits == 2
+
+# Results restored from the cache and calculated afterwards are consistent.
+atoms2.positions[0, 0] -= 0.1
+e1 = atoms2.get_potential_energy()
+f1 = atoms2.get_forces()
+atoms2.calc = EMT(asap_cutoff=True)
+assert abs(atoms2.get_potential_energy() - e1) < 1e-9
+assert abs(atoms2.get_forces() - f1).max() < 1e-9
+
+# The first configuration was removed from memory, but is on disk.
+cache2 = ResultsCache(directory='emt-cache')
+atoms.calc = EMT()
+atoms.calc.cache = cache2
+assert atoms.get_potential_energy() == e0
+assert abs(atoms.get_forces() - f0).max() < 1e-14
+assert cache2.hits == 1 and cache2.misses == 0
+assert len(os.listdir('emt-cache')) == 3
+
+# The order of the parameters doesn't matter.
+calc1 = EMT()
+calc1.parameters = {'a': 1, 'b': {'c': 2, 'd': 3}}
+calc2 = EMT()
+calc2.parameters = {'b': {'d': 3, 'c': 2}, 'a': 1}
+assert cache.key(calc1, atoms) == cache.key(calc2, atoms)
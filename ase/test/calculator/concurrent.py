@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+from ase import Atoms
+from ase.calculators.calculator import (FileIOCalculator, CalculationFailed,
+                                        calculate_concurrently)
+
+# Each calculation waits (up to a minute) until all four have started, so
+# that they can only finish quickly if they run at the same time:
+script = """
+import glob, time
+import numpy as np
+open('started', 'w').close()
+t0 = time.time()
+while (len(glob.glob('../concurrent*/started')) < 4 and
+       time.time() < t0 + 60):
+    time.sleep(0.05)
+np.savetxt('running', [len(glob.glob('../concurrent*/started'))])
+np.savetxt('energy', [np.loadtxt('positions').sum()])
+"""
+with open('sum.py', 'w') as fd:
+    fd.write(script)
+
+
+class SumCalculator(FileIOCalculator):
+    implemented_properties = ['energy']
+    command = '"{}" ../sum.py'.format(sys.executable)
+
+    def start(self, *args, **kwargs):
+        self.future = FileIOCalculator.start(self, *args, **kwargs)
+        return self.future
+
+    def write_input(self, atoms, properties=None, system_changes=None):
+        FileIOCalculator.write_input(self, atoms, properties, system_changes)
+        np.savetxt(os.path.join(self.directory, 'positions'), atoms.positions)
+
+    def read_results(self):
+        energy = np.loadtxt(os.path.join(self.directory, 'energy'))
+        self.results = {'energy': float(energy)}
+
+
+images = []
+for i in range(4):
+    atoms = Atoms('H2', positions=[(0, 0, 0), (0, 0, i)])
+    atoms.calc = SumCalculator(label='concurrent{}/sum'.format(i))
+    images.append(atoms)
+
+calculate_concurrently(images, maxjobs=4)
+for i, atoms in enumerate(images):
+    assert np.loadtxt('concurrent{}/running'.format(i)) == 4
+    assert atoms.calc.results['energy'] == i
+    assert atoms.get_potential_energy() == i
+
+# Asynchronous start of a single calculation:
+atoms = images[0]
+atoms.positions[0, 0] = 1.0
+future = atoms.calc.start(atoms)
+assert future.result()['energy'] == 1.0
+assert atoms.get_potential_energy() == 1.0
+
+atoms.calc.command = 'exit 1'
+atoms.positions[0, 0] = 2.0
+try:
+    atoms.get_potential_energy()
+except CalculationFailed:
+    pass
+else:
+    assert False
+
+# A failed calculation stops the others:
+calcs = [SumCalculator(label='failing/sum'),
+         SumCalculator(label='waiting/sum')]
+calcs[0].command = 'exit 1'
+calcs[1].command = '"{}" -c "import time; time.sleep(60)"'.format(
+    sys.executable)
+for atoms, calc in zip(images, calcs):
+    atoms.calc = calc
+try:
+    calculate_concurrently(images[:2])
+except CalculationFailed:
+    pass
+else:
+    assert False
+assert calcs[1].future.process.returncode < 0  # terminated
+
+# Images can not share calculators or directories:
+for calcs in [[calcs[0], calcs[0]],
+              [SumCalculator(label='a/sum'), SumCalculator(label='a/sum')]]:
+    for atoms, calc in zip(images, calcs):
+        atoms.calc = calc
+    try:
+        calculate_concurrently(images[:2])
+    except ValueError:
+        pass
+    else:
+        assert False
@@ -0,0 +1,69 @@
+import sqlite3
+
+import numpy as np
+
+from ase import Atoms
+from ase.db import connect
+from ase.utils import basestring
+
+data = {'dos': np.linspace(0, 1, 1000),
+        'ints': np.arange(10, dtype=np.int32),
+        'complex': np.array([1 + 2j, 3j]),
+        'scalar': np.array(3.0),
+        'nested': {'x': np.zeros((2, 3)), 'name': 'abc', 'list': [1, 2]}}
+
+
+def check(d, dtypes=True):
+    assert (d['dos'] == data['dos']).all()
+    assert d['ints'].dtype == np.int32 or not dtypes
+    assert (d['complex'] == data['complex']).all()
+    assert d['scalar'] == 3.0 and np.ndim(d['scalar']) == 0
+    assert d['nested']['x'].shape == (2, 3)
+    assert d['nested']['name'] == 'abc'
+    assert (d['nested']['list'] == [1, 2]).all()
+    assert d['dos'].flags.aligned
+    d['dos'][0] = 42.0  # arrays must be writable
+
+
+sizes = []
+for compress in [False, True]:
+    db = connect('data.db', append=False, compress_data=compress)
+    id = db.write(Atoms('H'), data=data)
+    check(db.get(id).data)
+    db.update(id, data={'more': np.ones(3)})
+    row = db.get(id)
+    check(row.data)
+    assert (row.data.more == 1).all()
+
+    con = sqlite3.connect('data.db')
+    blob, = con.execute('SELECT data FROM systems').fetchone()
+    assert bytes(blob)[:1] in [b'\0', b'\1']  # binary, not JSON text
+    sizes.append(len(blob))
+    con.close()
+assert sizes[1] < sizes[0], sizes
+
+# Rows without data and selections without data:
+db.write(Atoms('H2'))
+assert len(db.get(H=2).data) == 0
+assert 'dos' not in next(db.select(H=1, include_data=False)).data
+
+# Copy rows with binary data between databases:
+for name in ['copy.json', 'copy.db']:
+    db2 = connect(name, append=False)
+    db2.write_many(db.select(H=1))
+    check(db2.get(1).data, dtypes=name.endswith('.db'))
+
+# Files from before version 9 store data as JSON text:
+db = connect('old.db', append=False)
+db.write(Atoms())
+con = sqlite3.connect('old.db')
+con.execute('UPDATE information SET value="8" WHERE name="version"')
+con.commit()
+con.close()
+db = connect('old.db')
+db.write(Atoms('H'), data=data)
+check(db.get(H=1).data, dtypes=False)
+con = sqlite3.connect('old.db')
+txt, = con.execute('SELECT data FROM systems WHERE id=2').fetchone()
+assert isinstance(txt, basestring)
+con.close()
@@ -51,6 +51,12 @@ for name in ['testase.json', 'testase.db', 'postgresql']:
     count(1, '0.5<mass<1.5')
     count(5, 'energy')
 
+    # Nested selections:
+    ids = [(row1.id, row2.id)
+           for row1 in con.select('hydro')
+           for row2 in con.select('hydro')]
+    assert len(ids) == 9
+
     id = con.reserve(abc=7)
     assert con[id].abc == 7
 
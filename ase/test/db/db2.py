@@ -1,4 +1,5 @@
 import os
+import pickle
 import numpy as np
 
 from ase import Atoms
@@ -51,6 +52,21 @@ for name in ['testase.json', 'testase.db', 'postgresql']:
 
     f2 = c.get(C=1).forces
     assert abs(f2.sum(0)).max() < 1e-14
+
+    # Arrays of rows are decoded when first needed:
+    row = c.get(C=1)
+    assert 'forces' in row and 'momenta' not in row
+    assert 'forces' in list(row) and 'calculator_parameters' in list(row)
+    assert row.calculator_parameters == ch4.calc.todict()
+    assert row.get('momenta') is None
+    assert (row.forces == f2).all()
+    assert abs(row.positions - ch4.positions).max() < 1e-14
+
+    # Rows can be pickled also while the connection is open:
+    with c:
+        row = pickle.loads(pickle.dumps(c.get(C=1)))
+    assert (row.forces == f2).all()
+    assert row.calculator_parameters == ch4.calc.todict()
     f3 = c.get_atoms(C=1).get_forces()
     assert abs(f1 - f3).max() < 1e-14
 
@@ -0,0 +1,44 @@
+import numpy as np
+
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.db import connect
+
+for name in ['columns.json', 'columns.db']:
+    print(name)
+    db = connect(name, append=False)
+    for i in range(5):
+        atoms = Atoms('H' * (i + 1))
+        if i != 2:
+            atoms.calc = SinglePointCalculator(atoms, energy=-i)
+        kvp = {'x': i, 'even': i % 2 == 0}
+        if i > 0:
+            kvp['tag'] = 'a{}'.format(i)
+        db.write(atoms, **kvp)
+
+    c = db.select_columns(columns=['id', 'energy', 'natoms', 'x', 'even',
+                                   'tag', 'user', 'missing'])
+    assert (c['id'] == [1, 2, 3, 4, 5]).all()
+    assert c['id'].dtype == int and c['natoms'].dtype == int
+    assert (c['natoms'] == c['id']).all()
+    assert np.isnan(c['energy'][2])
+    assert (c['energy'][[0, 1, 3, 4]] == [0, -1, -3, -4]).all()
+    assert (c['x'] == [0, 1, 2, 3, 4]).all()
+    assert (c['even'] == [1, 0, 1, 0, 1]).all()
+    assert list(c['tag']) == [None, 'a1', 'a2', 'a3', 'a4']
+    assert np.isnan(c['missing']).all()
+
+    # Same order as select():
+    for selection, sort in [('x>1', '-x'), ('H<4', 'tag'), (None, 'energy'),
+                            ('tag', '-age')]:
+        ids = [row.id for row in db.select(selection, sort=sort)]
+        c = db.select_columns(selection, ['id', 'x'], sort=sort)
+        assert list(c['id']) == ids, (selection, sort, c['id'], ids)
+
+    c = db.select_columns('x>0', ['formula', 'fmax', 'energy'], limit=2,
+                          offset=1)
+    assert list(c['formula']) == ['H3', 'H4']
+    assert np.isnan(c['fmax']).all()
+
+    c = db.select_columns('x>10', ['id', 'energy'])
+    assert len(c['id']) == 0 and len(c['energy']) == 0
@@ -39,3 +39,14 @@ for name in ['x.json', 'x.db']:
         for id in range(2, 2 + N):
             db.update(id, z=3)
     print(time() - t0)
+
+    # Write while looping over a selection that is read in batches:
+    db.fetchsize = 2
+    ids = [row.id for row in db.select('i', sort='i')]
+    for row in db.select('i', sort='i'):
+        db.update(row.id, w=row.i)
+        db.write(Atoms(), i=-1)  # not part of the selection
+    assert [row.id for row in db.select('w', sort='w')] == ids
+    assert [row.i for row in db.select('i', columns=['key_value_pairs'],
+                                       include_data=False,
+                                       limit=3, offset=1)] == [1, 2, 3]
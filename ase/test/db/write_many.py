@@ -0,0 +1,36 @@
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.db import connect
+
+images = []
+for i in range(5):
+    atoms = Atoms('H' * (i + 1))
+    atoms.calc = SinglePointCalculator(atoms, energy=-i)
+    images.append(atoms)
+
+for name in ['many.json', 'many.db']:
+    print(name)
+    db = connect(name, append=False)
+    db.write(Atoms('He'), x=1)
+    ids = db.write_many(images, key_value_pairs={'project': 'p'},
+                        batch_size=2)
+    assert ids == [2, 3, 4, 5, 6], ids
+    assert db.count(project='p') == 5
+    for id, atoms in zip(ids, images):
+        row = db.get(id)
+        assert row.energy == atoms.get_potential_energy()
+        assert row.natoms == len(atoms)
+        assert db.count(H=len(atoms)) == 1
+    assert db.write_many([]) == []
+
+    db.update(2, data={'a': 1})
+
+    # Copy rows with their key-value pairs and data:
+    db2 = connect('copy' + name[4:], append=False)
+    ids = db2.write_many(db.select(), key_value_pairs={'copied': True})
+    assert ids == [1, 2, 3, 4, 5, 6]
+    assert db2.get(x=1).copied
+    row = db2.get(2)
+    assert row.project == 'p'
+    assert row.data.a == 1
+    assert db2.count(project='p', copied=True) == 5
@@ -21,6 +21,15 @@ slab.set_calculator(eam)
 assert( abs(-164.277599313 - slab.get_potential_energy()) < 1E-8 )
 assert( abs(6.36379627645 - np.linalg.norm(slab.get_forces()))  < 1E-8 )
 
+# tabulated functions must reproduce the splines
+eam = EAM(potential='Pt_u3.eam', elements=['Pt'], tabulate=True)
+slab.rattle(0.05, seed=3)
+f0 = slab.get_forces()
+e0 = slab.get_potential_energy()
+slab.set_calculator(eam)
+assert abs(e0 - slab.get_potential_energy()) < 1E-6
+assert abs(f0 - slab.get_forces()).max() < 1E-6
+
 os.remove(pot_fn)
 
 
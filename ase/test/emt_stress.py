@@ -0,0 +1,25 @@
+import numpy as np
+from ase.build import bulk
+from ase.calculators.emt import EMT
+
+a = bulk('Cu', 'fcc', a=3.6, cubic=True).repeat((2, 2, 2))
+a.numbers[::3] = 79
+a.set_cell(np.dot(a.cell,
+                  [[1.02, 0, 0.03],
+                   [0, 0.99, -0.02],
+                   [0.1, -0.01, 1.03]]),
+           scale_atoms=True)
+a.rattle(0.05, seed=42)
+a.calc = EMT()
+
+# Verify analytical stress tensor against numerical value
+s_analytical = a.get_stress()
+s_numerical = a.calc.calculate_numerical_stress(a, 1e-5)
+print(s_analytical)
+print(s_numerical)
+assert abs(s_analytical - s_numerical).max() < 1e-7
+
+# Forces against numerical forces
+f = a.get_forces()
+f_numerical = a.calc.calculate_numerical_forces(a, 1e-5)
+assert abs(f - f_numerical).max() < 1e-6
@@ -0,0 +1,49 @@
+import os
+
+from ase.build import bulk, molecule
+from ase.calculators.emt import EMT
+from ase.db import connect
+from ase.io import read, write
+from ase.test import cli
+
+images = []
+for i in range(5):
+    atoms = bulk('Cu') * (i + 1, 1, 1)
+    atoms.calc = EMT()
+    atoms.get_forces()
+    images.append(atoms)
+write('images.traj', images)
+
+cli('ase convert images.traj images.xyz && '
+    'ase convert -j 2 -n 1: images.xyz images2.traj && '
+    'ase convert -n -2 images.traj last.xyz && '
+    'ase convert -e "atoms.info[\'_output\'] = len(atoms) % 2 == 0" '
+    'images.traj even.xyz && '
+    'ase convert images.traj images.json')
+assert read('images2.traj', ':') == read('images.xyz', '1:')
+assert abs(read('images2.traj', -1).get_forces() - images[-1].get_forces()
+           ).max() < 1e-6
+assert read('last.xyz', ':') == images[-2:-1]
+assert len(read('even.xyz', ':')) == 2
+assert read('images.json', ':') == images
+
+# Copy rows between databases, keeping key-value pairs and data:
+with connect('a.db') as con:
+    for atoms in images:
+        con.write(atoms, n=len(atoms), data={'x': [1, 2]})
+    con.write(molecule('H2O'), n=3)
+cli('ase convert a.db b.json && ase convert -n "n<3" b.json c.db')
+rows = list(connect('b.json').select())
+assert [row.n for row in rows] == [1, 2, 3, 4, 5, 3]
+assert list(rows[0].data.x) == [1, 2]
+assert abs(rows[0].forces - images[0].get_forces()).max() < 1e-12
+assert [row.n for row in connect('c.db').select()] == [1, 2]
+
+# Convert a file onto itself:
+write('self.xyz', images)
+write('self.traj', images)
+cli('ase convert -f -a positions,numbers self.xyz self.xyz && '
+    'ase convert -f self.traj self.traj')
+assert read('self.xyz', ':') == images
+assert read('self.traj', ':') == images
+assert not [name for name in os.listdir('.') if '.tmp' in name]
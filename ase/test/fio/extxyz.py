@@ -2,6 +2,7 @@
 # (which is also included in oi.py test case)
 # maintainted by James Kermode <james.kermode@gmail.com>
 
+import importlib
 import os
 
 import numpy as np
@@ -222,3 +223,72 @@ assert singleFrame[-1] == frames[-1]
 os.unlink('append.xyz')
 os.unlink('append.xyz.gz')
 os.unlink('not_append.xyz')
+
+# frame index file for random access
+from ase.io.formats import build_frame_index, frame_index_filename
+images[1].info['step'] = 1
+ase.io.write('indexed.xyz', frames + images, format='extxyz',
+             vec_cell=False)
+ase.io.write('indexed.xyz', images[1], format='extxyz', vec_cell=True,
+             append=True)
+expected = ase.io.read('indexed.xyz', ':')
+assert len(build_frame_index('indexed.xyz')) == 7
+assert os.path.isfile(frame_index_filename('indexed.xyz'))
+assert ase.io.read('indexed.xyz', ':') == expected
+assert ase.io.read('indexed.xyz', '1::2') == expected[1::2]
+assert ase.io.read('indexed.xyz', -3) == expected[-3]
+assert ase.io.read('indexed.xyz') == expected[-1]
+assert ase.io.read('indexed.xyz', 4).info['step'] == 1
+assert list(ase.io.iread('indexed.xyz', '-2:')) == expected[-2:]
+# index is rebuilt when the file changes:
+ase.io.write('indexed.xyz', at, append=True)
+assert ase.io.read('indexed.xyz', -1) == at
+assert len(ase.io.read('indexed.xyz', ':')) == 8
+assert list(extxyz.iread_xyz(open('indexed.xyz'), slice(-2, None))) == [
+    expected[-1], at]
+os.unlink('indexed.xyz')
+os.unlink(frame_index_filename('indexed.xyz'))
+
+# column-wise parsing of all property types, and fallback for lines
+# with extra columns
+with open('types.xyz', 'w') as f:
+    f.write('2\nProperties=species:S:1:pos:R:3:tags:I:1:move_mask:L:3 '
+            'label=x\n'
+            'H 0.0 0.0 0.0 1 T F T\n'
+            'he 0.5 0.0 0.0 2 F False True\n'
+            '2\nProperties=species:S:1:pos:R:3:tags:I:1:move_mask:L:3 '
+            'label=x\n'
+            'H 0.0 0.0 0.0 1 T F T extra\n'
+            'he 0.5 0.0 0.0 2 F False True\n')
+a1, a2 = ase.io.read('types.xyz', ':')
+for a in [a1, a2]:
+    assert a.get_chemical_symbols() == ['H', 'He']
+    assert (a.get_tags() == [1, 2]).all()
+    assert a.arrays['move_mask'].tolist() == [[True, False, True],
+                                              [False, False, True]]
+    assert a.info == {'label': 'x'}
+for name in a1.arrays:
+    assert a1.arrays[name].dtype == a2.arrays[name].dtype
+# cached comment lines are not modified through returned values
+extxyz.key_val_str_to_dict('v="1 2 3"')['v'][0] = 5
+assert extxyz.key_val_str_to_dict('v="1 2 3"')['v'][0] == 1
+os.unlink('types.xyz')
+
+# parallel reading (needs concurrent.futures)
+try:
+    importlib.import_module('concurrent.futures')
+except ImportError:
+    pass
+else:
+    ase.io.write('parallel.xyz',
+                 [bulk('Cu') * (i + 1, 1, 1) for i in range(250)])
+    images = ase.io.read('parallel.xyz', ':')
+    assert list(ase.io.iread('parallel.xyz', workers=2)) == images
+    assert (list(ase.io.iread('parallel.xyz', '-120::3', workers=3)) ==
+            images[-120::3])
+    assert ase.io.read('parallel.xyz', '5:7', workers=2) == images[5:7]
+    build_frame_index('parallel.xyz')
+    assert (list(ase.io.iread('parallel.xyz', '1::2', workers=2)) ==
+            images[1::2])
+    os.unlink('parallel.xyz')
+    os.unlink(frame_index_filename('parallel.xyz'))
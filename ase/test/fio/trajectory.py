@@ -89,3 +89,61 @@ t = Trajectory('constraint.traj', 'w', a)
 t.write()
 b = read('constraint.traj')
 assert not (b.get_momenta() - a.get_momenta()).any()
+
+# Memory-mapped reading:
+with Trajectory('1.traj') as t1, Trajectory('1.traj', mmap=True) as t2:
+    assert len(t1) == len(t2)
+    for a1, a2 in zip(t1, t2):
+        assert a1 == a2
+t = Trajectory('empty.traj', 'r', mmap=True)
+assert len(t) == 0
+t.close()
+
+# Stacked arrays without creating Atoms objects:
+from ase.calculators.emt import EMT
+from ase.build import bulk
+import numpy as np
+cu = bulk('Cu', cubic=True)
+cu.calc = EMT()
+with Trajectory('md.traj', 'w') as t:
+    for i in range(5):
+        cu.positions[0, 0] = 0.01 * i
+        cu.get_forces()
+        t.write(cu)
+with Trajectory('md.traj') as t:
+    R = t.read_array('positions')
+    assert R.shape == (5, 4, 3)
+    assert np.allclose(R[:, 0, 0], np.arange(5) * 0.01)
+    assert t.read_array('forces', slice(1, 4)).shape == (3, 4, 3)
+    E = t.read_array('energy', slice(None, None, -1))
+    assert np.allclose(E, [a.get_potential_energy() for a in t][::-1])
+    assert (t.read_array('numbers', slice(2)) == 29).all()
+    assert t.read_array('cell').shape == (5, 3, 3)
+    chunks = list(t.iter_arrays('positions', chunksize=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert (np.concatenate(chunks) == R).all()
+
+# Compressed trajectories:
+for codecs, tol in [('delta+zlib', 0), ('float32+delta+lzma', 1e-5)]:
+    with Trajectory('md.traj') as t, \
+            Trajectory('mdz.traj', 'w', codecs=codecs) as tz:
+        for atoms in t:
+            tz.write(atoms)
+    with Trajectory('md.traj') as t, Trajectory('mdz.traj') as tz:
+        for name in ['positions', 'forces', 'energy']:
+            assert abs(tz.read_array(name) - t.read_array(name)).max() <= tol
+        if tol == 0:
+            assert tz[2] == t[2]
+        else:
+            # The cell is not a per-atom array:
+            assert (tz.read_array('cell') == t.read_array('cell')).all()
+
+# Buffered writing:
+with Trajectory('md.traj') as t, \
+        Trajectory('mdb.traj', 'w', buffersize=2) as tb:
+    for atoms in t:
+        tb.write(atoms)
+    tb.flush()
+    assert len(Trajectory('mdb.traj')) == len(t)
+with Trajectory('md.traj') as t, Trajectory('mdb.traj') as tb:
+    assert (tb.read_array('positions') == t.read_array('positions')).all()
@@ -44,3 +44,72 @@ print(ulm.open('a.ulm')[2].z)
 print(ulm.open('a.ulm', index=3).proxy('psi')[0:3])
 for d in ulm.open('a.ulm'):
     print(d)
+
+# Memory-mapped reading gives read-only views with the same content:
+r = ulm.open('a.ulm', mmap=True)
+z = r[2].z
+assert (z == 1).all() and z.dtype == int and not z.flags.writeable
+assert (r.a.x == np.ones((2, 3))).all()
+psi = r[3].proxy('psi')
+assert (psi[1:4:2] == ulm.open('a.ulm')[3].proxy('psi')[1:4:2]).all()
+assert (psi[-1] == 3).all()
+assert (r[3].proxy('psi', 2)[:] == 3).all()
+r.close()
+
+# Arrays stored with codecs:
+x = np.linspace(0, 1, 300).reshape((100, 3))
+with ulm.open('c.ulm', 'w', codecs={'x': 'delta+zlib', 'y': 'float32',
+                                    'n': 'lzma'}) as w:
+    for i in range(5):
+        w.write(x=x + i * 1e-3, y=x, n=np.arange(7), z=x)
+        w.sync()
+for mmap in [False, True]:
+    r = ulm.open('c.ulm', mmap=mmap)
+    for i in range(5):
+        ri = r[i]
+        assert (ri.x == x + i * 1e-3).all()
+        assert ri.y.dtype == float and abs(ri.y - x).max() < 1e-7
+        assert (ri.n == np.arange(7)).all()
+        assert (ri.proxy('x')[2:4] == ri.x[2:4]).all()
+        assert (ri.z == x).all()
+    r.close()
+
+# Buffered writing:
+for buffersize in [0, 3]:
+    with ulm.open('b{}.ulm'.format(buffersize), 'w',
+                  buffersize=buffersize) as w:
+        for i in range(50):
+            w.write(i=i, x=np.ones(i))
+            w.sync()
+            assert len(w) == i + 1
+for r0, r3 in zip(ulm.open('b0.ulm'), ulm.open('b3.ulm')):
+    assert r0.i == r3.i and (r0.x == r3.x).all()
+with ulm.open('b3.ulm', 'a', buffersize=10) as w:
+    w.write(i=50)
+    w.sync()
+    assert len(ulm.open('b3.ulm')) == 50
+r = ulm.open('b3.ulm')
+assert len(r) == 51 and r[50].i == 50 and (r[7].x == 1).all()
+
+# A string codec is used for all floating-point arrays:
+with ulm.open('s.ulm', 'w', codecs='float32') as w:
+    w.write(x=x, cell=np.eye(3) / 3, n=np.arange(7))
+with ulm.open('s.ulm') as r:
+    assert r.x.dtype == float and abs(r.x - x).max() < 1e-7
+    assert 0 < abs(r.cell - np.eye(3) / 3).max() < 1e-7
+    assert (r.n == np.arange(7)).all()
+
+# Version 4 is only written when a codec is used:
+with ulm.open('v.ulm', 'w', codecs={'y': 'zlib'}) as w:
+    w.write(x=x)
+    w.sync()
+with ulm.open('v.ulm') as r:
+    assert r._version == 3
+with ulm.open('v.ulm', 'a', codecs={'x': 'zlib'}) as w:
+    w.write(x=x)
+    w.sync()
+with ulm.open('v.ulm') as r:
+    assert r._version == 4
+    assert (r[0].x == x).all() and (r[1].x == x).all()
+with ulm.open('c.ulm') as r:
+    assert r._version == 4
@@ -3946,4 +3946,39 @@ try:
 	assert abs(a2.get_potential_energy() - -68.23102426) < 1e-6
 
 finally:
-	os.unlink('OUTCAR')
\ No newline at end of file
+	os.unlink('OUTCAR')
+# Several ionic steps, with the energy after positions and forces as
+# written by newer VASP versions:
+from ase.io.vasp import OutcarReader
+i = outcar.index('  FORCE on cell')
+j = outcar.index('  energy  without entropy')
+j = outcar.index('\n', j) + 1
+steps = [outcar[i:j].replace('-68.23102426', '{:.8f}'.format(-68.0 - n))
+         for n in range(5)]
+with open('OUTCAR', 'w') as fd:
+    fd.write(outcar[:i] + ''.join(steps) + outcar[j:])
+
+try:
+    energies = [-68.0 - n for n in range(5)]
+    images = read('OUTCAR', ':')
+    assert [atoms.get_potential_energy() for atoms in images] == energies
+    assert read('OUTCAR').get_potential_energy() == energies[-1]
+    assert read('OUTCAR', 1).get_potential_energy() == energies[1]
+    images = read('OUTCAR', '-2::-2')
+    assert [atoms.get_potential_energy() for atoms in images] == energies[-2::-2]
+
+    # Read a growing file:
+    with open('OUTCAR', 'rb') as fd:
+        data = fd.read()
+    reader = OutcarReader('OUTCAR.growing')
+    images = []
+    for n in range(0, len(data), 12345):
+        with open('OUTCAR.growing', 'ab') as fd:
+            fd.write(data[n:n + 12345])
+        images += reader.read()
+    images += reader.read(final=True)
+    assert [atoms.get_potential_energy() for atoms in images] == energies
+finally:
+    os.unlink('OUTCAR')
+    if os.path.exists('OUTCAR.growing'):
+        os.unlink('OUTCAR.growing')
@@ -0,0 +1,50 @@
+import numpy as np
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.neb import NEB
+
+initial = bulk('Cu', cubic=True).repeat(2)
+del initial[0]
+final = initial.copy()
+final.positions[0] = (0, 0, 0)
+
+
+def make_images():
+    images = [initial.copy()]
+    for i in range(3):
+        images.append(initial.copy())
+    images.append(final.copy())
+    for image in images:
+        image.calc = EMT()
+    return images
+
+
+serial = NEB(make_images())
+serial.interpolate()
+f1 = serial.get_forces()
+
+neb = NEB(make_images(), parallel='processes')
+neb.interpolate()
+f2 = neb.get_forces()
+assert abs(f1 - f2).max() < 1e-10
+assert abs(serial.energies[1:-1] - neb.energies[1:-1]).max() < 1e-10
+
+# New positions are sent to the workers:
+for images in [serial.images, neb.images]:
+    images[2].positions[1] += 0.1
+assert abs(serial.get_forces() - neb.get_forces()).max() < 1e-10
+energies = [image.get_potential_energy() for image in neb.iterimages()]
+assert np.allclose(energies[1:-1], serial.energies[1:-1])
+neb.close()
+
+# Exceptions in a worker are passed on:
+images = make_images()
+images[2].numbers[1] = 26  # no EMT parameters for Fe
+neb = NEB(images, parallel='processes')
+neb.interpolate()
+try:
+    neb.get_forces()
+except NotImplementedError as e:
+    assert 'Fe' in str(e)
+else:
+    assert False
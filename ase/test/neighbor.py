@@ -160,3 +160,42 @@ i2 = np.argsort(d2[:, 0]+d2[:, 1]*1e2+d2[:, 2]*1e4+a2*1e6)
 assert np.all(a[i] == a2[i2])
 assert np.all(b[i] == b2[i2])
 assert np.allclose(d[i], d2[i2])
+
+# Test incremental updates: moving a few atoms beyond the skin patches the
+# list, which must agree with a list built from scratch for the reference
+# positions and must contain all pairs within the cutoff.
+atoms = bulk('Cu', 'fcc', a=3.6, cubic=True).repeat(3)
+atoms.set_cell(np.dot(atoms.cell, [[1, 0, 0], [0.2, 1, 0], [0, 0.1, 1]]),
+               scale_atoms=True)
+atoms.rattle(0.05, seed=1)
+for pbc in [True, [True, False, True]]:
+    for bothways in [False, True]:
+        atoms.set_pbc(pbc)
+        cutoffs = np.full(len(atoms), 1.3)
+        nl = NewPrimitiveNeighborList(cutoffs, skin=0.2, bothways=bothways,
+                                      incremental=True)
+        a = atoms.copy()
+        nl.update(a.pbc, a.cell, a.positions)
+        for step in range(5):
+            a.positions[step::37] += random.normal(0, 0.3, (3, 3))
+            nl.update(a.pbc, a.cell, a.positions)
+            ref = NewPrimitiveNeighborList(cutoffs, skin=0.2,
+                                           bothways=bothways)
+            ref.update(a.pbc, a.cell, nl.positions)
+            for i in range(len(a)):
+                n1, o1 = nl.get_neighbors(i)
+                n2, o2 = ref.get_neighbors(i)
+                assert len(n1) == len(n2)
+                assert (set(zip(n1, map(tuple, o1))) ==
+                        set(zip(n2, map(tuple, o2))))
+            nl0 = NewPrimitiveNeighborList(cutoffs - 0.2, skin=0.0,
+                                           bothways=bothways)
+            nl0.update(a.pbc, a.cell, a.positions)
+            for i in range(len(a)):
+                n1, o1 = nl.get_neighbors(i)
+                n0, o0 = nl0.get_neighbors(i)
+                assert (set(zip(n0, map(tuple, o0))) <=
+                        set(zip(n1, map(tuple, o1))))
+        assert nl.npartialupdates == 5
+        assert nl.nfullupdates == 1
+        assert nl.nupdates == 6
@@ -212,3 +212,24 @@ assert S.shape == (0, 3)
 i = neighbor_list("i", ase.Atoms(), 1.0)
 assert i.dtype == np.int
 assert i.shape == (0,)
+
+# Linked-cell search must agree with the default binned search, including
+# skewed cells, atoms outside the cell and mixed boundary conditions.
+for pbc in [True, False, [True, False, True], [False, True, False]]:
+    atoms = ase.Atoms(numbers=np.random.randint(1, 4, 300),
+                      cell=[(9.0, 0.0, 0.0),
+                            (4.5, 7.5, 0.0),
+                            (-2.0, 3.0, 8.0)],
+                      pbc=pbc)
+    atoms.set_scaled_positions(1.2 * np.random.random((len(atoms), 3)) - 0.1)
+    for cutoff in [1.5, 4.2, {(1, 2): 2.0, (3, 3): 3.0},
+                   0.5 + np.random.random(len(atoms))]:
+        pairs = []
+        for method in ['bins', 'linkedcell']:
+            i, j, S = neighbor_list('ijS', atoms, cutoff, method=method)
+            assert (np.diff(i) >= 0).all()
+            pairs.append(sorted(zip(i, j, map(tuple, S))))
+        assert pairs[0] == pairs[1]
+
+i = neighbor_list('i', ase.Atoms(), 1.0, method='linkedcell')
+assert i.shape == (0,)
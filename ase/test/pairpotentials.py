@@ -0,0 +1,38 @@
+import numpy as np
+from ase.build import bulk, molecule
+from ase.calculators.lj import LennardJones
+from ase.calculators.morse import MorsePotential
+
+a = bulk('Cu', 'fcc', a=2.55, cubic=True).repeat((2, 2, 2))
+a.set_cell(np.dot(a.cell,
+                  [[1.02, 0, 0.03],
+                   [0, 0.99, -0.02],
+                   [0.1, -0.01, 1.03]]),
+           scale_atoms=True)
+a.rattle(0.05, seed=42)
+
+for calc in [LennardJones(sigma=1.6, epsilon=0.2),
+             LennardJones(sigma=1.6, epsilon=0.2, smooth=True),
+             MorsePotential(r0=1.8, rho0=4.0),
+             MorsePotential(r0=1.8, rho0=4.0, rc=4.5, smooth=True)]:
+    a.calc = calc
+    e = a.get_potential_energy()
+    assert abs(a.get_potential_energies().sum() - e) < 1e-10
+
+    f = a.get_forces()
+    f_numerical = calc.calculate_numerical_forces(a, 1e-5)
+    assert abs(f - f_numerical).max() < 1e-5
+
+    s = a.get_stress()
+    s_numerical = calc.calculate_numerical_stress(a, 1e-5)
+    assert abs(s - s_numerical).max() < 1e-5
+    assert abs(a.get_stresses().sum(axis=0) - s).max() < 1e-10
+
+# Compare with a direct sum over all pairs of a molecule
+m = molecule('C60')
+m.calc = MorsePotential(r0=1.45, rho0=6.0, rc=100.0)
+d = m.get_all_distances()[np.triu_indices(len(m), 1)]
+expf = np.exp(6.0 * (1.0 - d / 1.45))
+e0 = np.exp(6.0 * (1.0 - 100.0 / 1.45))
+assert abs(m.get_potential_energy() -
+           (expf * (expf - 2) - e0 * (e0 - 2)).sum()) < 1e-10
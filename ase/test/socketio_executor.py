@@ -0,0 +1,44 @@
+import os
+import socket
+import sys
+import threading
+
+from ase import Atoms
+from ase.calculators.emt import EMT
+from ase.calculators.socketio import (SocketClient, SocketIOCalculator,
+                                      SocketIOExecutor)
+from ase.vibrations import Vibrations
+
+BrokenPipe = socket.error if sys.version_info[0] == 2 else BrokenPipeError
+
+n2 = Atoms('N2', positions=[(0, 0, 0), (0, 0, 1.1)], calculator=EMT())
+vib = Vibrations(n2, name='vib-serial')
+vib.run()
+f1 = vib.get_frequencies()
+
+
+def run_client(unixsocket):
+    atoms = n2.copy()
+    atoms.calc = EMT()
+    try:
+        SocketClient(unixsocket=unixsocket, timeout=20.0).run(atoms)
+    except BrokenPipe:
+        pass
+
+
+# Two clients calculate the displacements:
+names = ['ase-executor-{}-{}'.format(os.getpid(), i) for i in range(2)]
+calcs = [SocketIOCalculator(unixsocket=name, timeout=20.0) for name in names]
+threads = [threading.Thread(target=run_client, args=(name,))
+           for name in names]
+for thread in threads:
+    thread.start()
+
+with SocketIOExecutor(calcs) as executor:
+    vib = Vibrations(n2, name='vib-socket')
+    vib.run(executor=executor)
+for thread in threads:
+    thread.join()
+
+assert abs(vib.get_frequencies() - f1).max() < 1e-4
+assert all(calc.server is None for calc in calcs)
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+from ase import Atoms
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.phonons import Phonons
+from ase.vibrations import Vibrations
+from ase.test import NotAvailable
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    raise NotAvailable('no concurrent.futures module')
+
+n2 = Atoms('N2', positions=[(0, 0, 0), (0, 0, 1.1)], calculator=EMT())
+vib = Vibrations(n2, name='vib-serial')
+vib.run()
+f1 = vib.get_frequencies()
+
+with ProcessPoolExecutor(2) as executor:
+    vib = Vibrations(n2, name='vib-executor')
+    vib.run(executor=executor)
+    assert os.listdir('.').count('vib-executor.all.pckl') == 1
+    assert not os.path.isfile('vib-executor.0x-.pckl')
+    f2 = vib.get_frequencies()
+    assert abs(f1 - f2).max() < 1e-8
+
+    ph = Phonons(bulk('Cu'), EMT(), supercell=(3, 3, 3), name='ph-executor')
+    ph.run(executor=executor)
+    ph.read()
+    C1 = ph.C_N
+
+# Individual files can be combined into one:
+vib = Vibrations(n2, name='vib-serial')
+vib.combine()
+assert not os.path.isfile('vib-serial.eq.pckl')
+assert abs(Vibrations(n2, name='vib-serial').get_frequencies() - f1).max() == 0
+assert vib.clean() == 1
+
+ph = Phonons(bulk('Cu'), EMT(), supercell=(3, 3, 3), name='ph-serial')
+ph.run()
+ph.read()
+assert np.allclose(ph.C_N, C1)
+ph.clean()
+
+# Results are written after every batch:
+class FailingExecutor:
+    nbatches = 0
+
+    def map(self, fn, iterable):
+        self.nbatches += 1
+        if self.nbatches == 2:
+            raise RuntimeError
+        return [fn(args) for args in iterable]
+
+
+vib = Vibrations(n2, name='vib-batches')
+vib.batch_size = 5
+try:
+    vib.run(executor=FailingExecutor())
+except RuntimeError:
+    pass
+vib = Vibrations(n2, name='vib-batches')
+assert len(vib.read_combined()) == 5
+vib.run(executor=FailingExecutor())
+assert len(vib.read_combined()) == 13
+assert abs(vib.get_frequencies() - f1).max() < 1e-8
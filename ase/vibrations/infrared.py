@@ -10,7 +10,7 @@ import numpy as np
 import ase.units as units
 from ase.parallel import parprint, paropen
 from ase.vibrations import Vibrations
-from ase.utils import basestring, pickleload
+from ase.utils import basestring
 
 
 class Infrared(Vibrations):
@@ -162,7 +162,7 @@ class Infrared(Vibrations):
 
         # Get "static" dipole moment and forces
         name = '%s.eq.pckl' % self.name
-        [forces_zero, dipole_zero] = pickleload(open(name, 'rb'))
+        [forces_zero, dipole_zero] = self.load(name)
         self.dipole_zero = (sum(dipole_zero**2)**0.5) / units.Debye
         self.force_zero = max([sum((forces_zero[j])**2)**0.5
                                for j in self.indices])
@@ -174,15 +174,11 @@ class Infrared(Vibrations):
         for a in self.indices:
             for i in 'xyz':
                 name = '%s.%d%s' % (self.name, a, i)
-                [fminus, dminus] = pickleload(
-                    open(name + '-.pckl', 'rb'))
-                [fplus, dplus] = pickleload(
-                    open(name + '+.pckl', 'rb'))
+                [fminus, dminus] = self.load(name + '-.pckl')
+                [fplus, dplus] = self.load(name + '+.pckl')
                 if self.nfree == 4:
-                    [fminusminus, dminusminus] = pickleload(
-                        open(name + '--.pckl', 'rb'))
-                    [fplusplus, dplusplus] = pickleload(
-                        open(name + '++.pckl', 'rb'))
+                    [fminusminus, dminusminus] = self.load(name + '--.pckl')
+                    [fplusplus, dplusplus] = self.load(name + '++.pckl')
                 if self.method == 'frederiksen':
                     fminus[a] += -fminus.sum(0)
                     fplus[a] += -fplus.sum(0)
@@ -6,6 +6,7 @@ import os
 import os.path as op
 import pickle
 import sys
+from itertools import islice
 from math import sin, pi, sqrt, log
 
 import numpy as np
@@ -15,10 +16,108 @@ from ase.io.trajectory import Trajectory
 from ase.parallel import rank, paropen
 
 from ase.utils import opencew, pickleload, basestring
+from ase.calculators.calculator import has_batch_support
 from ase.calculators.singlepoint import SinglePointCalculator
 
 
-class Vibrations:
+def calculate_displacement(args):
+    """Calculate properties of one displaced structure.
+
+    Used by the workers of an executor.  *args* is a tuple of an Atoms
+    object with a calculator and a list of properties."""
+    atoms, properties = args
+    if properties == ['forces']:
+        return atoms.get_forces()
+    return [atoms.calc.get_property(name, atoms) for name in properties]
+
+
+def chunks(iterable, size):
+    """Yield lists of up to *size* consecutive items of *iterable*."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class DisplacementResults:
+    """Results of the calculations for displaced structures.
+
+    The results are stored in one pickle file per displacement,
+    <name>.<displacement>.pckl, or together in <name>.all.pckl.  Used by
+    :class:`Vibrations` and :class:`ase.phonons.Displacement`, which set
+    self.name and self.combined = None and implement
+    displacement_names()."""
+
+    # Number of displacements calculated together by calculators that
+    # support batch evaluation or by an executor:
+    batch_size = 100
+
+    def read_combined(self):
+        """Read the combined results file of all displacements."""
+        if self.combined is None:
+            filename = self.name + '.all.pckl'
+            if op.isfile(filename):
+                with open(filename, 'rb') as fd:
+                    self.combined = pickleload(fd)
+            else:
+                self.combined = {}
+        return self.combined
+
+    def write_combined(self):
+        """Write the combined results file of all displacements."""
+        with paropen(self.name + '.all.pckl', 'wb') as fd:
+            pickle.dump(self.combined, fd, protocol=2)
+        sys.stdout.write('Writing %s.all.pckl\n' % self.name)
+
+    def load(self, filename):
+        """Load results of one displacement.
+
+        Looks for the file first and then in the combined file."""
+        if op.isfile(filename):
+            with open(filename, 'rb') as fd:
+                return pickleload(fd)
+        combined = self.read_combined()
+        if filename not in combined:
+            raise IOError('No results for {}'.format(filename))
+        return combined[filename]
+
+    def combine(self):
+        """Combine the pickle-files of all displacements into one file."""
+        combined = self.read_combined()
+        filenames = [name + '.pckl' for name in self.displacement_names()]
+        for filename in filenames:
+            if op.isfile(filename):
+                combined[filename] = self.load(filename)
+        self.write_combined()
+        if rank == 0:
+            for filename in filenames:
+                if op.isfile(filename):
+                    os.remove(filename)
+
+    def calculate_with_executor(self, executor, jobs, properties):
+        """Calculate missing displacements with an executor.
+
+        jobs: iterable of (filename, atoms) tuples
+            Displaced structures with calculators attached.
+
+        The results are added to the combined file after every batch of
+        batch_size displacements."""
+        combined = self.read_combined()
+        jobs = ((filename, atoms) for filename, atoms in jobs
+                if filename not in combined and not op.isfile(filename))
+        for chunk in chunks(jobs, self.batch_size):
+            outputs = executor.map(calculate_displacement,
+                                   [(atoms, properties)
+                                    for filename, atoms in chunk])
+            for (filename, atoms), output in zip(chunk, outputs):
+                combined[filename] = output
+                sys.stdout.write('Calculated %s\n' % filename)
+            self.write_combined()
+
+
+class Vibrations(DisplacementResults):
     """Class for calculating vibrational modes using finite difference.
 
     The vibrational modes are calculated from a finite difference
@@ -103,8 +202,9 @@ class Vibrations:
         self.H = None
         self.ir = None
         self.ram = None
+        self.combined = None
 
-    def run(self):
+    def run(self, executor=None):
         """Run the vibration calculations.
 
         This will calculate the forces for 6 displacements per atom +/-x,
@@ -122,14 +222,72 @@ class Vibrations:
         If the program you want to use does not have a calculator in ASE, use
         ``iterdisplace`` to get all displaced structures and calculate the forces
         on your own.
+
+        Calculators that can evaluate many configurations in one call get
+        the missing displacements in batches of ``batch_size``.
+
+        executor: object with a map() method
+            Distribute the displacements over the workers of an executor,
+            for example a ``concurrent.futures.ProcessPoolExecutor``.  The
+            results are collected in a single file, <name>.all.pckl.
         """
 
+        if executor is not None:
+            if self.ram:
+                raise NotImplementedError('Raman calculations can not '
+                                          'use an executor')
+            self.run_executor(executor)
+            return
+
+        if has_batch_support(self.calc) and not self.ram:
+            self.run_batch()
+            return
+
         for dispName, atoms in self.iterdisplace(inplace=True):
             filename = dispName + '.pckl'
             fd = opencew(filename)
             if fd is not None:
                 self.calculate(atoms, filename, fd)
 
+    def run_batch(self):
+        """Calculate missing displacements in batches of batch_size."""
+        properties = ['forces']
+        if self.ir:
+            properties.append('dipole')
+        # Only the structures of one batch are kept in memory:
+        jobs = ((dispName + '.pckl', atoms.copy())
+                for dispName, atoms in self.iterdisplace(inplace=True)
+                if not op.isfile(dispName + '.pckl'))
+        for chunk in chunks(jobs, self.batch_size):
+            images = [atoms for filename, atoms in chunk]
+            results = self.calc.calculate_batch(images, properties)
+            # Files are only created once the results are there, so that
+            # an interrupted batch leaves no empty files behind:
+            for (filename, atoms), res in zip(chunk, results):
+                fd = opencew(filename)
+                if fd is None:
+                    continue  # done by another process in the meantime
+                self.calc.store_results(atoms, res)
+                self.calculate(atoms, filename, fd)
+
+    def run_executor(self, executor):
+        def jobs():
+            for dispName, atoms in self.iterdisplace():
+                # Forces are calculated without constraints:
+                del atoms.constraints
+                atoms.calc = self.calc
+                yield dispName + '.pckl', atoms
+
+        properties = ['forces']
+        if self.ir:
+            properties.append('dipole')
+        self.calculate_with_executor(executor, jobs(), properties)
+
+    def displacement_names(self):
+        """Return names of the equilibrium and displaced structures."""
+        return [self.name + '.eq'] + [dispName for dispName, a, i, disp
+                                      in self.displacements()]
+
     def iterdisplace(self, inplace=False):
         """Yield name and atoms object for initial and displaced structures.
 
@@ -197,6 +355,9 @@ class Vibrations:
 
         n = 0
         filenames = [self.name + '.eq.pckl']
+        if not empty_files:
+            filenames.append(self.name + '.all.pckl')
+            self.combined = None
         for dispName, a, i, disp in self.displacements():
             filename = dispName + '.pckl'
             filenames.append(filename)
@@ -215,8 +376,7 @@ class Vibrations:
         assert self.direction in ['central', 'forward', 'backward']
 
         def load(fname):
-            with open(fname, 'rb') as fl:
-                f = pickleload(fl)
+            f = self.load(fname)
             if not hasattr(f, 'shape'):
                 # output from InfraRed
                 return f[0]
@@ -0,0 +1,35 @@
+"""Compare db.write() in a loop with db.write_many() for small molecules."""
+import os
+import sys
+from time import time
+
+import numpy as np
+
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.db import connect
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+images = []
+for i in range(n):
+    atoms = Atoms('H2O', positions=np.random.rand(3, 3))
+    atoms.calc = SinglePointCalculator(atoms, energy=-i,
+                                       forces=np.random.rand(3, 3))
+    images.append(atoms)
+
+for name in ['loop.db', 'many.db']:
+    if os.path.isfile(name):
+        os.remove(name)
+
+t0 = time()
+with connect('loop.db') as db:
+    for i, atoms in enumerate(images):
+        db.write(atoms, i=i, project='benchmark')
+t1 = time()
+db = connect('many.db')
+db.write_many(images, key_value_pairs={'project': 'benchmark'})
+t2 = time()
+
+print('write() loop: {:8.0f} rows/s'.format(n / (t1 - t0)))
+print('write_many(): {:8.0f} rows/s'.format(n / (t2 - t1)))
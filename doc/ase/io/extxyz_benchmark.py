@@ -0,0 +1,51 @@
+"""Time reading an extended XYZ file with one million atom lines.
+
+Compares the column-wise conversion of the atom lines used by
+ase.io.read() with line-by-line conversion.
+"""
+from __future__ import print_function
+import os
+import time
+
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read, write
+from ase.io import extxyz
+
+nframes = 1000
+atoms = bulk('Cu', cubic=True).repeat((5, 5, 10))  # 1000 atoms
+rng = np.random.RandomState(42)
+frames = []
+for i in range(nframes):
+    frame = atoms.copy()
+    frame.rattle(0.05, seed=i)
+    frame.calc = SinglePointCalculator(frame, energy=rng.rand(),
+                                       forces=rng.rand(len(atoms), 3))
+    frames.append(frame)
+write('bench.xyz', frames)
+
+t0 = time.time()
+images = read('bench.xyz', ':')
+t = time.time() - t0
+print('read(): {} frames, {} atom lines: {:.2f} s'.format(
+    len(images), sum(len(a) for a in images), t))
+
+with open('bench.xyz') as fd:
+    lines = fd.readlines()
+os.remove('bench.xyz')
+
+n = len(atoms) + 2
+info = extxyz.key_val_str_to_dict(lines[1])
+properties, names, dtype, convs = extxyz.parse_properties(info['Properties'])
+blocks = [lines[i + 2:i + n] for i in range(0, len(lines), n)]
+t0 = time.time()
+for block in blocks:
+    extxyz._parse_atom_lines(block, properties, names, convs)
+t1 = time.time()
+for block in blocks:
+    extxyz._parse_atom_lines_slow(block, properties, names, dtype, convs)
+t2 = time.time()
+print('atom lines column-wise: {:.2f} s'.format(t1 - t0))
+print('atom lines line-by-line: {:.2f} s'.format(t2 - t1))
@@ -0,0 +1,45 @@
+"""File size and write/read time of trajectory codecs.
+
+Writes a Langevin molecular dynamics run of a Cu crystal with different
+codecs and reads all positions back with TrajectoryReader.read_array().
+"""
+from __future__ import print_function
+import os
+import time
+
+from ase import units
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io.trajectory import Trajectory
+from ase.md.langevin import Langevin
+
+nframes = 500
+atoms = bulk('Cu', cubic=True).repeat(6)
+atoms.calc = EMT()
+md = Langevin(atoms, 5 * units.fs, 1000 * units.kB, 0.02)
+frames = []
+for i in range(nframes):
+    md.run(1)
+    frame = atoms.copy()
+    frame.calc = SinglePointCalculator(frame,
+                                       energy=atoms.get_potential_energy(),
+                                       forces=atoms.get_forces())
+    frames.append(frame)
+
+print('{:>22} {:>10} {:>10} {:>10}'.format('codecs', 'size [MB]',
+                                           'write [s]', 'read [s]'))
+for codecs in [None, 'zlib', 'float32', 'float32+zlib', 'delta+zlib',
+               'float32+delta+zlib', 'float32+delta+lzma']:
+    t0 = time.time()
+    with Trajectory('bench.traj', 'w', codecs=codecs) as t:
+        for frame in frames:
+            t.write(frame)
+    t1 = time.time()
+    with Trajectory('bench.traj') as t:
+        t.read_array('positions')
+    t2 = time.time()
+    size = os.path.getsize('bench.traj') / 1e6
+    print('{:>22} {:10.2f} {:10.3f} {:10.3f}'.format(str(codecs), size,
+                                                     t1 - t0, t2 - t1))
+os.remove('bench.traj')
@@ -0,0 +1,54 @@
+"""Neighbor list build time versus number of atoms.
+
+Compares the quadratically-scaling PrimitiveNeighborList with
+NewPrimitiveNeighborList using the padded-bin ('bins') and the
+linked-cell ('linkedcell') search for a rattled fcc Cu crystal in a
+triclinic cell at fixed density.
+"""
+from __future__ import print_function
+import time
+
+import numpy as np
+
+from ase.build import bulk
+from ase.neighborlist import NewPrimitiveNeighborList, PrimitiveNeighborList
+
+cutoff = 2.5  # radius per atom, i.e. pairs up to 5 Å
+skin = 0.0
+max_natoms_primitive = 5000  # PrimitiveNeighborList is O(N^2)
+
+
+def build_time(nl, atoms, numbers=True):
+    t0 = time.time()
+    if numbers:
+        nl.build(atoms.pbc, atoms.get_cell(complete=True), atoms.positions,
+                 numbers=atoms.numbers)
+    else:
+        nl.build(atoms.pbc, atoms.get_cell(complete=True), atoms.positions)
+    return time.time() - t0
+
+
+prim = bulk('Cu')  # one-atom triclinic fcc cell
+print('{:>8} {:>12} {:>12} {:>12}'.format('natoms', 'primitive',
+                                          'bins', 'linkedcell'))
+for n in [10, 16, 20, 25, 32, 40]:
+    atoms = prim.repeat(n)
+    atoms.rattle(0.05, seed=42)
+    natoms = len(atoms)
+    cutoffs = np.full(natoms, cutoff)
+
+    t_bins = build_time(NewPrimitiveNeighborList(cutoffs, skin=skin,
+                                                 bothways=True), atoms)
+    t_cells = build_time(NewPrimitiveNeighborList(cutoffs, skin=skin,
+                                                  bothways=True,
+                                                  method='linkedcell'),
+                         atoms)
+    if natoms <= max_natoms_primitive:
+        t_prim = build_time(PrimitiveNeighborList(cutoffs, skin=skin,
+                                                  bothways=True),
+                            atoms, numbers=False)
+        t_prim = '{:12.3f}'.format(t_prim)
+    else:
+        t_prim = '{:>12}'.format('-')
+    print('{:8d} {} {:12.3f} {:12.3f}'.format(natoms, t_prim, t_bins,
+                                               t_cells))